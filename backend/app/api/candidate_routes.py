@@ -1,9 +1,22 @@
 # app/api/candidates.py
-from typing import List
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from typing import List, Optional
+from beanie import PydanticObjectId
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
-from app.schemas.api_schemas import CandidateResponse
+from app.core.config import settings
+from app.db.models import Candidate, DuplicatePolicy, ProfileSection, ResumeUpload
+from app.schemas.api_schemas import (
+    CandidateJobMatches,
+    CandidateMatchesRequest,
+    JobMatchResult,
+    ResumeUploadStatusResponse,
+)
+from app.services.matching_service import MatchingService
+from app.services.score_aggregation import AggregationStrategy
 from app.services.ta_service import TalentAcquisitionService
+from app.utils import ai_utils
+from app.utils.upload_utils import UploadTooLargeError
 
 router = APIRouter(
     prefix="/candidates",  # All routes in this file will start with /candidates
@@ -11,26 +24,147 @@ router = APIRouter(
 )
 
 
-@router.post("/upload", status_code=201)
-async def upload_resume(files: List[UploadFile] | UploadFile = File(...)):
+@router.get("/", status_code=200)
+async def list_candidates(
+    response: Response,
+    after: Optional[PydanticObjectId] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    job_id: Optional[PydanticObjectId] = None,
+    include_profile: bool = True,
+):
+    """
+    Lists candidates one page at a time (keyset pagination on id).
+    Pass the X-Next-Cursor response header back as `after` to get the next page.
+    """
+    try:
+        candidates, next_cursor = await TalentAcquisitionService.list_candidates(
+            after=after, limit=limit, job_id=job_id, include_profile=include_profile
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return candidates
+
+
+@router.get("/export")
+async def export_candidates(
+    job_id: Optional[PydanticObjectId] = None, include_profile: bool = True
+):
+    """Streams candidates as NDJSON (one JSON object per line)."""
+    return StreamingResponse(
+        TalentAcquisitionService.stream_candidates_ndjson(
+            job_id=job_id, include_profile=include_profile
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+def _upload_status(upload: ResumeUpload) -> ResumeUploadStatusResponse:
+    return ResumeUploadStatusResponse(
+        id=upload.id,  # type: ignore
+        status=upload.status,
+        error=upload.error_message,
+        filename=upload.filename,
+        candidate_id=upload.candidate_id,
+        duplicate_of=upload.duplicate_of,
+        duplicate_kind=upload.duplicate_kind,
+    )
+
+
+@router.post(
+    "/upload", status_code=202, response_model=List[ResumeUploadStatusResponse]
+)
+async def upload_resume(
+    files: List[UploadFile] | UploadFile = File(...),
+    on_duplicate: Optional[DuplicatePolicy] = None,
+):
+    """
+    Upload one or more resumes for background processing. Returns one status
+    per file right away; poll /candidates/uploads/{upload_id} for progress.
+    Resumes matching an existing candidate are linked or merged per `on_duplicate`.
+    Files over UPLOAD_MAX_FILE_BYTES, or requests over UPLOAD_MAX_REQUEST_BYTES,
+    are rejected with 413.
+    """
     try:
-        """Upload a resume, create a candidate record, and start background processing."""
         files = files if isinstance(files, list) else [files]
+        uploads = await TalentAcquisitionService.submit_resumes(
+            resume_files=files, on_duplicate=on_duplicate
+        )
+        return [_upload_status(upload) for upload in uploads]
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 
-        new_candidates = await TalentAcquisitionService.process_resumes_for_job(
-            resume_files=files
+@router.post("/matches", response_model=List[CandidateJobMatches])
+async def get_matches_for_candidates(
+    request: CandidateMatchesRequest,
+    top_n: int = Query(10, ge=1, le=settings.MATCH_MAX_TOP_N),
+    strategy: AggregationStrategy = AggregationStrategy.MAX_SIM,
+    top_k: int = Query(3, ge=1),
+    section: Optional[List[ProfileSection]] = Query(None),
+):
+    """
+    Batch form of /candidates/{candidate_id}/matches: the top jobs for each
+    candidate, scored in one pass. Unknown candidates get no matches.
+    """
+    try:
+        candidate_ids = [str(candidate_id) for candidate_id in request.candidate_ids]
+        matches = await MatchingService.find_matches_for_candidates(
+            candidate_ids, top_n=top_n, strategy=strategy, top_k=top_k, sections=section
+        )
+        return [
+            CandidateJobMatches(candidate_id=candidate_id, matches=matches[str(candidate_id)])
+            for candidate_id in request.candidate_ids
+        ]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{candidate_id}/matches", response_model=List[JobMatchResult])
+async def get_candidate_matches(
+    candidate_id: PydanticObjectId,
+    top_n: int = Query(10, ge=1, le=settings.MATCH_MAX_TOP_N),
+    strategy: AggregationStrategy = AggregationStrategy.MAX_SIM,
+    top_k: int = Query(3, ge=1),
+    section: Optional[List[ProfileSection]] = Query(None),
+):
+    """
+    Get the top job matches for a candidate. Repeat `section` (e.g.
+    ?section=skills&section=experience) to match only those resume sections.
+    """
+    candidate = await Candidate.get(candidate_id)
+    if not candidate:
+        raise HTTPException(status_code=404, detail="Candidate not found.")
+    try:
+        return await MatchingService.find_matches_for_candidate(
+            str(candidate_id), top_n=top_n, strategy=strategy, top_k=top_k, sections=section
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/uploads/{upload_id}", response_model=ResumeUploadStatusResponse)
+async def get_upload_status(upload_id: PydanticObjectId):
+    """Processing status of one uploaded resume."""
+    upload = await TalentAcquisitionService.get_upload_status(upload_id)
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found.")
+    return _upload_status(upload)
+
+
+@router.delete("/standardization-cache")
+async def invalidate_standardization_cache(all_versions: bool = False):
+    """Drops cached standardized profiles (stale prompt versions only, unless all_versions=true)."""
+    try:
+        deleted = await ai_utils.invalidate_standardization_cache(
+            all_versions=all_versions
         )
-        response = []
-        if len(new_candidates) == 0:
-            raise RuntimeError("No candidates were added!")
-
-        if len(new_candidates) > 1:
-            for candidate in new_candidates:
-                r = CandidateResponse(**candidate.model_dump(by_alias=True))
-                response.append(r)
-        else:
-            r = CandidateResponse(**new_candidates[0].model_dump(by_alias=True))
-            response.append(r)
-        return response
+        return {
+            "deleted": deleted,
+            "prompt_version": ai_utils.STANDARDIZATION_PROMPT_VERSION,
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
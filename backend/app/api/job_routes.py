@@ -1,10 +1,18 @@
 # app/api/jobs.py
-from fastapi import APIRouter, HTTPException, Body
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Body, Query, Response
+from fastapi.responses import StreamingResponse
 from beanie import PydanticObjectId
 
-from app.db.models import Job
-from app.schemas.api_schemas import JobResponse
+from app.core.config import settings
+from app.db.models import Job, ProfileSection
+from app.schemas.api_schemas import (
+    DocumentStatusResponse,
+    JobMatchesRequest,
+    JobResponse,
+)
 from app.services.matching_service import MatchingService
+from app.services.score_aggregation import AggregationStrategy
 
 router = APIRouter(prefix="/jobs", tags=["Jobs"])
 
@@ -12,35 +20,125 @@ from app.services.ta_service import TalentAcquisitionService
 from app.schemas.api_schemas import JobResponse
 
 
-@router.get("/", status_code=200)
-async def list_jobs():
-    """Lists all available jobs."""
+@router.get("/", status_code=200, response_model=List[JobResponse])
+async def list_jobs(
+    response: Response,
+    after: Optional[PydanticObjectId] = None,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """
+    Lists jobs one page at a time (keyset pagination on id).
+    Pass the X-Next-Cursor response header back as `after` to get the next page.
+    """
     try:
-        return await TalentAcquisitionService.get_all_jobs()
+        jobs, next_cursor = await TalentAcquisitionService.list_jobs(
+            after=after, limit=limit
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return jobs
+
+
+@router.get("/export")
+async def export_jobs():
+    """Streams every job as NDJSON (one JSON object per line)."""
+    return StreamingResponse(
+        TalentAcquisitionService.stream_jobs_ndjson(),
+        media_type="application/x-ndjson",
+    )
 
 
-@router.post("/", status_code=201)
+@router.post("/", status_code=202, response_model=DocumentStatusResponse)
 async def upload_job_description(title: str = Body(...), content: str = Body(...)):
     """Upload a job description and start background processing."""
     try:
         job = await TalentAcquisitionService.create_new_job(
             title=title, description=content
         )
-        return JobResponse(**job.model_dump(by_alias=True))
+        return DocumentStatusResponse(id=job.id, status=job.status)  # type: ignore
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{job_id}/status", response_model=DocumentStatusResponse)
+async def get_job_status(job_id: PydanticObjectId):
+    """Processing status of a job description."""
+    job = await Job.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return DocumentStatusResponse(
+        id=job.id, status=job.status, error=job.error_message  # type: ignore
+    )
+
+
+@router.post("/matches")
+async def get_matches_for_jobs(
+    request: JobMatchesRequest,
+    top_n: int = Query(10, ge=1, le=settings.MATCH_MAX_TOP_N),
+    strategy: AggregationStrategy = AggregationStrategy.MAX_SIM,
+    top_k: int = Query(3, ge=1),
+    section: Optional[List[ProfileSection]] = Query(None),
+    require: Optional[List[str]] = Query(None),
+    hybrid: Optional[bool] = None,
+    enforce_requirements: Optional[bool] = None,
+):
+    """
+    Batch form of /jobs/{job_id}/matches. Streams NDJSON, one
+    {"job_id", "matches", "error"} object per job as soon as it is scored;
+    lines arrive in completion order, not request order.
+    """
+
+    async def lines():
+        async for result in MatchingService.stream_matches_for_jobs(
+            [str(job_id) for job_id in request.job_ids],
+            top_n=top_n,
+            strategy=strategy,
+            top_k=top_k,
+            sections=section,
+            required=require,
+            hybrid=hybrid,
+            enforce_requirements=enforce_requirements,
+        ):
+            yield result.model_dump_json(by_alias=True) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.get("/{job_id}/matches")
-async def get_job_matches(job_id: PydanticObjectId):
-    """Get the top candidate matches for a specific job."""
+async def get_job_matches(
+    job_id: PydanticObjectId,
+    top_n: int = Query(10, ge=1, le=settings.MATCH_MAX_TOP_N),
+    strategy: AggregationStrategy = AggregationStrategy.MAX_SIM,
+    top_k: int = Query(3, ge=1),
+    section: Optional[List[ProfileSection]] = Query(None),
+    require: Optional[List[str]] = Query(None),
+    hybrid: Optional[bool] = None,
+    enforce_requirements: Optional[bool] = None,
+):
+    """
+    Get the top candidate matches for a specific job. Repeat `section` (e.g.
+    ?section=skills&section=experience) to match only those resume sections,
+    and `require` (e.g. ?require=terraform&require=CKA) to only return
+    candidates whose skills, certifications or titles contain every term.
+    `hybrid` overrides whether keyword scores are fused into the ranking and
+    `enforce_requirements` whether the job's parsed must-haves filter candidates.
+    """
     job = await Job.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found.")
     try:
-        matches = await MatchingService.find_matches_for_job(str(job.id))
+        matches = await MatchingService.get_matches_for_job(
+            job,
+            top_n=top_n,
+            strategy=strategy,
+            top_k=top_k,
+            sections=section,
+            required=require,
+            hybrid=hybrid,
+            enforce_requirements=enforce_requirements,
+        )
         return matches
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
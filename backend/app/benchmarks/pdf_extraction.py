@@ -0,0 +1,77 @@
+# app/benchmarks/pdf_extraction.py
+"""
+Compares text extraction backends on a directory of sample PDFs.
+
+For every backend it measures sequential, in-process extraction (the old
+behaviour) and the pooled `text_extraction.extract_text` path, and reports
+documents/s, pages/s and extracted characters.
+
+    cd backend
+    python -m app.benchmarks.pdf_extraction path/to/pdfs --backends pypdf unstructured
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from app.services import text_extraction
+from app.utils import file_utils
+
+
+def load_corpus(directory: Path) -> List[Tuple[str, bytes]]:
+    return [(path.name, path.read_bytes()) for path in sorted(directory.glob("*.pdf"))]
+
+
+def bench_sequential(backend: str, corpus: List[Tuple[str, bytes]]) -> Tuple[float, int]:
+    extractor = text_extraction.get_extractor(backend)
+    started = time.perf_counter()
+    chars = sum(len(extractor.extract(data, name)) for name, data in corpus)
+    return time.perf_counter() - started, chars
+
+
+async def bench_pooled(backend: str, corpus: List[Tuple[str, bytes]]) -> Tuple[float, int]:
+    # Warm the pool first so worker start-up is not billed to the first documents.
+    name, data = corpus[0]
+    await text_extraction.extract_text(data, name, backend=backend)
+    started = time.perf_counter()
+    texts = await asyncio.gather(
+        *(text_extraction.extract_text(data, name, backend=backend) for name, data in corpus)
+    )
+    return time.perf_counter() - started, sum(len(text) for text in texts)
+
+
+def report(label: str, seconds: float, chars: int, documents: int, pages: int):
+    print(
+        f"{label:<28} {seconds:8.2f}s {documents / seconds:8.1f} docs/s "
+        f"{pages / seconds:9.1f} pages/s {chars:>12,} chars"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("corpus", type=Path, help="Directory containing *.pdf files")
+    parser.add_argument(
+        "--backends", nargs="+", default=list(text_extraction.EXTRACTORS)
+    )
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        raise SystemExit(f"No PDFs found in {args.corpus}")
+    pages = sum(file_utils.count_pdf_pages(data) for _, data in corpus)
+    print(f"{len(corpus)} documents, {pages} pages\n")
+
+    for backend in args.backends:
+        try:
+            seconds, chars = bench_sequential(backend, corpus)
+            report(f"{backend} sequential", seconds, chars, len(corpus), pages)
+            seconds, chars = asyncio.run(bench_pooled(backend, corpus))
+            report(f"{backend} pooled", seconds, chars, len(corpus), pages)
+        except ImportError as e:
+            print(f"{backend:<28} skipped: {e}")
+    text_extraction.shutdown_extraction_executor()
+
+
+if __name__ == "__main__":
+    main()
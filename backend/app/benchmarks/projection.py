@@ -0,0 +1,173 @@
+# app/benchmarks/projection.py
+"""
+Fits embedding projections and reports their quality loss.
+
+Both commands read the unprojected collections (the ones written with
+EMBEDDING_PROJECTION=none), which hold the model's raw vectors.
+
+`fit` fits a PCA on the candidate chunks and writes it to
+EMBEDDING_PROJECTION_PATH (or --output). Set EMBEDDING_PROJECTION=pca and
+re-ingest to use it.
+
+`report` compares projections against the raw vectors: memory per vector,
+exact-search time, and recall@k of the projected top-k candidates for every
+job (or, with --sample-queries N, N random candidates), with the raw ranking
+as ground truth. PCA is fitted on the same corpus, so its recall is an upper
+bound for unseen data.
+
+    cd backend
+    python -m app.benchmarks.projection fit --dims 256
+    python -m app.benchmarks.projection report --truncate 256 512 1024 --pca 128 256
+"""
+import argparse
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.embedding_projection import EmbeddingProjection, ProjectionKind
+from app.services.exact_matching import CandidateMatrix
+from app.services.score_aggregation import JobChunks
+from app.vector_store.repository import (
+    CANDIDATES_COLLECTION,
+    JOBS_COLLECTION,
+    vector_repository,
+)
+
+
+def load_raw(
+    name: str, document_type: str, limit: Optional[int] = None
+) -> Tuple[np.ndarray, List[dict], List[str]]:
+    """Vectors, metadatas and documents of the unprojected collection `name`."""
+    collection = vector_repository.store.get_or_create_collection(name)
+    page = max(1, settings.EXACT_MATCH_LOAD_PAGE_SIZE)
+    vectors: List[np.ndarray] = []
+    metadatas: List[dict] = []
+    documents: List[str] = []
+    offset = 0
+    while limit is None or offset < limit:
+        data = collection.get(
+            where={"document_type": document_type},
+            include=["embeddings", "metadatas", "documents"],
+            limit=page if limit is None else min(page, limit - offset),
+            offset=offset,
+        )
+        embeddings = data.get("embeddings")
+        if embeddings is None or len(embeddings) == 0:
+            break
+        vectors.append(np.asarray(embeddings, dtype=np.float32))
+        metadatas.extend(data["metadatas"])  # type: ignore
+        documents.extend(data.get("documents") or [""] * len(embeddings))
+        offset += len(embeddings)
+        if len(embeddings) < page:
+            break
+    if not vectors:
+        return np.zeros((0, 0), dtype=np.float32), [], []
+    return np.concatenate(vectors), metadatas, documents
+
+
+def group_queries(
+    vectors: np.ndarray, metadatas: List[dict], documents: List[str], limit: int
+) -> Dict[str, JobChunks]:
+    rows_by_job: Dict[str, List[int]] = defaultdict(list)
+    for i, metadata in enumerate(metadatas):
+        rows_by_job[metadata["document_id"]].append(i)
+    return {
+        job_id: (vectors[rows], [len(documents[i] or "") for i in rows])
+        for job_id, rows in list(rows_by_job.items())[:limit]
+    }
+
+
+def recall(approx: Dict[str, list], truth: Dict[str, list], k: int) -> float:
+    hits = [
+        len({c for c, _ in approx[job][:k]} & {c for c, _ in truth[job][:k]})
+        / max(1, min(k, len(truth[job])))
+        for job in truth
+    ]
+    return float(np.mean(hits)) if hits else 0.0
+
+
+def fit(args):
+    vectors, _, _ = load_raw(CANDIDATES_COLLECTION, "resume", limit=args.sample)
+    if len(vectors) == 0:
+        raise SystemExit("The unprojected candidates collection is empty")
+    started = time.perf_counter()
+    projection = EmbeddingProjection.fit_pca(vectors, args.dims)
+    projection.save(args.output)
+    print(
+        f"Fitted {projection.version} on {len(vectors)} chunks in "
+        f"{time.perf_counter() - started:.1f}s, wrote {args.output}"
+    )
+
+
+def report(args):
+    vectors, metadatas, _ = load_raw(CANDIDATES_COLLECTION, "resume")
+    if len(vectors) == 0:
+        raise SystemExit("The unprojected candidates collection is empty")
+    owners = [metadata["document_id"] for metadata in metadatas]
+    no_sections = [None] * len(owners)
+    if args.sample_queries:
+        rng = np.random.default_rng(0)
+        picked = set(rng.choice(sorted(set(owners)), size=args.sample_queries, replace=False))
+        rows = [i for i, owner in enumerate(owners) if owner in picked]
+        queries = group_queries(
+            vectors[rows], [metadatas[i] for i in rows], [""] * len(rows), len(picked)
+        )
+    else:
+        queries = group_queries(*load_raw(JOBS_COLLECTION, "job"), limit=args.jobs)
+    if not queries:
+        raise SystemExit("No job chunks found; pass --sample-queries N")
+    print(
+        f"{len(vectors)} chunks of dim {vectors.shape[1]}, "
+        f"{len(queries)} queries, k={args.k}\n"
+    )
+
+    projections = [EmbeddingProjection()]
+    projections += [EmbeddingProjection(ProjectionKind.TRUNCATE, dims=d) for d in args.truncate]
+    for dims in args.pca:
+        projections.append(EmbeddingProjection.fit_pca(vectors, dims))
+
+    print(f"{'projection':<22} {'bytes/vector':>12} {'search (s)':>11} {'recall@k':>9}")
+    truth: Optional[Dict[str, list]] = None
+    for projection in projections:
+        matrix = CandidateMatrix.from_vectors(projection.apply(vectors), owners, no_sections)
+        projected_queries = {
+            job_id: (projection.apply(chunks), weights)
+            for job_id, (chunks, weights) in queries.items()
+        }
+        started = time.perf_counter()
+        ranked = matrix.rank(projected_queries, top_n=args.k)
+        seconds = time.perf_counter() - started
+        truth = ranked if truth is None else truth
+        print(
+            f"{projection.version:<22} {matrix.matrix.shape[1] * 4:>12} "
+            f"{seconds:>11.3f} {recall(ranked, truth, args.k):>9.3f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fit_parser = commands.add_parser("fit", help="Fit a PCA projection")
+    fit_parser.add_argument("--dims", type=int, default=settings.EMBEDDING_PROJECTION_DIMS)
+    fit_parser.add_argument("--sample", type=int, default=100_000, help="Most chunks to fit on")
+    fit_parser.add_argument("--output", default=settings.EMBEDDING_PROJECTION_PATH)
+    fit_parser.set_defaults(run=fit)
+
+    report_parser = commands.add_parser("report", help="Report quality loss")
+    report_parser.add_argument("--truncate", type=int, nargs="*", default=[])
+    report_parser.add_argument("--pca", type=int, nargs="*", default=[])
+    report_parser.add_argument("--k", type=int, default=10)
+    report_parser.add_argument("--jobs", type=int, default=200, help="Most jobs to query with")
+    report_parser.add_argument("--sample-queries", type=int, default=0)
+    report_parser.set_defaults(run=report)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
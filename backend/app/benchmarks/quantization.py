@@ -0,0 +1,136 @@
+# app/benchmarks/quantization.py
+"""
+Measures recall@k against memory for the quantized exact-matching matrix.
+
+Loads every resume chunk from the configured vector store and uses the job
+chunks as queries (or, with --sample-queries N, N random candidates' chunks).
+For each quantization it reports the matrix size, the recall@k of the
+quantized pass alone and after rescoring the top --rescore candidates at full
+precision (recall is measured against the float32 ranking), and the time per
+batch of jobs.
+
+    cd backend
+    python -m app.benchmarks.quantization --k 10 --rescore 300
+"""
+import argparse
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+
+from app.services.exact_matching import CandidateMatrix, ExactMatchEngine, Quantization
+from app.services.score_aggregation import AggregationStrategy, JobChunks
+from app.vector_store.repository import JOBS_COLLECTION, vector_repository
+
+
+def load_jobs(limit: int) -> Dict[str, JobChunks]:
+    data = vector_repository.get(
+        JOBS_COLLECTION,
+        where={"document_type": "job"},
+        include=["embeddings", "metadatas", "documents"],
+    )
+    embeddings = data.get("embeddings")
+    if embeddings is None or len(embeddings) == 0:
+        return {}
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    documents = data.get("documents") or [""] * len(vectors)
+    rows_by_job: Dict[str, List[int]] = defaultdict(list)
+    for i, metadata in enumerate(data["metadatas"]):  # type: ignore
+        rows_by_job[metadata["document_id"]].append(i)
+    return {
+        job_id: (vectors[rows], [len(documents[i] or "") for i in rows])
+        for job_id, rows in list(rows_by_job.items())[:limit]
+    }
+
+
+def sample_queries(
+    exact: CandidateMatrix, count: int, seed: int = 0
+) -> Dict[str, JobChunks]:
+    """Uses the chunks of `count` random candidates as pseudo job descriptions."""
+    rng = np.random.default_rng(seed)
+    picked = rng.choice(
+        len(exact.owners), size=min(count, len(exact.owners)), replace=False
+    )
+    queries = {}
+    for owner in picked:
+        rows = np.flatnonzero(exact.owner_idx == owner)
+        queries[f"sample-{owner}"] = (exact.matrix[rows], [1] * len(rows))
+    return queries
+
+
+def recall(approx: Dict[str, list], truth: Dict[str, list], k: int) -> float:
+    hits = [
+        len({c for c, _ in approx[job][:k]} & {c for c, _ in truth[job][:k]})
+        / max(1, min(k, len(truth[job])))
+        for job in truth
+    ]
+    return float(np.mean(hits)) if hits else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rescore", type=int, default=300)
+    parser.add_argument("--jobs", type=int, default=200, help="Most jobs to query with")
+    parser.add_argument("--sample-queries", type=int, default=0)
+    parser.add_argument(
+        "--strategy", type=AggregationStrategy, default=AggregationStrategy.MAX_SIM
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    exact = ExactMatchEngine.load()
+    print(
+        f"{len(exact)} chunks, {len(exact.owners)} candidates, "
+        f"dim {exact.matrix.shape[1] if exact.matrix.ndim == 2 else 0}, "
+        f"loaded in {time.perf_counter() - started:.1f}s"
+    )
+    if len(exact) == 0:
+        raise SystemExit("The candidates collection is empty")
+    queries = (
+        sample_queries(exact, args.sample_queries)
+        if args.sample_queries
+        else load_jobs(args.jobs)
+    )
+    if not queries:
+        raise SystemExit("No job chunks found; pass --sample-queries N")
+    print(f"{len(queries)} queries, k={args.k}, rescoring top {args.rescore}\n")
+
+    truth = exact.rank(queries, top_n=args.k, strategy=args.strategy)
+    owners = exact.owners[exact.owner_idx]
+    sections = [None] * len(exact)
+    print(
+        f"{'quantization':<14} {'memory':>10} {'recall@k':>9} "
+        f"{'rescored':>9} {'pass (s)':>9} {'rescore (s)':>12}"
+    )
+    for quantization in Quantization:
+        # The matrix is already normalized and grouped, so re-quantizing it is exact.
+        matrix = CandidateMatrix.from_vectors(
+            exact.matrix, owners, sections, quantization=quantization
+        )
+        started = time.perf_counter()
+        shortlist = matrix.rank(
+            queries, top_n=max(args.k, args.rescore), strategy=args.strategy
+        )
+        first_pass = time.perf_counter() - started
+        # As ExactMatchEngine does: full-precision vectors of the shortlisted
+        # candidates only (fetched from the vector store there, sliced here).
+        started = time.perf_counter()
+        shortlisted = {c for ranked in shortlist.values() for c, _ in ranked}
+        rows = np.isin(owners, list(shortlisted))
+        kept = int(rows.sum())
+        small = CandidateMatrix(
+            exact.matrix[rows], None, owners[rows], sections[:kept]
+        )
+        rescored = small.rank(queries, top_n=args.k, strategy=args.strategy)
+        rescoring = time.perf_counter() - started
+        print(
+            f"{quantization.value:<14} {matrix.nbytes / 2**20:>8.1f}MB "
+            f"{recall(shortlist, truth, args.k):>9.3f} {recall(rescored, truth, args.k):>9.3f} "
+            f"{first_pass:>9.2f} {rescoring:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 # app/core/celery_app.py
+import os
 from celery import Celery
 from app.core.config import settings
 
@@ -6,5 +7,28 @@ celery = Celery(
     "tasks",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
-    include=["tasks.process"],  # Points to the file with your tasks
+    include=["app.tasks.process"],  # Points to the file with your tasks
 )
+
+celery.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    result_serializer="json",
+    task_acks_late=True,
+    # LLM-bound tasks are long; don't let one worker hoard queued batches.
+    worker_prefetch_multiplier=1,
+)
+
+if settings.CELERY_BROKER_URL.startswith("filesystem://"):
+    # Filesystem transport: a shared directory acts as the queue, which lets
+    # tests and local runs use a real worker process without Redis.
+    queue_dir = os.path.join(settings.CELERY_FILESYSTEM_BROKER_DIR, "queue")
+    processed_dir = os.path.join(settings.CELERY_FILESYSTEM_BROKER_DIR, "processed")
+    os.makedirs(queue_dir, exist_ok=True)
+    os.makedirs(processed_dir, exist_ok=True)
+    celery.conf.broker_transport_options = {
+        "data_folder_in": queue_dir,
+        "data_folder_out": queue_dir,
+        "processed_folder": processed_dir,
+        "store_processed": False,
+    }
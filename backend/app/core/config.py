@@ -21,8 +21,152 @@ class Settings(BaseSettings):
     DB_PORT: Optional[int] = 27017
     CHROMA_HTTP_HOST: str = "localhost"
     CHROMA_HTTP_PORT: int = 8000
-    CELERY_BROKER_URL: str = ""
-    CELERY_RESULT_BACKEND: str = ""
+    # Vector store backend: "chroma" (the server above) or "local", an embedded
+    # store (memory-mapped float32 vectors + SQLite metadata) under VECTOR_STORE_PATH.
+    # The local store is exact (flat scan); share the directory between processes.
+    VECTOR_STORE_BACKEND: str = "chroma"
+    VECTOR_STORE_PATH: str = ".vector_store"
+    # Records per vector store write and query embeddings per search request.
+    VECTOR_STORE_WRITE_BATCH_SIZE: int = 1000
+    VECTOR_STORE_QUERY_BATCH_SIZE: int = 64
+    CELERY_BROKER_URL: str = "memory://"
+    CELERY_RESULT_BACKEND: str = "cache+memory://"
+    # Used when CELERY_BROKER_URL is "filesystem://" (local multi-process runs).
+    CELERY_FILESYSTEM_BROKER_DIR: str = ".celery"
+    # Run task coroutines on the API's own event loop instead of sending them
+    # to a worker (tests and single-node development without a broker). Unset,
+    # tasks run in process exactly when the broker is the in-memory default,
+    # which no worker can read; setting it to false with that broker is an error.
+    TASKS_RUN_IN_PROCESS: Optional[bool] = None
+
+    # Bulk resume ingestion: parallelism per pipeline stage and the size of the
+    # bounded queues between stages (backpressure for large batch uploads).
+    INGEST_READ_CONCURRENCY: int = 8
+    INGEST_EXTRACT_CONCURRENCY: int = 4
+    INGEST_STANDARDIZE_CONCURRENCY: int = 8
+    INGEST_EMBED_CONCURRENCY: int = 4
+    INGEST_QUEUE_SIZE: int = 16
+
+    # Text extraction: backend ("pypdf" or "unstructured"), worker processes
+    # (0 = one per CPU) and page-level parallelism for long documents.
+    PDF_EXTRACTOR_BACKEND: str = "pypdf"
+    PDF_EXTRACTION_WORKERS: int = 0
+    PDF_PARALLEL_PAGE_THRESHOLD: int = 16
+    PDF_PAGES_PER_TASK: int = 8
+
+    # Uploads are streamed to UPLOAD_SPOOL_DIR instead of being read into memory.
+    # Workers open the spooled files by path, so the directory must be shared
+    # between the API and Celery workers.
+    UPLOAD_SPOOL_DIR: str = ".uploads"
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+    UPLOAD_MAX_FILE_BYTES: int = 20 * 1024 * 1024
+    UPLOAD_MAX_REQUEST_BYTES: int = 200 * 1024 * 1024
+    # Duplicate resumes: "link" to the existing candidate, "merge" into it, or
+    # "create" a new one; near-duplicates are SimHash matches within N bits
+    # (at most dedup_utils.MAX_NEAR_DUPLICATE_DISTANCE, 3 with 4 bands).
+    INGEST_DUPLICATE_POLICY: str = "link"
+    INGEST_NEAR_DUPLICATE_DISTANCE: int = 3
+
+    # Shared HTTP connection pool for the Azure OpenAI clients.
+    LLM_HTTP_MAX_CONNECTIONS: int = 50
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 120.0
+    LLM_HTTP_TIMEOUT: float = 120.0
+
+    # Azure OpenAI quota per deployment, enforced client-side, and the retry
+    # policy for 429s and transient errors (exponential backoff with jitter).
+    CHAT_REQUESTS_PER_MINUTE: int = 300
+    CHAT_TOKENS_PER_MINUTE: int = 150_000
+    EMBEDDING_REQUESTS_PER_MINUTE: int = 1_000
+    EMBEDDING_TOKENS_PER_MINUTE: int = 350_000
+    CHAT_COMPLETION_TOKEN_ESTIMATE: int = 2_000
+    LLM_MAX_RETRIES: int = 6
+    LLM_RETRY_BASE_DELAY: float = 1.0
+    LLM_RETRY_MAX_DELAY: float = 60.0
+    # The API and every worker process draw on the same deployment quota. With
+    # a Redis URL the buckets are shared there; otherwise each process enforces
+    # 1 / LLM_RATE_LIMIT_PROCESSES of the quota (count the API and all workers).
+    LLM_RATE_LIMIT_REDIS_URL: str = ""
+    LLM_RATE_LIMIT_PROCESSES: int = 1
+
+    # Content-addressed embedding cache (SQLite file, LRU-evicted by entry count).
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = ".cache/embeddings.sqlite3"
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 200_000
+
+    # Optional embedding reduction before vectors are stored: "none", "truncate"
+    # (keep the first DIMS dimensions; Matryoshka-trained models only) or "pca"
+    # (components fitted on the corpus, read from PROJECTION_PATH). Each
+    # projection version gets its own vector store collections.
+    EMBEDDING_PROJECTION: str = "none"
+    EMBEDDING_PROJECTION_DIMS: int = 512
+    EMBEDDING_PROJECTION_PATH: str = ".projection/pca.npz"
+
+    # Cross-document embedding request packing. Inputs are collected for up to
+    # MAX_WAIT_MS and sent in requests of at most MAX_INPUTS texts / MAX_TOKENS.
+    EMBEDDING_BATCHING_ENABLED: bool = True
+    EMBEDDING_BATCH_MAX_INPUTS: int = 256
+    EMBEDDING_BATCH_MAX_TOKENS: int = 100_000
+    EMBEDDING_BATCH_MAX_WAIT_MS: int = 25
+
+    # Overrides the version that keys cached standardized profiles. When empty
+    # it is derived from a hash of the standardization prompt.
+    STANDARDIZATION_PROMPT_VERSION: str = ""
+
+    # Resume profiles are embedded one section (project, skill category, ...)
+    # per chunk; only sections longer than this are split further.
+    PROFILE_CHUNK_MAX_CHARS: int = 4000
+
+    # Materialized match table: how many candidates are stored per job when a
+    # new job is scored against the existing pool.
+    MATCH_MATERIALIZE_LIMIT: int = 200
+    # Largest `top_n` the match endpoints accept.
+    MATCH_MAX_TOP_N: int = 200
+
+    # Live matching: chunks fetched per query chunk for each wanted candidate
+    # (or job, when matching jobs to a candidate; doubled while too few distinct
+    # documents come back), and the largest candidate id set sent to Chroma as
+    # a `$in` filter (larger sets are filtered after the search).
+    MATCH_CHUNKS_PER_CANDIDATE: int = 5
+    MATCH_MAX_CHUNKS_PER_QUERY: int = 2000
+    MATCH_PREFILTER_MAX_IDS: int = 5000
+    # Whether a job's parsed must-have requirements filter candidates by
+    # default (requests can override it with `enforce_requirements`).
+    MATCH_ENFORCE_JOB_REQUIREMENTS: bool = False
+    # Batch job matching: jobs ranked per batched vector query, and how many of
+    # those queries run at once.
+    MATCH_BATCH_JOBS_PER_QUERY: int = 16
+    MATCH_BATCH_CONCURRENCY: int = 4
+
+    # Hybrid matching: a BM25 keyword index over profile skills, certifications
+    # and titles, fused with vector similarity ("rrf" or "weighted").
+    HYBRID_SEARCH_ENABLED: bool = True
+    HYBRID_FUSION_METHOD: str = "rrf"
+    HYBRID_VECTOR_WEIGHT: float = 1.0
+    HYBRID_KEYWORD_WEIGHT: float = 0.5
+    HYBRID_RRF_K: int = 60
+    # The keyword index re-reads candidates whose profile changed since the
+    # last refresh (minus OVERLAP_SECONDS, for writes that commit late) every
+    # REFRESH_SECONDS, and is rebuilt every REBUILD_SECONDS.
+    KEYWORD_INDEX_REFRESH_SECONDS: float = 30.0
+    KEYWORD_INDEX_REFRESH_OVERLAP_SECONDS: float = 120.0
+    KEYWORD_INDEX_REBUILD_SECONDS: float = 900.0
+
+    # Live matching backend: "vector_store" (nearest-neighbour queries) or
+    # "exact" (brute force over an in-memory, normalized candidate matrix).
+    # The exact matrix is loaded in pages, scored in blocks of rows, and
+    # reloaded when the candidate chunk count changes (checked every
+    # REFRESH_SECONDS) or after REBUILD_SECONDS.
+    MATCH_BACKEND: str = "vector_store"
+    EXACT_MATCH_LOAD_PAGE_SIZE: int = 5000
+    EXACT_MATCH_BLOCK_ROWS: int = 65536
+    EXACT_MATCH_REFRESH_SECONDS: float = 30.0
+    EXACT_MATCH_REBUILD_SECONDS: float = 900.0
+    # Storage of the exact matrix: "none" (float32), "float16" or "int8". When
+    # quantized, the quantized pass shortlists RESCORE_CANDIDATES per job and
+    # those are rescored with full-precision vectors from the vector store.
+    EXACT_MATCH_QUANTIZATION: str = "none"
+    EXACT_MATCH_RESCORE_CANDIDATES: int = 300
 
     class Config:
         env_file = ".env"
@@ -61,4 +205,7 @@ settings = Settings()
 DOCUMENT_MODELS = [
     "app.db.models.Job",
     "app.db.models.Candidate",
+    "app.db.models.StandardizedProfileCache",
+    "app.db.models.JobMatch",
+    "app.db.models.ResumeUpload",
 ]
@@ -1,6 +1,11 @@
+from datetime import datetime
 from beanie import PydanticObjectId
-from typing import List, Dict, Any, Optional
-from app.db.models import Candidate
+from beanie.operators import In
+from typing import AsyncIterator, List, Dict, Any, Optional, Set, Tuple, Type
+from pydantic import BaseModel
+from pymongo import UpdateOne
+from app.db.models import Candidate, JobRequirements
+from app.utils import dedup_utils, term_utils
 
 
 class CandidateDAO:
@@ -34,17 +39,285 @@ class CandidateDAO:
                 relevance_score=score,
                 job_id=job_id,
                 full_text=full_text,
+                **CandidateDAO.fingerprint(full_text),
+                **CandidateDAO.requirement_fields(profile),
             )
             await candidate.insert()
+            await CandidateDAO.stamp_profile_update(candidate.id)  # type: ignore
             return candidate
         except Exception as e:
             raise e
 
-    async def get_candidates_by_job_id(
-        self, job_id: PydanticObjectId
-    ) -> List[Candidate]:
-        return (
-            await Candidate.find(Candidate.job_id == job_id)
-            .sort(-Candidate.relevance_score)  # type: ignore
-            .to_list()
+    @staticmethod
+    def fingerprint(full_text: Optional[str]) -> Dict[str, Any]:
+        """Duplicate-detection fields for a candidate's full text."""
+        if not full_text:
+            return {}
+        fingerprint = dedup_utils.simhash(full_text)
+        return {
+            "content_hash": dedup_utils.content_hash(full_text),
+            "simhash": dedup_utils.simhash_to_hex(fingerprint),
+            "simhash_bands": dedup_utils.simhash_bands(fingerprint),
+        }
+
+    @staticmethod
+    def requirement_fields(profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Fields that job requirements are matched against, derived from a profile."""
+        return {
+            "requirement_terms": sorted(set(term_utils.profile_terms(profile))),
+            "certification_terms": sorted(set(term_utils.certification_terms(profile))),
+            "years_experience": term_utils.experience_years(profile),
+            "requirement_fields_version": term_utils.REQUIREMENT_FIELDS_VERSION,
+        }
+
+    @staticmethod
+    async def backfill_requirement_fields(batch_size: int = 500) -> int:
+        """
+        Recomputes the requirement fields of candidates stored before they
+        existed or with an older REQUIREMENT_FIELDS_VERSION, from their
+        standardized profile. Returns the number of candidates updated.
+        """
+        try:
+            collection = Candidate.get_motor_collection()
+            cursor = collection.find(
+                {"requirement_fields_version": {"$ne": term_utils.REQUIREMENT_FIELDS_VERSION}},
+                {"standardized_profile": 1},
+            )
+            updated = 0
+            operations: List[UpdateOne] = []
+            async for doc in cursor:
+                fields = CandidateDAO.requirement_fields(doc.get("standardized_profile") or {})
+                operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+                if len(operations) >= batch_size:
+                    await collection.bulk_write(operations, ordered=False)
+                    updated += len(operations)
+                    operations = []
+            if operations:
+                await collection.bulk_write(operations, ordered=False)
+                updated += len(operations)
+            return updated
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def find_ids_meeting_requirements(requirements: JobRequirements) -> Set[str]:
+        """
+        Ids of candidates meeting every required skill and certification (any
+        term of each, see term_utils.requirement_groups) with enough years of
+        experience, in one indexed query. Candidates whose years could not be
+        parsed from their profile pass the years requirement rather than being
+        dropped from every match.
+        """
+        try:
+            conditions: List[Dict[str, Any]] = [
+                {"requirement_terms": {"$in": terms}}
+                for terms in term_utils.requirement_groups(requirements.skills)
+            ]
+            conditions += [
+                {"certification_terms": {"$in": terms}}
+                for terms in term_utils.requirement_groups(requirements.certifications)
+            ]
+            if requirements.min_years_experience:
+                conditions.append(
+                    {
+                        "$or": [
+                            {"years_experience": {"$gte": requirements.min_years_experience}},
+                            {"years_experience": None},
+                        ]
+                    }
+                )
+            query: Dict[str, Any] = {"$and": conditions} if conditions else {}
+            cursor = Candidate.get_motor_collection().find(query, {"_id": 1})
+            return {str(doc["_id"]) async for doc in cursor}
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def find_duplicate(
+        full_text: str, max_distance: int = 3
+    ) -> Optional[Tuple[Candidate, str]]:
+        """
+        Looks for an existing candidate with the same resume text.
+
+        Returns (candidate, "exact") on a content-hash match, (candidate, "near")
+        when a SimHash fingerprint is within `max_distance` bits, otherwise None.
+        Band lookups only find every fingerprint within
+        dedup_utils.MAX_NEAR_DUPLICATE_DISTANCE bits, so a larger
+        `max_distance` raises ValueError.
+        """
+        try:
+            if max_distance > dedup_utils.MAX_NEAR_DUPLICATE_DISTANCE:
+                raise ValueError(
+                    f"Near-duplicate distance {max_distance} exceeds "
+                    f"{dedup_utils.MAX_NEAR_DUPLICATE_DISTANCE}, the most that "
+                    f"{dedup_utils.SIMHASH_BANDS} SimHash bands can find"
+                )
+            fields = CandidateDAO.fingerprint(full_text)
+            if not fields:
+                return None
+            exact = await Candidate.find_one(
+                Candidate.content_hash == fields["content_hash"]
+            )
+            if exact:
+                return exact, "exact"
+
+            fingerprint = int(fields["simhash"], 16)
+            best: Optional[Tuple[int, PydanticObjectId]] = None
+            # Band hits can be many; only their fingerprints are loaded.
+            cursor = Candidate.get_motor_collection().find(
+                {"simhash_bands": {"$in": fields["simhash_bands"]}}, {"simhash": 1}
+            )
+            async for doc in cursor:
+                if not doc.get("simhash"):
+                    continue
+                distance = dedup_utils.hamming_distance(fingerprint, int(doc["simhash"], 16))
+                if distance <= max_distance and (best is None or distance < best[0]):
+                    best = (distance, doc["_id"])
+            if best is None:
+                return None
+            candidate = await Candidate.get(best[1])
+            return (candidate, "near") if candidate else None
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def merge_candidate(
+        candidate: Candidate, name: str, profile: Dict[str, Any], full_text: str
+    ) -> Candidate:
+        """Refreshes an existing candidate with a newer upload of the same resume."""
+        try:
+            candidate.name = name
+            candidate.standardized_profile = profile
+            candidate.full_text = full_text
+            for field, value in CandidateDAO.fingerprint(full_text).items():
+                setattr(candidate, field, value)
+            for field, value in CandidateDAO.requirement_fields(profile).items():
+                setattr(candidate, field, value)
+            await candidate.save()
+            await CandidateDAO.stamp_profile_update(candidate.id)  # type: ignore
+            return candidate
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def stamp_profile_update(candidate_id: PydanticObjectId):
+        """Sets profile_updated_at from the database clock, shared by every process."""
+        try:
+            await Candidate.get_motor_collection().update_one(
+                {"_id": candidate_id}, {"$currentDate": {"profile_updated_at": True}}
+            )
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def latest_profile_update() -> Optional[datetime]:
+        try:
+            doc = await Candidate.get_motor_collection().find_one(
+                {"profile_updated_at": {"$ne": None}},
+                {"profile_updated_at": 1},
+                sort=[("profile_updated_at", -1)],
+            )
+            return doc["profile_updated_at"] if doc else None
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def iter_profiles_updated_since(
+        since: Optional[datetime],
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yields (candidate id, standardized profile) of the candidates whose
+        profile was written at or after `since` (all stamped ones if None).
+        """
+        updated_at: Dict[str, Any] = {"$gte": since} if since is not None else {"$ne": None}
+        cursor = Candidate.get_motor_collection().find(
+            {"profile_updated_at": updated_at}, {"standardized_profile": 1}
         )
+        async for doc in cursor:
+            yield str(doc["_id"]), doc.get("standardized_profile") or {}
+
+    @staticmethod
+    async def set_embedding_version(candidate_id: PydanticObjectId, version: str):
+        try:
+            await Candidate.find_one(Candidate.id == candidate_id).update(
+                {"$set": {"embedding_version": version}}
+            )
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def count_stale_embeddings(version: str) -> int:
+        """Candidates whose vectors were stored under another projection version."""
+        try:
+            current = [None, "none"] if version == "none" else [version]
+            return await Candidate.find({"embedding_version": {"$nin": current}}).count()
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def get_candidates_by_ids(
+        ids: List[PydanticObjectId], projection_model: Optional[Type[BaseModel]] = None
+    ) -> Dict[PydanticObjectId, Any]:
+        """
+        Fetches many candidates in a single $in query, keyed by id.
+        Pass a projection model to load only its fields (e.g. skip full_text).
+        """
+        try:
+            if not ids:
+                return {}
+            query = Candidate.find(In(Candidate.id, ids))
+            if projection_model is not None:
+                query = query.project(projection_model)  # type: ignore
+            return {doc.id: doc for doc in await query.to_list()}
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def get_candidates_page(
+        after: Optional[PydanticObjectId] = None,
+        limit: int = 100,
+        job_id: Optional[PydanticObjectId] = None,
+        projection_model: Optional[Type[BaseModel]] = None,
+    ) -> Tuple[List[Any], Optional[PydanticObjectId]]:
+        """
+        Keyset-paginated candidate listing ordered by _id, optionally for one job.
+        Returns the page and the cursor for the next page (None on the last page).
+        """
+        try:
+            filters = []
+            if job_id is not None:
+                filters.append(Candidate.job_id == job_id)
+            if after is not None:
+                filters.append(Candidate.id > after)
+            query = Candidate.find(*filters).sort(+Candidate.id).limit(limit + 1)  # type: ignore
+            if projection_model is not None:
+                query = query.project(projection_model)  # type: ignore
+            page = await query.to_list()
+            if len(page) > limit:
+                return page[:limit], page[limit - 1].id
+            return page, None
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def iter_candidates(
+        job_id: Optional[PydanticObjectId] = None,
+        projection_model: Optional[Type[BaseModel]] = None,
+        batch_size: int = 500,
+        after: Optional[PydanticObjectId] = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Yields every candidate (with an id greater than `after`, if given) page
+        by page, so memory stays bounded by batch_size.
+        """
+        while True:
+            page, after = await CandidateDAO.get_candidates_page(
+                after=after,
+                limit=batch_size,
+                job_id=job_id,
+                projection_model=projection_model,
+            )
+            for candidate in page:
+                yield candidate
+            if after is None:
+                return
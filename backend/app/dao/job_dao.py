@@ -1,13 +1,19 @@
 from beanie import PydanticObjectId
-from typing import Optional
-from app.db.models import Job
+from beanie.operators import In
+from pydantic import BaseModel
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type
+from app.db.models import Job, ProcessingStatus
 
 
 class JobDAO:
 
     @staticmethod
-    async def create_job(title: str, description: str) -> Job:
-        job = Job(title=title, description=description)
+    async def create_job(
+        title: str,
+        description: str,
+        status: ProcessingStatus = ProcessingStatus.COMPLETED,
+    ) -> Job:
+        job = Job(title=title, description=description, status=status)
         await job.insert()
         return job
 
@@ -19,8 +25,80 @@ class JobDAO:
             raise e
 
     @staticmethod
-    async def get_all_jobs():
+    async def get_jobs_by_ids(
+        ids: List[PydanticObjectId], projection_model: Optional[Type[BaseModel]] = None
+    ) -> Dict[PydanticObjectId, Any]:
+        """Fetches many jobs in a single $in query, keyed by id."""
         try:
-            return await Job.find_all().to_list()
+            if not ids:
+                return {}
+            query = Job.find(In(Job.id, ids))
+            if projection_model is not None:
+                query = query.project(projection_model)  # type: ignore
+            return {doc.id: doc for doc in await query.to_list()}
         except Exception as e:
             raise e
+
+    @staticmethod
+    async def get_materialized_job_ids() -> List[PydanticObjectId]:
+        """Open jobs whose JobMatch rows are kept up to date as candidates arrive."""
+        try:
+            cursor = Job.get_motor_collection().find(
+                {
+                    "status": {"$in": [ProcessingStatus.PROCESSING, ProcessingStatus.COMPLETED]},
+                    "matches_materialized_at": {"$ne": None},
+                    "matches_stale": {"$ne": True},
+                },
+                {"_id": 1},
+            )
+            return [doc["_id"] async for doc in cursor]
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def count_stale_embeddings(version: str) -> int:
+        """Processed jobs whose vectors were stored under another projection version."""
+        try:
+            current = [None, "none"] if version == "none" else [version]
+            return await Job.find(
+                {"embedding_version": {"$nin": current}, "status": ProcessingStatus.COMPLETED}
+            ).count()
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def get_jobs_page(
+        after: Optional[PydanticObjectId] = None,
+        limit: int = 100,
+        projection_model: Optional[Type[BaseModel]] = None,
+    ) -> Tuple[List[Any], Optional[PydanticObjectId]]:
+        """
+        Keyset-paginated job listing ordered by _id.
+        Returns the page and the cursor for the next page (None on the last page).
+        """
+        try:
+            query = Job.find(Job.id > after) if after is not None else Job.find_all()
+            query = query.sort(+Job.id).limit(limit + 1)  # type: ignore
+            if projection_model is not None:
+                query = query.project(projection_model)  # type: ignore
+            page = await query.to_list()
+            if len(page) > limit:
+                return page[:limit], page[limit - 1].id
+            return page, None
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def iter_jobs(
+        projection_model: Optional[Type[BaseModel]] = None, batch_size: int = 500
+    ) -> AsyncIterator[Any]:
+        """Yields every job page by page, so memory stays bounded by batch_size."""
+        after = None
+        while True:
+            page, after = await JobDAO.get_jobs_page(
+                after=after, limit=batch_size, projection_model=projection_model
+            )
+            for job in page:
+                yield job
+            if after is None:
+                return
@@ -0,0 +1,152 @@
+from datetime import datetime
+from beanie import PydanticObjectId
+from pymongo import UpdateOne
+from typing import List, Optional, Tuple
+from app.db.models import Job, JobMatch
+
+
+class MatchDAO:
+
+    @staticmethod
+    async def upsert_job_scores(
+        job_id: PydanticObjectId,
+        scores: List[Tuple[PydanticObjectId, float]],
+        strategy: str,
+    ):
+        """Stores (candidate_id, score) pairs for one job, replacing all its older rows."""
+        try:
+            await MatchDAO._bulk_upsert(
+                [(job_id, candidate_id, score) for candidate_id, score in scores], strategy
+            )
+            await JobMatch.get_motor_collection().delete_many(
+                {
+                    "job_id": job_id,
+                    "candidate_id": {"$nin": [candidate_id for candidate_id, _ in scores]},
+                }
+            )
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def upsert_candidate_scores(
+        candidate_id: PydanticObjectId,
+        scores: List[Tuple[PydanticObjectId, float]],
+        strategy: str,
+        limit: int,
+    ):
+        """
+        Stores (job_id, score) pairs for one candidate, only for the jobs whose
+        top `limit` rows it enters, and trims those jobs back to `limit` rows.
+        The candidate's rows for the other jobs are removed.
+        """
+        try:
+            collection = JobMatch.get_motor_collection()
+            job_ids = [job_id for job_id, _ in scores]
+            cutoffs = {
+                group["_id"]: group["scores"][limit - 1]
+                async for group in collection.aggregate(
+                    [
+                        {"$match": {"job_id": {"$in": job_ids}}},
+                        {"$sort": {"score": -1}},
+                        {"$group": {"_id": "$job_id", "scores": {"$push": "$score"}}},
+                        {"$match": {f"scores.{limit - 1}": {"$exists": True}}},
+                    ]
+                )
+            }
+            entering = [
+                (job_id, score)
+                for job_id, score in scores
+                if job_id not in cutoffs or score > cutoffs[job_id]
+            ]
+            await MatchDAO._bulk_upsert(
+                [(job_id, candidate_id, score) for job_id, score in entering], strategy
+            )
+            # A re-uploaded candidate's older, higher score must not linger.
+            entered = {job_id for job_id, _ in entering}
+            await collection.delete_many(
+                {
+                    "candidate_id": candidate_id,
+                    "job_id": {"$in": [job_id for job_id in job_ids if job_id not in entered]},
+                }
+            )
+            for job_id, _ in entering:
+                if job_id in cutoffs:
+                    await MatchDAO.trim_job(job_id, limit)
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def trim_job(job_id: PydanticObjectId, limit: int):
+        """Deletes a job's rows below its top `limit` scores."""
+        try:
+            collection = JobMatch.get_motor_collection()
+            cursor = collection.find({"job_id": job_id}, {"_id": 1}).sort("score", -1).skip(limit)
+            extra = [doc["_id"] async for doc in cursor]
+            if extra:
+                await collection.delete_many({"_id": {"$in": extra}})
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def _bulk_upsert(
+        rows: List[Tuple[PydanticObjectId, PydanticObjectId, float]], strategy: str
+    ):
+        try:
+            if not rows:
+                return
+            now = datetime.utcnow()
+            operations = [
+                UpdateOne(
+                    {"job_id": job_id, "candidate_id": candidate_id},
+                    {
+                        "$set": {
+                            "score": score,
+                            "strategy": strategy,
+                            "updated_at": now,
+                        }
+                    },
+                    upsert=True,
+                )
+                for job_id, candidate_id, score in rows
+            ]
+            await JobMatch.get_motor_collection().bulk_write(operations, ordered=False)
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def get_top_matches(
+        job_id: PydanticObjectId, top_n: int
+    ) -> List[JobMatch]:
+        try:
+            return (
+                await JobMatch.find(JobMatch.job_id == job_id)
+                .sort(-JobMatch.score)  # type: ignore
+                .limit(top_n)
+                .to_list()
+            )
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def mark_job_materialized(job_id: PydanticObjectId):
+        """From now on the job's matches are read from its JobMatch rows."""
+        try:
+            await Job.find_one(Job.id == job_id).update(
+                {"$set": {"matches_materialized_at": datetime.utcnow(), "matches_stale": False}}
+            )
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def mark_jobs_stale(job_ids: Optional[List[PydanticObjectId]] = None):
+        """
+        Flags the rows of `job_ids` (or of every job) as incomplete, e.g. missing
+        a candidate whose scoring failed, so those jobs are matched live.
+        """
+        try:
+            query: dict = {} if job_ids is None else {"_id": {"$in": job_ids}}
+            await Job.get_motor_collection().update_many(
+                query, {"$set": {"matches_stale": True}}
+            )
+        except Exception as e:
+            raise e
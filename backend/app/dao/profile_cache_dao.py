@@ -0,0 +1,50 @@
+from typing import Any, Dict, Optional
+from pymongo.errors import DuplicateKeyError
+from app.db.models import StandardizedProfileCache
+
+
+class ProfileCacheDAO:
+
+    @staticmethod
+    async def get_profile(
+        content_hash: str, prompt_version: str
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            entry = await StandardizedProfileCache.find_one(
+                StandardizedProfileCache.content_hash == content_hash,
+                StandardizedProfileCache.prompt_version == prompt_version,
+            )
+            return entry.profile if entry else None
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def save_profile(
+        content_hash: str, prompt_version: str, profile: Dict[str, Any]
+    ):
+        try:
+            await StandardizedProfileCache(
+                content_hash=content_hash,
+                prompt_version=prompt_version,
+                profile=profile,
+            ).insert()
+        except DuplicateKeyError:
+            # Another upload of the same resume finished first.
+            pass
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def delete_profiles(keep_version: Optional[str] = None) -> int:
+        """Deletes cached profiles, keeping only `keep_version` when it is given."""
+        try:
+            if keep_version is None:
+                query = StandardizedProfileCache.find_all()
+            else:
+                query = StandardizedProfileCache.find(
+                    StandardizedProfileCache.prompt_version != keep_version
+                )
+            result = await query.delete()
+            return result.deleted_count if result else 0
+        except Exception as e:
+            raise e
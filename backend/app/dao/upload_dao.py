@@ -0,0 +1,51 @@
+from datetime import datetime
+from beanie import PydanticObjectId
+from typing import List, Optional
+from app.db.models import ProcessingStatus, ResumeUpload
+
+
+class UploadDAO:
+
+    @staticmethod
+    async def create_uploads(filenames: List[str]) -> List[ResumeUpload]:
+        try:
+            uploads = [ResumeUpload(filename=filename) for filename in filenames]
+            if uploads:
+                result = await ResumeUpload.insert_many(uploads)
+                for upload, inserted_id in zip(uploads, result.inserted_ids):
+                    upload.id = inserted_id
+            return uploads
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def get_upload(upload_id: PydanticObjectId) -> Optional[ResumeUpload]:
+        try:
+            return await ResumeUpload.get(upload_id)
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def update_status(
+        upload_id: PydanticObjectId,
+        status: ProcessingStatus,
+        candidate_id: Optional[PydanticObjectId] = None,
+        duplicate_of: Optional[PydanticObjectId] = None,
+        duplicate_kind: Optional[str] = None,
+        error_message: Optional[str] = None,
+    ):
+        try:
+            await ResumeUpload.find_one(ResumeUpload.id == upload_id).update(
+                {
+                    "$set": {
+                        "status": status,
+                        "candidate_id": candidate_id,
+                        "duplicate_of": duplicate_of,
+                        "duplicate_kind": duplicate_kind,
+                        "error_message": error_message,
+                        "updated_at": datetime.utcnow(),
+                    }
+                }
+            )
+        except Exception as e:
+            raise e
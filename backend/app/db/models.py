@@ -1,9 +1,10 @@
 # app/db/models.py
-from typing import Optional, Dict, Any
+from datetime import datetime
+from typing import Optional, Dict, Any, List
 from enum import Enum
-from pymongo import ASCENDING
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from beanie import Document, Indexed, PydanticObjectId
-from pydantic import Field
+from pydantic import BaseModel, Field
 
 
 class ProcessingStatus(str, Enum):
@@ -13,6 +14,25 @@ class ProcessingStatus(str, Enum):
     ERROR = "ERROR"
 
 
+class DuplicatePolicy(str, Enum):
+    """What to do when an uploaded resume matches an existing candidate."""
+
+    LINK = "link"  # return the existing candidate, index nothing new
+    MERGE = "merge"  # refresh the existing candidate with the new upload
+    CREATE = "create"  # always create a new candidate
+
+
+class ProfileSection(str, Enum):
+    """Standardized-profile section a candidate chunk was built from."""
+
+    SUMMARY = "summary"
+    SKILLS = "skills"
+    EXPERIENCE = "experience"
+    EDUCATION = "education"
+    CERTIFICATIONS = "certifications"
+    TEXT = "text"  # plain text split, for profiles without usable sections
+
+
 class Candidate(Document):
     name: str
     full_text: Optional[str] = None
@@ -20,15 +40,116 @@ class Candidate(Document):
     job_id: Optional[PydanticObjectId] = None
     relevance_score: Optional[float] = None
     standardized_profile: Dict[str, Any]
+    # Duplicate detection fingerprints of full_text (see utils/dedup_utils.py)
+    content_hash: Optional[str] = None
+    simhash: Optional[str] = None
+    simhash_bands: List[str] = []
+    # Fields matched against structured job requirements (see utils/term_utils.py)
+    requirement_terms: List[str] = []
+    certification_terms: List[str] = []
+    years_experience: Optional[float] = None
+    requirement_fields_version: Optional[int] = None
+    # Database clock time of the last profile write by ingestion; the keyword
+    # index refreshes from it (see services/keyword_index.py).
+    profile_updated_at: Optional[datetime] = None
+    # Projection version of the stored vectors (see services/embedding_projection.py);
+    # None for candidates embedded before projections existed ("none").
+    embedding_version: Optional[str] = None
 
     class Settings:
         name = "candidates"
+        indexes = [
+            IndexModel([("content_hash", ASCENDING)]),
+            IndexModel([("simhash_bands", ASCENDING)]),
+            IndexModel([("requirement_terms", ASCENDING)]),
+            IndexModel([("certification_terms", ASCENDING)]),
+            IndexModel([("years_experience", ASCENDING)]),
+            IndexModel([("profile_updated_at", ASCENDING)]),
+        ]
+
+
+class JobRequirements(BaseModel):
+    """Must-have requirements parsed once from a job description."""
+
+    skills: List[str] = []
+    certifications: List[str] = []
+    min_years_experience: Optional[float] = None
+
+    def is_empty(self) -> bool:
+        return not (self.skills or self.certifications or self.min_years_experience)
 
 
 class Job(Document):
     title: str
     description: Optional[str] = None
     error_message: Optional[str] = None
+    # Jobs stored before background processing existed are complete.
+    status: ProcessingStatus = ProcessingStatus.COMPLETED
+    # Set once the job's top MATCH_MATERIALIZE_LIMIT candidates have been
+    # stored; from then on new candidates entering them are added at ingestion.
+    matches_materialized_at: Optional[datetime] = None
+    # Set when incremental scoring failed (a new candidate against the jobs, or
+    # this job against the pool), so its JobMatch rows may be incomplete; the
+    # job is then matched live until it is materialized again.
+    matches_stale: bool = False
+    # Parsed by the job worker; None until then, or if parsing failed.
+    requirements: Optional[JobRequirements] = None
+    # Projection version of the stored vectors, as on Candidate.
+    embedding_version: Optional[str] = None
 
     class Settings:
         name = "jobs"  # MongoDB collection name
+
+
+class ResumeUpload(Document):
+    """Tracks one uploaded resume file while a worker ingests it."""
+
+    filename: str
+    status: ProcessingStatus = ProcessingStatus.PENDING
+    candidate_id: Optional[PydanticObjectId] = None
+    duplicate_of: Optional[PydanticObjectId] = None
+    duplicate_kind: Optional[str] = None
+    error_message: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "resume_uploads"
+
+
+class StandardizedProfileCache(Document):
+    """LLM-standardized resume profiles keyed by resume text hash and prompt version."""
+
+    content_hash: str
+    prompt_version: str
+    profile: Dict[str, Any]
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "standardized_profile_cache"
+        indexes = [
+            IndexModel(
+                [("content_hash", ASCENDING), ("prompt_version", ASCENDING)],
+                unique=True,
+            ),
+            IndexModel([("prompt_version", ASCENDING)]),
+        ]
+
+
+class JobMatch(Document):
+    """Materialized job <-> candidate relevance score, maintained incrementally."""
+
+    job_id: PydanticObjectId
+    candidate_id: PydanticObjectId
+    score: float
+    strategy: str
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "job_matches"
+        indexes = [
+            IndexModel(
+                [("job_id", ASCENDING), ("candidate_id", ASCENDING)], unique=True
+            ),
+            IndexModel([("job_id", ASCENDING), ("score", DESCENDING)]),
+        ]
@@ -1,7 +1,56 @@
-from openai import AzureOpenAI
-from typing import Literal
+import time
+from contextlib import contextmanager
+from openai import AsyncAzureOpenAI, AzureOpenAI
+from typing import Any, Dict, Literal, Optional
 
 from app.core.config import settings
+from app.llm.rate_limiter import RateLimiter, call_with_retries, create_rate_limiter
+
+
+class ProviderUsage:
+    """Request counters for a provider, used to report connection pool utilization."""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_requests = 0
+        self.total_errors = 0
+        self.total_latency_seconds = 0.0
+
+    @contextmanager
+    def track(self):
+        self.in_flight += 1
+        self.total_requests += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.total_errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.total_latency_seconds += time.perf_counter() - started
+
+    def snapshot(self, max_connections: Optional[int] = None) -> Dict[str, Any]:
+        completed = self.total_requests - self.in_flight
+        return {
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "total_requests": self.total_requests,
+            "total_errors": self.total_errors,
+            "avg_latency_ms": (
+                round(self.total_latency_seconds / completed * 1000, 2)
+                if completed
+                else None
+            ),
+            "max_connections": max_connections,
+            "utilization": (
+                round(self.in_flight / max_connections, 4)
+                if max_connections
+                else None
+            ),
+        }
 
 
 class AzureOpenAIProvider:
@@ -9,6 +58,7 @@ class AzureOpenAIProvider:
     def __init__(
         self,
         type: Literal["chat", "embedding"],
+        http_client: Optional[Any] = None,
         **kwargs,
     ) -> None:
         try:
@@ -26,17 +76,108 @@ class AzureOpenAIProvider:
                 azure_endpoint=self.azure_endpoint,  # type: ignore
                 api_key=self.api_key,
                 api_version=self.openai_api_version,
+                http_client=http_client,
             )
+            self.usage = ProviderUsage()
         except Exception as e:
             print(f"Error initializing AzureOpenAIProvider: {e}")
             raise e
 
     def embeddings(self, input, **kwargs):  # type: ignore
-        return self.client.embeddings.create(
-            input=input, model=self.deployment_name, **kwargs
-        )
+        with self.usage.track():
+            return self.client.embeddings.create(
+                input=input, model=self.deployment_name, **kwargs
+            )
 
     def chat(self, messages, **kwargs):
-        return self.client.chat.completions.create(
-            messages=messages, model=self.deployment_name, **kwargs
+        with self.usage.track():
+            return self.client.chat.completions.create(
+                messages=messages, model=self.deployment_name, **kwargs
+            )
+
+    def close(self):
+        self.client.close()
+
+
+class AsyncAzureOpenAIProvider:
+    """
+    Non-blocking counterpart of AzureOpenAIProvider built on AsyncAzureOpenAI.
+    Use this from async code paths (FastAPI handlers, the ingestion pipeline)
+    so a slow chat or embedding call never stalls the event loop.
+    """
+
+    def __init__(
+        self,
+        type: Literal["chat", "embedding"],
+        http_client: Optional[Any] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        **kwargs,
+    ) -> None:
+        try:
+            self.type = type
+            if type != "chat" and type != "embedding":
+                raise ValueError("Invalid type for llm provider")
+            if type == "chat":
+                self.deployment_name = settings.CHAT_MODEL_NAME
+            else:
+                self.deployment_name = settings.EMBEDDING_MODEL_NAME
+            self.api_key = settings.AZURE_OPENAI_API_KEY
+            self.azure_endpoint = settings.AZURE_OPENAI_ENDPOINT
+            self.openai_api_version = settings.OPENAI_API_VERSION
+            self.client = AsyncAzureOpenAI(
+                azure_endpoint=self.azure_endpoint,  # type: ignore
+                api_key=self.api_key,
+                api_version=self.openai_api_version,
+                http_client=http_client,
+                # Retries are scheduled by the shared rate limiter instead.
+                max_retries=0,
+            )
+            self.usage = ProviderUsage()
+            # Azure quotas are per deployment. The registry passes the process's
+            # limiter so that the providers of every event loop share its state.
+            if rate_limiter is not None:
+                self.rate_limiter = rate_limiter
+            elif type == "chat":
+                self.rate_limiter = create_rate_limiter(
+                    self.deployment_name,
+                    settings.CHAT_REQUESTS_PER_MINUTE,
+                    settings.CHAT_TOKENS_PER_MINUTE,
+                )
+            else:
+                self.rate_limiter = create_rate_limiter(
+                    self.deployment_name,
+                    settings.EMBEDDING_REQUESTS_PER_MINUTE,
+                    settings.EMBEDDING_TOKENS_PER_MINUTE,
+                )
+        except Exception as e:
+            print(f"Error initializing AsyncAzureOpenAIProvider: {e}")
+            raise e
+
+    async def embeddings(self, input, **kwargs):  # type: ignore
+        texts = [input] if isinstance(input, str) else input
+        estimated_tokens = sum(len(text) // 4 + 1 for text in texts)
+
+        async def call():
+            with self.usage.track():
+                return await self.client.embeddings.create(
+                    input=input, model=self.deployment_name, **kwargs
+                )
+
+        return await call_with_retries(self.rate_limiter, estimated_tokens, call)
+
+    async def chat(self, messages, **kwargs):
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in messages)
+        estimated_tokens = prompt_chars // 4 + kwargs.get(
+            "max_tokens", settings.CHAT_COMPLETION_TOKEN_ESTIMATE
         )
+
+        async def call():
+            with self.usage.track():
+                return await self.client.chat.completions.create(
+                    messages=messages, model=self.deployment_name, **kwargs
+                )
+
+        return await call_with_retries(self.rate_limiter, estimated_tokens, call)
+
+    async def close(self):
+        await self.client.close()
@@ -0,0 +1,148 @@
+# app/llm/provider_registry.py
+import asyncio
+import threading
+from typing import Any, Dict, Literal, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.llm.azure_openai_provider import AsyncAzureOpenAIProvider, AzureOpenAIProvider
+from app.llm.rate_limiter import RateLimiter
+
+
+class ProviderRegistry:
+    """
+    Process-wide holder of long-lived LLM providers.
+
+    Building an Azure OpenAI client per call means a fresh TLS handshake and
+    connection pool for every resume and job. The registry creates one
+    provider per type (chat / embedding) and flavour (sync / async), each on a
+    tuned httpx client with keep-alive, and hands the same instance back on
+    every call.
+
+    Async clients are bound to the event loop they were first used on, so
+    async providers are kept per (type, loop): the API has one loop and every
+    worker thread keeps its own (see app/tasks/process.py). Rate limiters are
+    kept per type for the life of the process and shared by all of a type's
+    providers, so every loop draws from the same quota.
+    """
+
+    def __init__(self) -> None:
+        self._sync_providers: Dict[str, AzureOpenAIProvider] = {}
+        self._async_providers: Dict[
+            Tuple[str, asyncio.AbstractEventLoop], AsyncAzureOpenAIProvider
+        ] = {}
+        self._rate_limiters: Dict[str, RateLimiter] = {}
+        self._closing: set = set()
+        # Worker threads create providers concurrently.
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _limits() -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+        )
+
+    @staticmethod
+    def _timeout() -> httpx.Timeout:
+        return httpx.Timeout(settings.LLM_HTTP_TIMEOUT, connect=10.0)
+
+    def get_provider(self, type: Literal["chat", "embedding"]) -> AzureOpenAIProvider:
+        """Returns the shared synchronous provider for `type`."""
+        with self._lock:
+            provider = self._sync_providers.get(type)
+            if provider is None:
+                provider = AzureOpenAIProvider(
+                    type=type,
+                    http_client=httpx.Client(
+                        limits=self._limits(), timeout=self._timeout()
+                    ),
+                )
+                self._sync_providers[type] = provider
+            return provider
+
+    def get_async_provider(
+        self, type: Literal["chat", "embedding"]
+    ) -> AsyncAzureOpenAIProvider:
+        """
+        Returns the async provider for `type` on the running event loop,
+        creating it on first use. Providers of loops that have been closed
+        without aclose_loop are dropped here.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            for key in [key for key in self._async_providers if key[1].is_closed()]:
+                self._close_orphaned(self._async_providers.pop(key))
+            provider = self._async_providers.get((type, loop))
+            if provider is None:
+                provider = AsyncAzureOpenAIProvider(
+                    type=type,
+                    http_client=httpx.AsyncClient(
+                        limits=self._limits(), timeout=self._timeout()
+                    ),
+                    rate_limiter=self._rate_limiters.get(type),
+                )
+                self._rate_limiters[type] = provider.rate_limiter
+                self._async_providers[(type, loop)] = provider
+            return provider
+
+    def _close_orphaned(self, provider: AsyncAzureOpenAIProvider) -> None:
+        """Closes, on the running loop, a provider whose own loop is closed."""
+
+        async def close():
+            try:
+                await provider.close()
+            except Exception as e:
+                # Connections of a closed loop cannot be shut down cleanly.
+                print("Error while closing an orphaned LLM client", e)
+
+        task = asyncio.get_running_loop().create_task(close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def aclose_loop(self) -> None:
+        """Closes the async providers of the running loop; call before closing it."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            keys = [key for key in self._async_providers if key[1] is loop]
+            providers = [self._async_providers.pop(key) for key in keys]
+        for provider in providers:
+            await provider.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Connection pool utilization for every provider created so far."""
+        max_connections = settings.LLM_HTTP_MAX_CONNECTIONS
+        report: Dict[str, Any] = {}
+        with self._lock:
+            for type, provider in self._sync_providers.items():
+                report[f"sync_{type}"] = provider.usage.snapshot(max_connections)
+            counts: Dict[str, int] = {}
+            for (type, _), provider in self._async_providers.items():
+                n = counts[type] = counts.get(type, 0) + 1
+                key = f"async_{type}" if n == 1 else f"async_{type}_{n}"
+                report[key] = provider.usage.snapshot(max_connections)
+        return report
+
+    async def aclose(self) -> None:
+        """Closes the sync providers and the running loop's async providers."""
+        with self._lock:
+            sync_providers = list(self._sync_providers.values())
+            self._sync_providers.clear()
+        for provider in sync_providers:
+            provider.close()
+        await self.aclose_loop()
+
+# Singleton instance to be used across the application
+provider_registry = ProviderRegistry()
+
+
+def get_provider(type: Literal["chat", "embedding"]) -> AzureOpenAIProvider:
+    return provider_registry.get_provider(type)
+
+
+def get_async_provider(
+    type: Literal["chat", "embedding"],
+) -> AsyncAzureOpenAIProvider:
+    return provider_registry.get_async_provider(type)
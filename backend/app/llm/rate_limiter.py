@@ -0,0 +1,319 @@
+# app/llm/rate_limiter.py
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+
+from app.core.config import settings
+
+
+class RequestPriority(IntEnum):
+    """Lower values are served first when the quota is contended."""
+
+    INTERACTIVE = 0  # user-facing requests, e.g. job creation
+    BULK = 10  # batch resume ingestion
+
+
+# Priority of LLM calls made from the current task; bulk code paths set BULK.
+request_priority: ContextVar[int] = ContextVar(
+    "llm_request_priority", default=RequestPriority.INTERACTIVE
+)
+
+
+class TokenBucket:
+    """Continuously refilling bucket: `capacity` units per minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        # A single request larger than the bucket waits for a full bucket.
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float):
+        # Negative amounts refund over-estimated usage.
+        self.level = min(self.capacity, self.level - amount)
+
+
+class LocalQuota:
+    """
+    Requests and tokens buckets held in this process. Thread-safe and not tied
+    to an event loop, so every task of a process draws on the same buckets.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    async def reserve(self, tokens: int) -> float:
+        """Takes one request of `tokens` if it fits; otherwise the seconds to wait."""
+        with self._lock:
+            self.requests.refill()
+            self.tokens.refill()
+            wait = max(
+                self._paused_until - time.monotonic(),
+                self.requests.time_until(1),
+                self.tokens.time_until(tokens),
+            )
+            if wait <= 0:
+                self.requests.consume(1)
+                self.tokens.consume(tokens)
+            return wait
+
+    async def adjust(self, tokens: int):
+        with self._lock:
+            self.tokens.consume(tokens)
+
+    async def pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+# KEYS: requests bucket, tokens bucket, pause marker.
+# ARGV: requests/min, tokens/min, tokens to take (0 = only refill and report),
+#       tokens to adjust by, seconds to pause for.
+# Returns the seconds to wait ("0" once the request was taken), as a string
+# because Redis truncates Lua numbers to integers.
+_REDIS_QUOTA_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local rpm, tpm = tonumber(ARGV[1]), tonumber(ARGV[2])
+local take, adjust, pause = tonumber(ARGV[3]), tonumber(ARGV[4]), tonumber(ARGV[5])
+
+local function level(key, capacity)
+    local stored = tonumber(redis.call('HGET', key, 'level') or capacity)
+    local updated = tonumber(redis.call('HGET', key, 'updated') or now)
+    return math.min(capacity, stored + (now - updated) * capacity / 60)
+end
+
+local requests = level(KEYS[1], rpm)
+local tokens = math.min(tpm, level(KEYS[2], tpm) - adjust)
+local paused_until = tonumber(redis.call('GET', KEYS[3]) or 0)
+if pause > 0 and now + pause > paused_until then
+    paused_until = now + pause
+    redis.call('SET', KEYS[3], tostring(paused_until), 'EX', math.ceil(pause) + 1)
+end
+
+local wait = 0
+if take > 0 then
+    wait = math.max(
+        paused_until - now,
+        (1 - requests) * 60 / rpm,
+        (math.min(take, tpm) - tokens) * 60 / tpm
+    )
+    if wait <= 0 then
+        requests = requests - 1
+        tokens = tokens - take
+    end
+end
+redis.call('HSET', KEYS[1], 'level', tostring(requests), 'updated', tostring(now))
+redis.call('HSET', KEYS[2], 'level', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], 120)
+redis.call('EXPIRE', KEYS[2], 120)
+return tostring(math.max(wait, 0))
+"""
+
+
+class RedisQuota:
+    """
+    Requests and tokens buckets kept in Redis, so the API and every worker
+    process enforce one quota per deployment between them. Each operation is
+    a single atomic script using the Redis server's clock.
+    """
+
+    def __init__(
+        self, url: str, name: str, requests_per_minute: float, tokens_per_minute: float
+    ):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.script = self.client.register_script(_REDIS_QUOTA_SCRIPT)
+        prefix = f"hire_caliber:llm_quota:{name}"
+        self.keys = [f"{prefix}:requests", f"{prefix}:tokens", f"{prefix}:paused"]
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+    def _run(self, take: int = 0, adjust: int = 0, pause: float = 0.0) -> float:
+        wait = self.script(
+            keys=self.keys,
+            args=[self.requests_per_minute, self.tokens_per_minute, take, adjust, pause],
+        )
+        return float(wait)
+
+    async def reserve(self, tokens: int) -> float:
+        # At least one token, so the script tells a reservation from an adjustment.
+        return await asyncio.to_thread(self._run, take=max(1, tokens))
+
+    async def adjust(self, tokens: int):
+        await asyncio.to_thread(self._run, adjust=tokens)
+
+    async def pause(self, seconds: float):
+        await asyncio.to_thread(self._run, pause=seconds)
+
+
+class RateLimiter:
+    """
+    Shared requests-per-minute and tokens-per-minute limiter with priority
+    scheduling. Waiters are served strictly in (priority, arrival) order, so
+    interactive calls overtake queued bulk work without starving it forever
+    once the interactive queue drains.
+
+    The quota itself lives in `quota` (LocalQuota or RedisQuota); only the
+    waiting queue is per event loop. Ordering by priority holds within a
+    process, while processes sharing a RedisQuota take capacity as it frees up.
+    """
+
+    def __init__(self, quota: Union[LocalQuota, RedisQuota]):
+        self.quota = quota
+        self._queues: Dict[asyncio.AbstractEventLoop, Tuple[asyncio.Condition, list]] = {}
+        self._sequence = itertools.count()
+
+    def _queue(self) -> Tuple[asyncio.Condition, list]:
+        """The condition and waiting queue of the running event loop."""
+        loop = asyncio.get_running_loop()
+        entry = self._queues.get(loop)
+        if entry is None:
+            for stale in [l for l in self._queues if l.is_closed()]:
+                del self._queues[stale]
+            entry = (asyncio.Condition(), [])
+            self._queues[loop] = entry
+        return entry
+
+    async def acquire(self, tokens: int, priority: Optional[int] = None):
+        """Waits until one request of roughly `tokens` tokens fits the quota."""
+        if priority is None:
+            priority = request_priority.get()
+        condition, queue = self._queue()
+        entry = [priority, next(self._sequence), tokens]
+        async with condition:
+            heapq.heappush(queue, entry)
+            try:
+                while True:
+                    wait = None
+                    if queue[0] is entry:
+                        wait = await self.quota.reserve(tokens)
+                        if wait <= 0:
+                            heapq.heappop(queue)
+                            condition.notify_all()
+                            return
+                    try:
+                        await asyncio.wait_for(condition.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                if entry in queue:
+                    queue.remove(entry)
+                    heapq.heapify(queue)
+                    condition.notify_all()
+                raise
+
+    async def settle(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Corrects the token bucket once the real usage of a call is known."""
+        if actual_tokens is not None and actual_tokens != estimated_tokens:
+            await self.quota.adjust(actual_tokens - estimated_tokens)
+
+    async def pause(self, seconds: float):
+        """Stops handing out capacity for `seconds` (after a 429)."""
+        await self.quota.pause(seconds)
+
+
+def create_rate_limiter(
+    name: str, requests_per_minute: int, tokens_per_minute: int
+) -> RateLimiter:
+    """
+    A limiter for the deployment `name`. With LLM_RATE_LIMIT_REDIS_URL the
+    quota is shared through Redis; otherwise this process enforces its
+    1 / LLM_RATE_LIMIT_PROCESSES share of it.
+    """
+    if settings.LLM_RATE_LIMIT_REDIS_URL:
+        return RateLimiter(
+            RedisQuota(
+                settings.LLM_RATE_LIMIT_REDIS_URL,
+                name,
+                requests_per_minute,
+                tokens_per_minute,
+            )
+        )
+    processes = max(1, settings.LLM_RATE_LIMIT_PROCESSES)
+    return RateLimiter(
+        LocalQuota(requests_per_minute / processes, tokens_per_minute / processes)
+    )
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Reads Retry-After (or Azure's retry-after-ms) from a rate limit error."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+async def call_with_retries(
+    limiter: RateLimiter,
+    estimated_tokens: int,
+    call: Callable[[], Awaitable[Any]],
+) -> Any:
+    """
+    Runs `call` under the limiter, retrying 429s and transient failures with
+    exponential backoff and full jitter. A Retry-After hint pauses the whole
+    limiter, since every caller shares the same quota.
+    """
+    priority = request_priority.get()
+    for attempt in range(settings.LLM_MAX_RETRIES + 1):
+        await limiter.acquire(estimated_tokens, priority)
+        try:
+            response = await call()
+            usage = getattr(response, "usage", None)
+            await limiter.settle(estimated_tokens, getattr(usage, "total_tokens", None))
+            return response
+        except RateLimitError as e:
+            if attempt == settings.LLM_MAX_RETRIES:
+                raise e
+            retry_after = retry_after_seconds(e)
+            if retry_after is not None:
+                await limiter.pause(retry_after)
+            delay = max(retry_after or 0.0, _backoff(attempt))
+        except (APIConnectionError, APITimeoutError, InternalServerError) as e:
+            if attempt == settings.LLM_MAX_RETRIES:
+                raise e
+            delay = _backoff(attempt)
+        print(f"LLM call failed (attempt {attempt + 1}), retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+
+def _backoff(attempt: int) -> float:
+    ceiling = min(
+        settings.LLM_RETRY_MAX_DELAY, settings.LLM_RETRY_BASE_DELAY * 2**attempt
+    )
+    return random.uniform(0, ceiling)
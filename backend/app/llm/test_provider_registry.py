@@ -0,0 +1,84 @@
+# app/llm/test_provider_registry.py
+import asyncio
+import threading
+
+import pytest
+
+from app.core.config import settings
+from app.llm.provider_registry import ProviderRegistry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(settings, "AZURE_OPENAI_ENDPOINT", "https://example.invalid")
+    monkeypatch.setattr(settings, "AZURE_OPENAI_API_KEY", "key")
+    return ProviderRegistry()
+
+
+def test_one_provider_per_loop_sharing_the_rate_limiter(registry):
+    async def get_twice():
+        provider = registry.get_async_provider("embedding")
+        assert registry.get_async_provider("embedding") is provider
+        return provider
+
+    providers = []
+    closed_while_running = []
+    both = threading.Barrier(2)
+
+    def worker():
+        async def run():
+            both.wait()
+            providers.append(await get_twice())
+            both.wait()  # both loops are still open here
+            closed_while_running.extend(p.client.is_closed() for p in providers)
+
+        asyncio.run(run())
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    first, second = providers
+    assert first is not second
+    assert first.rate_limiter is second.rate_limiter
+    assert closed_while_running == [False] * 4
+
+
+def test_aclose_loop_closes_only_the_running_loops_providers(registry):
+    other = asyncio.new_event_loop()
+    try:
+        kept = other.run_until_complete(_get(registry))
+
+        async def get_and_close():
+            provider = registry.get_async_provider("chat")
+            await registry.aclose_loop()
+            return provider
+
+        closed = asyncio.run(get_and_close())
+        assert closed.client.is_closed()
+        assert not kept.client.is_closed()
+        assert registry.metrics().keys() == {"async_chat"}
+    finally:
+        other.run_until_complete(registry.aclose_loop())
+        other.close()
+    assert kept.client.is_closed()
+
+
+def test_providers_of_closed_loops_are_dropped(registry):
+    first = asyncio.run(_get(registry))
+
+    async def get_after_a_turn():
+        provider = registry.get_async_provider("chat")
+        await asyncio.sleep(0)  # let the orphaned client's close run
+        return provider
+
+    second = asyncio.run(get_after_a_turn())
+    assert second is not first
+    assert first.client.is_closed()
+    assert registry.metrics().keys() == {"async_chat"}
+
+
+async def _get(registry):
+    return registry.get_async_provider("chat")
@@ -0,0 +1,69 @@
+# app/llm/test_rate_limiter.py
+import asyncio
+import time
+
+from app.core.config import settings
+from app.llm.rate_limiter import (
+    LocalQuota,
+    RateLimiter,
+    RequestPriority,
+    create_rate_limiter,
+)
+
+
+def test_quota_is_shared_across_event_loops():
+    limiter = RateLimiter(LocalQuota(requests_per_minute=2, tokens_per_minute=1_000))
+
+    async def call():
+        await limiter.acquire(10)
+
+    # Two tasks, each on its own loop, use up the process's requests together.
+    asyncio.run(call())
+    asyncio.run(call())
+
+    async def third():
+        return await limiter.quota.reserve(10)
+
+    assert asyncio.run(third()) > 0
+
+
+def test_local_quota_is_split_between_processes(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_RATE_LIMIT_REDIS_URL", "")
+    monkeypatch.setattr(settings, "LLM_RATE_LIMIT_PROCESSES", 4)
+    limiter = create_rate_limiter("deployment", 400, 100_000)
+    assert limiter.quota.requests.capacity == 100
+    assert limiter.quota.tokens.capacity == 25_000
+
+
+def test_settle_refunds_over_estimated_tokens():
+    limiter = RateLimiter(LocalQuota(requests_per_minute=100, tokens_per_minute=1_000))
+
+    async def run():
+        await limiter.acquire(800)
+        await limiter.settle(800, 100)
+
+    asyncio.run(run())
+    assert limiter.quota.tokens.level > 850
+
+
+def test_interactive_requests_are_served_before_bulk():
+    limiter = RateLimiter(LocalQuota(requests_per_minute=600, tokens_per_minute=1_000_000))
+    limiter.quota.requests.level = 0  # refills one request every 0.1s
+    order = []
+
+    async def call(name, priority):
+        await limiter.acquire(1, priority)
+        order.append(name)
+
+    async def run():
+        bulk = [
+            asyncio.create_task(call(f"bulk{i}", RequestPriority.BULK)) for i in range(2)
+        ]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(call("interactive", RequestPriority.INTERACTIVE))
+        await asyncio.gather(*bulk, interactive)
+
+    started = time.monotonic()
+    asyncio.run(run())
+    assert order[0] == "interactive"
+    assert time.monotonic() - started < 5
@@ -7,10 +7,38 @@ from beanie import init_beanie
 from app.core.config import settings
 from app.db.models import Candidate, Job
 from backend.app.api import job_routes  # Import the router modules
+from app.dao.candidate_dao import CandidateDAO
+from app.dao.job_dao import JobDAO
 from app.db_clients.mongo_client import init_mongo
+from app.services.embedding_projection import get_projection
+from app.llm.provider_registry import provider_registry
+from app.services.text_extraction import shutdown_extraction_executor
+from app.tasks.process import tasks_run_in_process
 from backend.app.api import candidate_routes
 
 
+async def report_stale_embeddings():
+    """Warns about documents whose vectors predate the configured projection."""
+    version = get_projection().version
+    candidates = await CandidateDAO.count_stale_embeddings(version)
+    jobs = await JobDAO.count_stale_embeddings(version)
+    if candidates or jobs:
+        print(
+            f"{candidates} candidates and {jobs} jobs were embedded with another "
+            f"projection than {version!r} and are not searchable until re-ingested."
+        )
+
+
+async def backfill_requirement_fields():
+    """
+    Derives requirement fields for candidates stored before they existed (or
+    by an older parser) before any match request filters on them.
+    """
+    updated = await CandidateDAO.backfill_requirement_fields()
+    if updated:
+        print(f"Recomputed requirement fields of {updated} candidates.")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -19,10 +47,17 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     try:
+        tasks_run_in_process()  # fails fast on an unusable broker setup
         await init_mongo()
+        await backfill_requirement_fields()
+        await report_stale_embeddings()
         yield
     except Exception as e:
         raise
+    finally:
+        # Shutdown: release pooled LLM connections and extraction workers
+        await provider_registry.aclose()
+        shutdown_extraction_executor()
 
 
 app = FastAPI(
@@ -44,3 +79,9 @@ app.include_router(job_routes.router, prefix="/api")
 @app.get("/", tags=["Root"])
 def read_root():
     return {"message": "Welcome to the Intelligent Talent Acquisition API"}
+
+
+@app.get("/api/metrics/llm-pool", tags=["Root"])
+def llm_pool_metrics():
+    """Reports utilization of the pooled Azure OpenAI clients."""
+    return provider_registry.metrics()
@@ -3,7 +3,7 @@ from click import Option
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from beanie import PydanticObjectId
-from app.db.models import ProcessingStatus  # Reuse the enum
+from app.db.models import JobRequirements, ProcessingStatus  # Reuse the enum
 
 
 class DocumentStatusResponse(BaseModel):
@@ -12,6 +12,16 @@ class DocumentStatusResponse(BaseModel):
     error: Optional[str] = None
 
 
+class ResumeUploadStatusResponse(DocumentStatusResponse):
+    filename: str
+    candidate_id: Optional[PydanticObjectId] = None
+    duplicate_of: Optional[PydanticObjectId] = None
+    duplicate_kind: Optional[str] = None
+
+    class Config:
+        json_encoders = {PydanticObjectId: str}
+
+
 class CandidateResponse(BaseModel):
     id: PydanticObjectId = Field(..., alias="_id")
     name: str
@@ -22,10 +32,21 @@ class CandidateResponse(BaseModel):
         json_encoders = {PydanticObjectId: str}  # Serialize ObjectId to string for JSON
 
 
+class CandidateSummary(BaseModel):
+    id: PydanticObjectId = Field(..., alias="_id")
+    name: str
+
+    class Config:
+        populate_by_name = True
+        json_encoders = {PydanticObjectId: str}
+
+
 class JobResponse(BaseModel):
     id: PydanticObjectId = Field(..., alias="_id")
     title: str
     description: str
+    status: Optional[ProcessingStatus] = None
+    requirements: Optional[JobRequirements] = None
 
     class Config:
         populate_by_name = True
@@ -41,3 +62,40 @@ class MatchResult(BaseModel):
     class Config:
         populate_by_name = True
         json_encoders = {PydanticObjectId: str}
+
+
+class JobMatchesRequest(BaseModel):
+    job_ids: List[PydanticObjectId] = Field(..., min_length=1, max_length=1000)
+
+
+class JobMatches(BaseModel):
+    """One line of the batch job matching stream."""
+
+    job_id: PydanticObjectId
+    matches: List[MatchResult] = []
+    error: Optional[str] = None
+
+    class Config:
+        json_encoders = {PydanticObjectId: str}
+
+
+class JobMatchResult(BaseModel):
+    id: PydanticObjectId = Field(..., alias="_id")
+    title: str
+    relevance_score: Optional[Any] = None
+
+    class Config:
+        populate_by_name = True
+        json_encoders = {PydanticObjectId: str}
+
+
+class CandidateMatchesRequest(BaseModel):
+    candidate_ids: List[PydanticObjectId] = Field(..., min_length=1, max_length=500)
+
+
+class CandidateJobMatches(BaseModel):
+    candidate_id: PydanticObjectId
+    matches: List[JobMatchResult]
+
+    class Config:
+        json_encoders = {PydanticObjectId: str}
@@ -1,11 +1,21 @@
+import asyncio
 from typing import List, Tuple, TypeVar, Union
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from io import BytesIO
 
 from torch import chunk
-from unstructured.partition.auto import partition
-from app.db.chromadb import candidates_collection, jobs_collection
-from app.llm.azure_openai_provider import AzureOpenAIProvider
+from app.llm.azure_openai_provider import AsyncAzureOpenAIProvider
+from app.llm.provider_registry import get_async_provider
+from app.core.config import settings
+from app.services.embedding_batcher import get_embedding_batcher
+from app.services.embedding_cache import get_embedding_cache
+from app.services.embedding_projection import get_projection
+from app.db.models import ProfileSection
+from app.utils import file_utils, profile_chunker
+from app.vector_store.repository import (
+    CANDIDATES_COLLECTION,
+    JOBS_COLLECTION,
+    vector_repository,
+)
 
 
 class DocumentProcessor:
@@ -25,62 +35,129 @@ class DocumentProcessor:
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size, chunk_overlap=chunk_overlap
         )
-        self.embedding_client = AzureOpenAIProvider(type="embedding")
 
         print("DocumentProcessor initialized to use Azure OpenAI embeddings.")
 
+    @property
+    def embedding_client(self) -> AsyncAzureOpenAIProvider:
+        """The shared, pooled embedding provider from the process-wide registry."""
+        return get_async_provider("embedding")
+
+    async def embed_chunks(self, chunks: List[str]) -> List[List[float]]:
+        """
+        Embeds text chunks, serving repeats from the embedding cache.
+        Only cache misses are sent to the embedding API. The cache holds raw
+        model vectors; the configured projection is applied to the result.
+        """
+        projection = get_projection()
+        cache = get_embedding_cache()
+        if cache is None:
+            return projection.project(await self._request_embeddings(chunks))
+
+        model = self.embedding_client.deployment_name
+        embeddings = await asyncio.to_thread(cache.get_many, model, chunks)
+        missing = [i for i, vector in enumerate(embeddings) if vector is None]
+        if missing:
+            missing_texts = [chunks[i] for i in missing]
+            fresh = await self._request_embeddings(missing_texts)
+            for i, vector in zip(missing, fresh):
+                embeddings[i] = vector
+            await asyncio.to_thread(cache.put_many, model, missing_texts, fresh)
+        print(f"Embedding cache: {len(chunks) - len(missing)} hits, {len(missing)} misses.")
+        return projection.project(embeddings)  # type: ignore
+
+    async def _request_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Sends texts to the embedding API, packed with other documents' chunks when batching is on."""
+        if settings.EMBEDDING_BATCHING_ENABLED:
+            return await get_embedding_batcher().embed(texts)
+        response = await self.embedding_client.embeddings(input=texts)
+        return [item.embedding for item in response.data]
+
     def parse_document(self, file_bytes: bytes, filename: str) -> str:
         """Parses document bytes into clean text using unstructured."""
         try:
-            if isinstance(file_bytes, bytes):
-                file_stream = BytesIO(file_bytes)
-            else:
-                file_stream = file_bytes
-            elements = partition(file=file_stream, file_filename=filename)
-            return "\n\n".join([str(el) for el in elements])
+            return file_utils.extract_text_with_unstructured(file_bytes, filename)
         except Exception as e:
             raise e
 
-    def process_and_embed(self, doc_id: str, text: str, doc_type: str):
+    async def process_and_embed_profile(
+        self, doc_id: str, profile: dict, fallback_text: str = ""
+    ) -> List[List[float]]:
+        """
+        Embeds a standardized resume profile chunked along its sections (see
+        app/utils/profile_chunker.py). Each chunk's metadata records its
+        `section`, so queries can be filtered to e.g. skills or experience.
+        Profiles without usable sections fall back to splitting `fallback_text`.
+        """
         try:
-            chunks = self.text_splitter.split_text(text)
+            profile_chunks = profile_chunker.chunk_profile(profile)
+            chunks: List[str] = []
+            metadata_list: List[dict] = []
+            for profile_chunk in profile_chunks:
+                # Only unusually long sections are split further.
+                parts = (
+                    self.text_splitter.split_text(profile_chunk.text)
+                    if len(profile_chunk.text) > settings.PROFILE_CHUNK_MAX_CHARS
+                    else [profile_chunk.text]
+                )
+                for part in parts:
+                    chunks.append(part)
+                    metadata_list.append(
+                        {
+                            **profile_chunk.metadata,
+                            "section": profile_chunk.section.value,
+                        }
+                    )
+            if not chunks:
+                chunks = self.text_splitter.split_text(fallback_text)
+                metadata_list = [{"section": ProfileSection.TEXT.value} for _ in chunks]
 
             if not chunks:
-                print("No chunks were generated from the document.")
-                return [], []
+                print("No chunks were generated from the profile.")
+                return []
 
-            response = self.embedding_client.embeddings(input=chunks)
-            embeddings = [item.embedding for item in response.data]
+            embeddings = await self.embed_chunks(chunks)
             print(f"Successfully generated {len(embeddings)} embeddings.")
-            if embeddings:
-                metadata_list = [
-                    {"document_id": doc_id, "document_type": doc_type, "chunk_num": i}
-                    for i in range(len(chunks))
-                ]
-                chunk_ids = [f"{doc_id}_{i}" for i in range(len(chunks))]
-
-                # Add to ChromaDB
-                candidates_collection.add(
-                    ids=chunk_ids,
-                    embeddings=embeddings,
-                    metadatas=metadata_list,
-                    documents=chunks,
+            for i, metadata in enumerate(metadata_list):
+                metadata.update(
+                    {"document_id": doc_id, "document_type": "resume", "chunk_num": i}
                 )
-
+            # Add to the vector store (the HTTP client is blocking, keep it off the loop)
+            await asyncio.to_thread(
+                vector_repository.upsert,
+                CANDIDATES_COLLECTION,
+                ids=[f"{doc_id}_{i}" for i in range(len(chunks))],
+                embeddings=embeddings,
+                metadatas=metadata_list,
+                documents=chunks,
+            )
             return embeddings
         except Exception as e:
             raise e
 
-    def process_and_embed_jobs(self, doc_id: str, text: str, doc_type: str):
+    async def delete_embeddings(self, doc_id: str):
+        """Removes every chunk of a candidate document from the vector store."""
+        await asyncio.to_thread(
+            vector_repository.delete, CANDIDATES_COLLECTION, where={"document_id": doc_id}
+        )
+
+    async def process_and_embed_jobs(self, doc_id: str, text: str, doc_type: str):
+        """
+        Embeds a job description, replacing every chunk stored for it before:
+        a shorter new text must not leave old higher-numbered chunks behind.
+        """
         try:
             chunks = self.text_splitter.split_text(text)
+            embeddings = await self.embed_chunks(chunks) if chunks else []
+            # Only once the new embeddings exist, so a failure keeps the old ones.
+            await asyncio.to_thread(
+                vector_repository.delete, JOBS_COLLECTION, where={"document_id": doc_id}
+            )
 
             if not chunks:
                 print("No chunks were generated from the document.")
                 return [], []
 
-            response = self.embedding_client.embeddings(input=chunks)
-            embeddings = [item.embedding for item in response.data]
             print(f"Successfully generated {len(embeddings)} embeddings.")
             if embeddings:
                 metadata_list = [
@@ -89,8 +166,10 @@ class DocumentProcessor:
                 ]
                 chunk_ids = [f"{doc_id}_{i}" for i in range(len(chunks))]
 
-                # Add to ChromaDB
-                jobs_collection.add(
+                # Add to the vector store (the HTTP client is blocking, keep it off the loop)
+                await asyncio.to_thread(
+                    vector_repository.upsert,
+                    JOBS_COLLECTION,
                     ids=chunk_ids,
                     embeddings=embeddings,
                     metadatas=metadata_list,
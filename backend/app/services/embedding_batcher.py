@@ -0,0 +1,141 @@
+# app/services/embedding_batcher.py
+import asyncio
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+from app.llm.provider_registry import get_async_provider
+from app.llm.rate_limiter import request_priority
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) used for request packing."""
+    return len(text) // 4 + 1
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces embedding requests from many concurrent documents.
+
+    Callers await `embed(texts)`; their texts are queued and, once
+    `max_batch_inputs` / `max_batch_tokens` worth of input is waiting or
+    `max_wait` has elapsed, packed into as few embedding API requests as the
+    limits allow. Each vector is scattered back to the caller that asked for it.
+    """
+
+    def __init__(
+        self,
+        max_batch_inputs: int = settings.EMBEDDING_BATCH_MAX_INPUTS,
+        max_batch_tokens: int = settings.EMBEDDING_BATCH_MAX_TOKENS,
+        max_wait: float = settings.EMBEDDING_BATCH_MAX_WAIT_MS / 1000,
+    ):
+        self.max_batch_inputs = max(1, max_batch_inputs)
+        self.max_batch_tokens = max(1, max_batch_tokens)
+        self.max_wait = max_wait
+        # (text, tokens, priority, future, loop time by which it is sent)
+        self._pending: List[Tuple[str, int, int, asyncio.Future, float]] = []
+        self._pending_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: set = set()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        priority = request_priority.get()
+        deadline = loop.time() + self.max_wait
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            tokens = estimate_tokens(text)
+            self._pending.append((text, tokens, priority, future, deadline))
+            self._pending_tokens += tokens
+            futures.append(future)
+
+        if (
+            len(self._pending) >= self.max_batch_inputs
+            or self._pending_tokens >= self.max_batch_tokens
+        ):
+            self._flush(full_only=True)
+        if self._pending and self._timer is None:
+            self._timer = loop.call_at(self._pending[0][4], self._flush)
+        return list(await asyncio.gather(*futures))
+
+    def _flush(self, full_only: bool = False):
+        """
+        Packs pending texts into requests. With `full_only` the trailing,
+        not-yet-full request stays queued for more texts or until the deadline
+        of its oldest text.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._pending_tokens = self._pending, [], 0
+
+        batch: List[Tuple[str, int, int, asyncio.Future, float]] = []
+        batch_tokens = 0
+        for entry in pending:
+            if batch and (
+                len(batch) >= self.max_batch_inputs
+                or batch_tokens + entry[1] > self.max_batch_tokens
+            ):
+                self._send(batch)
+                batch, batch_tokens = [], 0
+            batch.append(entry)
+            batch_tokens += entry[1]
+        if not batch:
+            return
+        if (
+            full_only
+            and len(batch) < self.max_batch_inputs
+            and batch_tokens < self.max_batch_tokens
+        ):
+            self._pending, self._pending_tokens = batch, batch_tokens
+            self._timer = asyncio.get_running_loop().call_at(batch[0][4], self._flush)
+        else:
+            self._send(batch)
+
+    def _send(self, batch: List[Tuple[str, int, int, asyncio.Future, float]]):
+        task = asyncio.get_running_loop().create_task(self._request(batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _request(self, batch: List[Tuple[str, int, int, asyncio.Future, float]]):
+        # A shared request is scheduled at the most urgent priority it serves.
+        request_priority.set(min(priority for _, _, priority, _, _ in batch))
+        try:
+            response = await get_async_provider("embedding").embeddings(
+                input=[text for text, _, _, _, _ in batch]
+            )
+            vectors = [item.embedding for item in response.data]
+            if len(vectors) != len(batch):
+                raise ValueError(
+                    f"Embedding API returned {len(vectors)} vectors for {len(batch)} inputs"
+                )
+            for (_, _, _, future, _), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+        except Exception as e:
+            for _, _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # Cancelled (e.g. on shutdown): callers must not wait forever.
+            for _, _, _, future, _ in batch:
+                if not future.done():
+                    future.cancel()
+
+
+_batchers: dict = {}
+
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """Returns the batcher for the running event loop (futures are loop-bound)."""
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(loop)
+    if batcher is None:
+        # Drop batchers of loops that have since been closed (e.g. worker tasks).
+        for stale in [l for l in _batchers if l.is_closed()]:
+            del _batchers[stale]
+        batcher = EmbeddingBatcher()
+        _batchers[loop] = batcher
+    return batcher
@@ -0,0 +1,143 @@
+# app/services/embedding_cache.py
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed cache of embedding vectors.
+
+    Entries are keyed by sha256(model name + chunk text) and stored as float32
+    blobs in a local SQLite file. The cache is bounded by entry count and
+    evicts the least recently used vectors once it grows past `max_entries`.
+    Several processes may share the file, so the entry count is read inside
+    each write transaction rather than tracked per process.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Returns the cached vector for each text, or None where it is a miss."""
+        keys = [self.make_key(model, text) for text in texts]
+        found = {}
+        with self._lock:
+            # SQLite caps bound parameters per statement, so look up in slices.
+            for start in range(0, len(keys), 500):
+                batch = keys[start : start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+        return [
+            np.frombuffer(found[key], dtype=np.float32).tolist() if key in found else None
+            for key in keys
+        ]
+
+    def put_many(
+        self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]
+    ):
+        now = time.time()
+        rows = [
+            (
+                self.make_key(model, text),
+                model,
+                np.asarray(vector, dtype=np.float32).tobytes(),
+                now,
+            )
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so no other process can
+            # insert between the count and the eviction.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (key, model, vector, last_access) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._evict()
+                self._conn.commit()
+            except Exception as e:
+                self._conn.rollback()
+                raise e
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def _evict(self):
+        overflow = self._count() - self.max_entries
+        if overflow <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+            (overflow,),
+        )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Returns the process-wide embedding cache, or None when caching is disabled."""
+    global _embedding_cache
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return None
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(
+            path=settings.EMBEDDING_CACHE_PATH,
+            max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+        )
+    return _embedding_cache
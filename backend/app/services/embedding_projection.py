@@ -0,0 +1,130 @@
+# app/services/embedding_projection.py
+import hashlib
+import os
+from enum import Enum
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+
+class ProjectionKind(str, Enum):
+    """How embeddings are reduced before they are stored and searched."""
+
+    NONE = "none"  # store the model's vectors as they are
+    TRUNCATE = "truncate"  # keep a prefix (Matryoshka-trained models only)
+    PCA = "pca"  # project onto principal components fitted on the corpus
+
+
+class EmbeddingProjection:
+    """
+    Maps raw model embeddings to the vectors kept in the vector store.
+
+    Projected vectors are re-normalized to unit length, so distances stay on
+    the same scale as the model's own (unit-length) embeddings. `version`
+    identifies the projection: vectors made with another version are not
+    comparable, which is why the vector repository keeps them in separate
+    collections (see VectorRepository.collection_name).
+    """
+
+    def __init__(
+        self,
+        kind: ProjectionKind = ProjectionKind.NONE,
+        dims: Optional[int] = None,
+        mean: Optional[np.ndarray] = None,
+        components: Optional[np.ndarray] = None,
+    ):
+        self.kind = kind
+        self.dims = dims
+        self.mean = mean
+        self.components = components
+        if kind == ProjectionKind.NONE:
+            self.version = "none"
+        elif kind == ProjectionKind.TRUNCATE:
+            self.version = f"truncate{dims}"
+        else:
+            digest = hashlib.sha256(np.ascontiguousarray(components).tobytes()).hexdigest()
+            self.version = f"pca{dims}-{digest[:8]}"
+
+    def apply(self, vectors: Sequence[Sequence[float]]) -> np.ndarray:
+        """Projects a batch of raw embeddings (one per row)."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.kind == ProjectionKind.NONE:
+            return vectors
+        if self.kind == ProjectionKind.TRUNCATE:
+            if vectors.shape[1] < self.dims:  # type: ignore
+                raise ValueError(
+                    f"Cannot truncate {vectors.shape[1]}-dimensional embeddings to {self.dims}"
+                )
+            projected = vectors[:, : self.dims]
+        else:
+            projected = (vectors - self.mean) @ self.components.T  # type: ignore
+        norms = np.linalg.norm(projected, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (projected / norms).astype(np.float32)
+
+    def project(self, vectors: Sequence[Sequence[float]]) -> list:
+        """`apply` for the list-of-lists form the vector store clients take."""
+        if self.kind == ProjectionKind.NONE:
+            return list(vectors)
+        return self.apply(vectors).tolist()
+
+    @staticmethod
+    def fit_pca(vectors: np.ndarray, dims: int) -> "EmbeddingProjection":
+        """Fits a PCA projection keeping the `dims` highest-variance components."""
+        vectors = np.asarray(vectors, dtype=np.float64)
+        if dims > vectors.shape[1]:
+            raise ValueError(f"Cannot keep {dims} of {vectors.shape[1]} dimensions")
+        mean = vectors.mean(axis=0)
+        centered = vectors - mean
+        covariance = centered.T @ centered / max(1, len(vectors) - 1)
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        top = np.argsort(eigenvalues)[::-1][:dims]
+        return EmbeddingProjection(
+            ProjectionKind.PCA,
+            dims=dims,
+            mean=mean.astype(np.float32),
+            components=np.ascontiguousarray(eigenvectors[:, top].T, dtype=np.float32),
+        )
+
+    def save(self, path: str):
+        """Writes a PCA projection to an .npz file."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez(f, mean=self.mean, components=self.components)
+
+    @staticmethod
+    def load_pca(path: str) -> "EmbeddingProjection":
+        with np.load(path) as data:
+            components = data["components"]
+            return EmbeddingProjection(
+                ProjectionKind.PCA,
+                dims=components.shape[0],
+                mean=data["mean"],
+                components=components,
+            )
+
+
+_projection: Optional[EmbeddingProjection] = None
+
+
+def get_projection() -> EmbeddingProjection:
+    """
+    Returns the process-wide projection configured by EMBEDDING_PROJECTION.
+    A PCA projection is read from EMBEDDING_PROJECTION_PATH, written by
+    `python -m app.benchmarks.projection fit`.
+    """
+    global _projection
+    if _projection is None:
+        kind = ProjectionKind(settings.EMBEDDING_PROJECTION)
+        if kind == ProjectionKind.PCA:
+            if not os.path.exists(settings.EMBEDDING_PROJECTION_PATH):
+                raise RuntimeError(
+                    f"EMBEDDING_PROJECTION is pca but {settings.EMBEDDING_PROJECTION_PATH} "
+                    "does not exist; fit it with `python -m app.benchmarks.projection fit`"
+                )
+            _projection = EmbeddingProjection.load_pca(settings.EMBEDDING_PROJECTION_PATH)
+        else:
+            _projection = EmbeddingProjection(kind, dims=settings.EMBEDDING_PROJECTION_DIMS)
+    return _projection
@@ -0,0 +1,350 @@
+# app/services/exact_matching.py
+import asyncio
+import time
+from enum import Enum
+from typing import Collection, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.db.models import ProfileSection
+from app.services.score_aggregation import (
+    AggregationStrategy,
+    JobChunks,
+    reduce_chunk_scores,
+)
+from app.vector_store.repository import CANDIDATES_COLLECTION, vector_repository
+
+_SECTION_CODES = {section.value: code for code, section in enumerate(ProfileSection)}
+
+
+class Quantization(str, Enum):
+    """How the in-memory candidate matrix stores each (normalized) vector."""
+
+    NONE = "none"  # float32, 4 bytes per dimension
+    FLOAT16 = "float16"  # 2 bytes per dimension
+    INT8 = "int8"  # 1 byte per dimension plus one float32 scale per vector
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Contiguous float32 copy of `vectors` with every row scaled to unit length."""
+    vectors = np.array(vectors, dtype=np.float32, order="C")
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    vectors /= norms
+    return vectors
+
+
+def quantize(
+    vectors: np.ndarray, quantization: Quantization = Quantization.NONE
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Normalizes `vectors` and stores them as `quantization`. Returns the data and,
+    for int8, the per-vector scales (a row is approximately data * scale).
+    """
+    vectors = normalize_rows(vectors)
+    if quantization == Quantization.NONE:
+        return vectors, None
+    if quantization == Quantization.FLOAT16:
+        return vectors.astype(np.float16), None
+    scales = np.abs(vectors).max(axis=1) / 127 if len(vectors) else np.zeros(0)
+    scales = scales.astype(np.float32)
+    scales[scales == 0] = 1.0
+    data = np.rint(vectors / scales[:, np.newaxis]).astype(np.int8)
+    return data, scales
+
+
+class CandidateMatrix:
+    """
+    Every candidate chunk embedding in one contiguous, L2-normalized matrix
+    (float32, or quantized, see `quantize`), with rows grouped by candidate.
+    `owner_idx` maps each row to its candidate in `owners`; per-row section
+    codes back the same filters as MatchingService.candidate_chunk_filter.
+    """
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        scales: Optional[np.ndarray],
+        owner_ids: Sequence[str],
+        sections: Sequence[Optional[str]],
+        record_count: int = 0,
+    ):
+        """`data` and `scales` as returned by `quantize`, one row per owner id."""
+        self.record_count = record_count
+        self.owners, owner_idx = np.unique(
+            np.asarray(owner_ids, dtype=str), return_inverse=True
+        )
+        order = np.argsort(owner_idx, kind="stable")
+        self.owner_idx = owner_idx[order].astype(np.int32)
+        self.matrix = np.ascontiguousarray(np.asarray(data)[order])
+        self.scales = scales[order] if scales is not None else None
+        self.quantization = (
+            Quantization.INT8
+            if scales is not None
+            else Quantization.FLOAT16
+            if self.matrix.dtype == np.float16
+            else Quantization.NONE
+        )
+        self.sections = np.asarray(
+            [_SECTION_CODES.get(section, -1) for section in sections], dtype=np.int8
+        )[order]
+        self.owner_pos = {str(owner): i for i, owner in enumerate(self.owners)}
+
+    @classmethod
+    def from_vectors(
+        cls,
+        vectors: np.ndarray,
+        owner_ids: Sequence[str],
+        sections: Sequence[Optional[str]],
+        quantization: Quantization = Quantization.NONE,
+    ) -> "CandidateMatrix":
+        return cls(*quantize(vectors, quantization), owner_ids, sections)
+
+    def __len__(self) -> int:
+        return len(self.owner_idx)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the vectors (and int8 scales)."""
+        return self.matrix.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def _similarities(self, queries: np.ndarray, rows) -> np.ndarray:
+        """Cosine similarities of normalized `queries` with the given matrix rows."""
+        block = self.matrix[rows]
+        if self.quantization == Quantization.NONE:
+            return queries @ block.T
+        similarities = queries @ block.astype(np.float32).T
+        if self.scales is not None:
+            similarities *= self.scales[rows][np.newaxis, :]
+        return similarities
+
+    def select_rows(
+        self,
+        sections: Optional[List[ProfileSection]] = None,
+        candidate_ids: Optional[Collection[str]] = None,
+    ) -> Optional[np.ndarray]:
+        """Rows passing the filters, in matrix order; None when every row passes."""
+        mask: Optional[np.ndarray] = None
+        if sections:
+            mask = np.isin(self.sections, [_SECTION_CODES[s.value] for s in sections])
+        if candidate_ids is not None:
+            wanted = np.zeros(len(self.owners), dtype=bool)
+            wanted[[self.owner_pos[c] for c in candidate_ids if c in self.owner_pos]] = True
+            owner_mask = wanted[self.owner_idx]
+            mask = owner_mask if mask is None else mask & owner_mask
+        return None if mask is None else np.flatnonzero(mask)
+
+    def _blocks(self, owner_idx: np.ndarray) -> List[Tuple[int, int]]:
+        """Row ranges of about EXACT_MATCH_BLOCK_ROWS that never split a candidate."""
+        starts = np.flatnonzero(np.r_[True, owner_idx[1:] != owner_idx[:-1]])
+        block = max(1, settings.EXACT_MATCH_BLOCK_ROWS)
+        cut_idx = np.searchsorted(starts, np.arange(0, len(owner_idx), block))
+        cuts = np.unique(starts[cut_idx[cut_idx < len(starts)]]).tolist()
+        cuts.append(len(owner_idx))
+        return list(zip(cuts[:-1], cuts[1:]))
+
+    def rank(
+        self,
+        job_chunks: Dict[str, JobChunks],
+        top_n: int = 10,
+        strategy: AggregationStrategy = AggregationStrategy.MAX_SIM,
+        top_k: int = 3,
+        sections: Optional[List[ProfileSection]] = None,
+        candidate_ids: Optional[Collection[str]] = None,
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Exact top `top_n` candidates for each job.
+
+        The chunks of all jobs are normalized and stacked into one query matrix,
+        which is multiplied with the candidate matrix one block of rows at a
+        time (one GEMM per block). Within a block, `np.maximum.reduceat` takes
+        the best chunk of every candidate for every job chunk, `strategy`
+        reduces that across the job's chunks, and `np.argpartition` keeps the
+        block's top `top_n`; the per-block winners are merged at the end.
+
+        Scores are 1 - squared L2 distance between the normalized vectors
+        (= 2 * cosine - 1), the similarity the vector store path reports for
+        unit-length embeddings such as Azure OpenAI's. On a quantized matrix
+        they are approximate; see ExactMatchEngine for the rescoring pass.
+        """
+        job_ids = list(job_chunks)
+        rows = self.select_rows(sections, candidate_ids)
+        if not job_ids or len(self) == 0 or (rows is not None and len(rows) == 0):
+            return {job_id: [] for job_id in job_ids}
+
+        queries = normalize_rows(np.concatenate([job_chunks[j][0] for j in job_ids]))
+        bounds = np.cumsum([0] + [len(job_chunks[j][0]) for j in job_ids])
+        owner_idx = self.owner_idx if rows is None else self.owner_idx[rows]
+        winners: Dict[str, List[Tuple[np.ndarray, np.ndarray]]] = {j: [] for j in job_ids}
+
+        for start, stop in self._blocks(owner_idx):
+            block = slice(start, stop) if rows is None else rows[start:stop]
+            block_owners = owner_idx[start:stop]
+            segments = np.flatnonzero(np.r_[True, block_owners[1:] != block_owners[:-1]])
+            # job chunks x candidates: best chunk similarity per candidate
+            best = np.maximum.reduceat(
+                self._similarities(queries, block), segments, axis=1
+            )
+            best = 2 * best - 1
+            candidates = block_owners[segments]
+            for j, job_id in enumerate(job_ids):
+                scores = reduce_chunk_scores(
+                    best[bounds[j] : bounds[j + 1]].T,
+                    strategy=strategy,
+                    top_k=top_k,
+                    query_weights=job_chunks[job_id][1],
+                )
+                if len(scores) > top_n:
+                    keep = np.argpartition(-scores, top_n - 1)[:top_n]
+                    winners[job_id].append((candidates[keep], scores[keep]))
+                else:
+                    winners[job_id].append((candidates, scores))
+
+        ranked: Dict[str, List[Tuple[str, float]]] = {}
+        for job_id, parts in winners.items():
+            candidates = np.concatenate([c for c, _ in parts])
+            scores = np.concatenate([s for _, s in parts])
+            order = np.argsort(-scores, kind="stable")[:top_n]
+            ranked[job_id] = [
+                (str(self.owners[candidates[i]]), float(scores[i])) for i in order
+            ]
+        return ranked
+
+
+class ExactMatchEngine:
+    """
+    Process-wide CandidateMatrix, loaded lazily from the candidates collection
+    and stored as EXACT_MATCH_QUANTIZATION.
+
+    On a quantized matrix, matching is two-pass: the quantized vectors shortlist
+    EXACT_MATCH_RESCORE_CANDIDATES candidates per job, whose full-precision
+    vectors are then fetched from the vector store and scored exactly.
+
+    The vector store's record count is checked at most every
+    EXACT_MATCH_REFRESH_SECONDS; the matrix is reloaded when the count changed
+    (candidates ingested or removed by any process) and at least every
+    EXACT_MATCH_REBUILD_SECONDS, which also picks up re-embedded candidates.
+    """
+
+    def __init__(self):
+        self.matrix: Optional[CandidateMatrix] = None
+        self.built_at = 0.0
+        self.checked_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def load(
+        candidate_ids: Optional[Collection[str]] = None,
+        quantization: Quantization = Quantization.NONE,
+    ) -> CandidateMatrix:
+        """
+        Reads the resume chunks (of `candidate_ids`, or all) from the vector
+        store page by page, quantizing each page as it arrives (blocking).
+        """
+        parts: List[Tuple[np.ndarray, Optional[np.ndarray]]] = []
+        owner_ids: List[str] = []
+        sections: List[Optional[str]] = []
+        record_count = vector_repository.candidates.count() if candidate_ids is None else 0
+        where: dict = {"document_type": "resume"}
+        if candidate_ids is not None:
+            where = {"$and": [where, {"document_id": {"$in": sorted(candidate_ids)}}]}
+        page = max(1, settings.EXACT_MATCH_LOAD_PAGE_SIZE)
+        offset = 0
+        while True:
+            data = vector_repository.get(
+                CANDIDATES_COLLECTION,
+                where=where,
+                include=["embeddings", "metadatas"],
+                limit=page,
+                offset=offset,
+            )
+            embeddings = data.get("embeddings")
+            if embeddings is None or len(embeddings) == 0:
+                break
+            parts.append(quantize(np.asarray(embeddings, dtype=np.float32), quantization))
+            for metadata in data["metadatas"]:  # type: ignore
+                owner_ids.append(metadata["document_id"])
+                sections.append(metadata.get("section"))
+            if len(embeddings) < page:
+                break
+            offset += page
+        if not parts:
+            parts.append(quantize(np.zeros((0, 0), dtype=np.float32), quantization))
+        return CandidateMatrix(
+            np.concatenate([data for data, _ in parts]),
+            None if parts[0][1] is None else np.concatenate([s for _, s in parts]),  # type: ignore
+            owner_ids,
+            sections,
+            record_count,
+        )
+
+    async def ensure_fresh(self) -> CandidateMatrix:
+        now = time.monotonic()
+        if (
+            self.matrix is not None
+            and now - self.checked_at < settings.EXACT_MATCH_REFRESH_SECONDS
+        ):
+            return self.matrix
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            # Locks are loop-bound; the API and each worker thread run their own loop.
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        async with self._lock:
+            now = time.monotonic()
+            if (
+                self.matrix is not None
+                and now - self.checked_at < settings.EXACT_MATCH_REFRESH_SECONDS
+            ):
+                return self.matrix
+            stale = (
+                self.matrix is None
+                or now - self.built_at >= settings.EXACT_MATCH_REBUILD_SECONDS
+                or await asyncio.to_thread(vector_repository.candidates.count)
+                != self.matrix.record_count
+            )
+            if stale:
+                self.matrix = await asyncio.to_thread(
+                    ExactMatchEngine.load,
+                    quantization=Quantization(settings.EXACT_MATCH_QUANTIZATION),
+                )
+                self.built_at = now
+            self.checked_at = now
+        return self.matrix  # type: ignore
+
+    async def rank_candidates_for_jobs(
+        self,
+        job_chunks: Dict[str, JobChunks],
+        top_n: int = 10,
+        strategy: AggregationStrategy = AggregationStrategy.MAX_SIM,
+        top_k: int = 3,
+        sections: Optional[List[ProfileSection]] = None,
+        candidate_ids: Optional[Collection[str]] = None,
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        matrix = await self.ensure_fresh()
+        filters = dict(sections=sections, candidate_ids=candidate_ids)
+        if matrix.quantization == Quantization.NONE:
+            return await asyncio.to_thread(
+                matrix.rank, job_chunks, top_n=top_n, strategy=strategy, top_k=top_k, **filters
+            )
+
+        shortlist = await asyncio.to_thread(
+            matrix.rank,
+            job_chunks,
+            top_n=max(top_n, settings.EXACT_MATCH_RESCORE_CANDIDATES),
+            strategy=strategy,
+            top_k=top_k,
+            **filters,
+        )
+        shortlisted = {c for ranked in shortlist.values() for c, _ in ranked}
+        if not shortlisted:
+            return shortlist
+        exact = await asyncio.to_thread(ExactMatchEngine.load, candidate_ids=shortlisted)
+        filters["candidate_ids"] = shortlisted
+        return await asyncio.to_thread(
+            exact.rank, job_chunks, top_n=top_n, strategy=strategy, top_k=top_k, **filters
+        )
+
+
+exact_match_engine = ExactMatchEngine()
@@ -0,0 +1,282 @@
+# app/services/ingestion_pipeline.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from beanie import PydanticObjectId
+from fastapi import UploadFile
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.dao.candidate_dao import CandidateDAO
+from app.db.models import Candidate, DuplicatePolicy, ProcessingStatus
+from app.llm.rate_limiter import RequestPriority, request_priority
+from app.services.document_processor import DocumentProcessor
+from app.services.embedding_projection import get_projection
+from app.services.keyword_index import keyword_index
+from app.services.matching_service import MatchingService
+from app.services import text_extraction
+from app.utils import ai_utils, dedup_utils, upload_utils
+from app.utils.upload_utils import SpooledUpload
+
+
+class IngestionItem(BaseModel):
+    """State of a single uploaded file as it moves through the pipeline."""
+
+    index: int
+    filename: str
+    upload_id: Optional[PydanticObjectId] = None
+    upload: Optional[Any] = None
+    path: Optional[str] = None  # spooled file on disk, removed once extracted
+    raw_text: Optional[str] = None
+    profile: Optional[Dict[str, Any]] = None
+    candidate: Optional[Candidate] = None
+    duplicate_of: Optional[Candidate] = None
+    duplicate_kind: Optional[str] = None  # "exact" or "near"
+    done: bool = False  # set by a stage that finished the item early
+    status: ProcessingStatus = ProcessingStatus.PENDING
+    error: Optional[str] = None
+
+    class Config:
+        arbitrary_types_allowed = True
+
+
+# Sentinel telling a stage worker that no more items will arrive.
+_STOP = object()
+
+
+class ResumeIngestionPipeline:
+    """
+    Staged, bounded-concurrency ingestion of uploaded resumes.
+
+    Each file flows through read -> extract -> standardize -> persist & embed.
+    The read stage spools uploads to disk and extractors open them by path, so
+    resident file data is bounded by stage concurrency, not by batch size.
+    Every stage has its own worker pool and the stages are connected by
+    bounded queues, so a slow stage (usually the LLM) applies backpressure to
+    the stages before it instead of letting the whole batch pile up in memory.
+    A failure in one file is recorded on that file and never aborts the batch.
+
+    Before the LLM stage every resume is checked against existing candidates
+    (exact content hash, then SimHash near-duplicates) and against the other
+    files of the same batch; `on_duplicate` decides whether a duplicate links
+    to, merges into, or ignores the existing candidate.
+    """
+
+    def __init__(
+        self,
+        processor: DocumentProcessor,
+        read_concurrency: int = settings.INGEST_READ_CONCURRENCY,
+        extract_concurrency: int = settings.INGEST_EXTRACT_CONCURRENCY,
+        standardize_concurrency: int = settings.INGEST_STANDARDIZE_CONCURRENCY,
+        embed_concurrency: int = settings.INGEST_EMBED_CONCURRENCY,
+        queue_size: int = settings.INGEST_QUEUE_SIZE,
+        on_duplicate: DuplicatePolicy = DuplicatePolicy(settings.INGEST_DUPLICATE_POLICY),
+        on_status_change: Optional[Callable[[IngestionItem], Awaitable[None]]] = None,
+    ):
+        self.processor = processor
+        self.on_duplicate = on_duplicate
+        # Called when a file starts processing and when it completes or fails.
+        self.on_status_change = on_status_change
+        # content hash -> future resolved with the candidate created for it,
+        # so identical files in one batch are only standardized once.
+        self._batch_hashes: Dict[str, asyncio.Future] = {}
+        self.queue_size = max(1, queue_size)
+        self.stages: List[Tuple[Callable[[IngestionItem], Awaitable[None]], int]] = [
+            (self._read, max(1, read_concurrency)),
+            (self._extract, max(1, extract_concurrency)),
+            (self._standardize, max(1, standardize_concurrency)),
+            (self._persist_and_embed, max(1, embed_concurrency)),
+        ]
+
+    async def run(
+        self,
+        resume_files: List[Union[UploadFile, SpooledUpload]],
+        upload_ids: Optional[List[PydanticObjectId]] = None,
+    ) -> List[IngestionItem]:
+        """Runs every file through the pipeline and returns one item per file, in upload order."""
+        items = [
+            IngestionItem(
+                index=i,
+                filename=resume_file.filename or f"resume_{i}",
+                upload=resume_file,
+                path=(
+                    resume_file.path if isinstance(resume_file, SpooledUpload) else None
+                ),
+                upload_id=upload_ids[i] if upload_ids else None,
+            )
+            for i, resume_file in enumerate(resume_files)
+        ]
+        queues: List[asyncio.Queue] = [
+            asyncio.Queue(maxsize=self.queue_size) for _ in self.stages
+        ]
+
+        async def feed():
+            for item in items:
+                await queues[0].put(item)
+            for _ in range(self.stages[0][1]):
+                await queues[0].put(_STOP)
+
+        async def run_stage(stage_index: int):
+            handler, concurrency = self.stages[stage_index]
+            next_queue = (
+                queues[stage_index + 1] if stage_index + 1 < len(queues) else None
+            )
+            workers = [
+                asyncio.create_task(
+                    self._worker(handler, queues[stage_index], next_queue)
+                )
+                for _ in range(concurrency)
+            ]
+            await asyncio.gather(*workers)
+            if next_queue is not None:
+                for _ in range(self.stages[stage_index + 1][1]):
+                    await next_queue.put(_STOP)
+
+        # Batch ingestion yields the LLM quota to interactive requests.
+        priority_token = request_priority.set(RequestPriority.BULK)
+        try:
+            await asyncio.gather(
+                feed(), *(run_stage(i) for i in range(len(self.stages)))
+            )
+        finally:
+            request_priority.reset(priority_token)
+            for item in items:
+                upload_utils.discard(item.path)
+        return items
+
+    async def _worker(
+        self,
+        handler: Callable[[IngestionItem], Awaitable[None]],
+        in_queue: asyncio.Queue,
+        out_queue: Optional[asyncio.Queue],
+    ):
+        while True:
+            item = await in_queue.get()
+            if item is _STOP:
+                return
+            try:
+                if item.status == ProcessingStatus.PENDING:
+                    item.status = ProcessingStatus.PROCESSING
+                    await self._notify(item)
+                await handler(item)
+            except Exception as e:
+                print(f"Error while ingesting {item.filename}: {e}")
+                item.status = ProcessingStatus.ERROR
+                item.error = str(e)
+
+            if item.status == ProcessingStatus.ERROR:
+                await self._notify(item)
+                continue
+            if out_queue is not None and not item.done:
+                await out_queue.put(item)
+            else:
+                item.status = ProcessingStatus.COMPLETED
+                await self._notify(item)
+
+    async def _notify(self, item: IngestionItem):
+        if self.on_status_change is None:
+            return
+        try:
+            await self.on_status_change(item)
+        except Exception as e:
+            print(f"Error while reporting status of {item.filename}: {e}")
+
+    async def _read(self, item: IngestionItem):
+        if item.path is None:
+            item.path = (await upload_utils.spool_upload(item.upload)).path  # type: ignore
+        item.upload = None
+
+    async def _extract(self, item: IngestionItem):
+        try:
+            item.raw_text = await text_extraction.extract_text(item.path, item.filename)  # type: ignore
+        finally:
+            # The text is all later stages need; free the disk space right away.
+            upload_utils.discard(item.path)
+            item.path = None
+
+    async def _standardize(self, item: IngestionItem):
+        try:
+            if self.on_duplicate != DuplicatePolicy.CREATE:
+                await self._find_duplicate(item)
+                if item.done:
+                    return
+            profile = await ai_utils.standardize_resume(item.raw_text)  # type: ignore
+            if "error" in profile:
+                raise ValueError(profile["error"])
+            item.profile = profile
+        except Exception:
+            self._release_batch_hash(item, None)
+            raise
+
+    async def _find_duplicate(self, item: IngestionItem):
+        content_hash = dedup_utils.content_hash(item.raw_text or "")
+        pending = self._batch_hashes.get(content_hash)
+        if pending is not None:
+            # The same file appeared earlier in this batch; reuse its candidate.
+            candidate = await asyncio.shield(pending)
+            if candidate is not None:
+                item.candidate = item.duplicate_of = candidate
+                item.duplicate_kind = "exact"
+                item.done = True
+                return
+        else:
+            self._batch_hashes[content_hash] = (
+                asyncio.get_running_loop().create_future()
+            )
+
+        match = await CandidateDAO.find_duplicate(
+            item.raw_text or "", max_distance=settings.INGEST_NEAR_DUPLICATE_DISTANCE
+        )
+        if match is None:
+            return
+        item.duplicate_of, item.duplicate_kind = match
+        if self.on_duplicate == DuplicatePolicy.LINK or item.duplicate_kind == "exact":
+            # Nothing new to index: point the upload at the existing candidate.
+            item.candidate = item.duplicate_of
+            item.done = True
+            self._release_batch_hash(item, item.candidate)
+
+    def _release_batch_hash(self, item: IngestionItem, candidate: Optional[Candidate]):
+        future = self._batch_hashes.get(dedup_utils.content_hash(item.raw_text or ""))
+        if future is not None and not future.done():
+            future.set_result(candidate)
+
+    async def _persist_and_embed(self, item: IngestionItem):
+        try:
+            profile = item.profile or {}
+            name = profile.get("personal_info", {}).get("name", "Unknown Candidate")
+            if item.duplicate_of is not None:
+                # Merge a near-duplicate into the existing candidate and replace
+                # its vectors instead of growing the index.
+                item.candidate = await CandidateDAO.merge_candidate(
+                    item.duplicate_of,
+                    name=name,
+                    profile=profile,
+                    full_text=item.raw_text,  # type: ignore
+                )
+                await self.processor.delete_embeddings(str(item.candidate.id))
+            else:
+                item.candidate = await CandidateDAO.create_candidate(
+                    name=name,
+                    profile=profile,
+                    full_text=item.raw_text,
+                )
+            embeddings = await self.processor.process_and_embed_profile(
+                doc_id=str(item.candidate.id),
+                profile=profile,
+                fallback_text=item.raw_text or "",
+            )
+            await CandidateDAO.set_embedding_version(
+                item.candidate.id, get_projection().version  # type: ignore
+            )
+        finally:
+            self._release_batch_hash(item, item.candidate)
+        keyword_index.index_candidate(str(item.candidate.id), profile)
+        try:
+            await MatchingService.score_candidate_against_jobs(
+                str(item.candidate.id), embeddings
+            )
+        except Exception as e:
+            # The candidate is stored and searchable; only the precomputed
+            # scores are stale, so don't fail the upload for it.
+            print(f"Error while scoring {item.filename} against jobs: {e}")
@@ -0,0 +1,168 @@
+# app/services/keyword_index.py
+import asyncio
+import math
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.dao.candidate_dao import CandidateDAO
+from app.schemas.api_schemas import MatchResult
+from app.utils.term_utils import profile_terms, tokenize
+
+
+class BM25Index:
+    """
+    In-memory inverted index with Okapi BM25 scoring over candidate profile
+    terms. Documents can be added, replaced and removed incrementally.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.doc_terms: Dict[str, Counter] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    def add(self, doc_id: str, terms: Iterable[str]):
+        self.remove(doc_id)
+        counts = Counter(terms)
+        self.doc_terms[doc_id] = counts
+        self.doc_lengths[doc_id] = sum(counts.values())
+        self.total_length += self.doc_lengths[doc_id]
+        for term, tf in counts.items():
+            self.postings[term][doc_id] = tf
+
+    def remove(self, doc_id: str):
+        counts = self.doc_terms.pop(doc_id, None)
+        if counts is None:
+            return
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        for term in counts:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+
+    def score(
+        self, query_terms: Iterable[str], doc_ids: Optional[Set[str]] = None
+    ) -> Dict[str, float]:
+        """BM25 score of every document containing at least one query term."""
+        n_docs = len(self.doc_terms)
+        if n_docs == 0:
+            return {}
+        avg_length = self.total_length / n_docs or 1.0
+        scores: Dict[str, float] = defaultdict(float)
+        for term, query_tf in Counter(query_terms).items():
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_id, tf in posting.items():
+                if doc_ids is not None and doc_id not in doc_ids:
+                    continue
+                length = self.doc_lengths[doc_id]
+                norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                scores[doc_id] += query_tf * idf * tf * (self.k1 + 1) / norm
+        return scores
+
+    def search(
+        self, query: str, limit: int, doc_ids: Optional[Set[str]] = None
+    ) -> List[Tuple[str, float]]:
+        scores = self.score(tokenize(query), doc_ids)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def matching_all(self, requirements: Iterable[str]) -> Set[str]:
+        """Documents containing every term of every requirement (e.g. "AWS Solutions Architect")."""
+        result: Optional[Set[str]] = None
+        for requirement in requirements:
+            for term in tokenize(requirement):
+                docs = set(self.postings.get(term, {}))
+                result = docs if result is None else result & docs
+                if not result:
+                    return set()
+        return result if result is not None else set(self.doc_terms)
+
+
+class KeywordIndex:
+    """
+    Process-wide BM25 index over candidates, built lazily from MongoDB.
+
+    Candidates ingested in this process are indexed immediately. Candidates
+    created or merged by other processes (Celery workers) are picked up, at
+    most every KEYWORD_INDEX_REFRESH_SECONDS, by re-reading those whose
+    profile_updated_at (stamped by the database) is at or after the last
+    refresh's watermark minus KEYWORD_INDEX_REFRESH_OVERLAP_SECONDS. Ids are
+    not used for this: each process generates its own, so they are not in
+    commit order. A full rebuild runs every KEYWORD_INDEX_REBUILD_SECONDS.
+    """
+
+    def __init__(self):
+        self.index = BM25Index()
+        self.watermark: Optional[datetime] = None
+        self.built = False
+        self.built_at = 0.0
+        self.refreshed_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def ensure_fresh(self) -> BM25Index:
+        now = time.monotonic()
+        if self.built and now - self.refreshed_at < settings.KEYWORD_INDEX_REFRESH_SECONDS:
+            return self.index
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            # Locks are loop-bound; the API and each worker thread run their own loop.
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        async with self._lock:
+            now = time.monotonic()
+            if self.built and now - self.refreshed_at < settings.KEYWORD_INDEX_REFRESH_SECONDS:
+                return self.index
+            rebuild = (
+                not self.built
+                or now - self.built_at >= settings.KEYWORD_INDEX_REBUILD_SECONDS
+            )
+            # Read before scanning; anything stamped later is re-read next time.
+            watermark = await CandidateDAO.latest_profile_update()
+            if rebuild:
+                index = BM25Index()
+                async for candidate in CandidateDAO.iter_candidates(
+                    projection_model=MatchResult
+                ):
+                    profile = candidate.standardized_profile or {}
+                    index.add(str(candidate.id), profile_terms(profile))
+            else:
+                index = self.index
+                since = (
+                    self.watermark
+                    - timedelta(seconds=settings.KEYWORD_INDEX_REFRESH_OVERLAP_SECONDS)
+                    if self.watermark is not None
+                    else None
+                )
+                async for candidate_id, profile in CandidateDAO.iter_profiles_updated_since(
+                    since
+                ):
+                    index.add(candidate_id, profile_terms(profile))
+            self.index = index
+            self.watermark = watermark or self.watermark
+            if rebuild:
+                self.built, self.built_at = True, now
+            self.refreshed_at = now
+        return self.index
+
+    def index_candidate(self, candidate_id: str, profile: Dict[str, Any]):
+        """Adds or replaces one candidate. A no-op until the index has been built."""
+        if self.built:
+            self.index.add(candidate_id, profile_terms(profile))
+
+    def remove_candidate(self, candidate_id: str):
+        self.index.remove(candidate_id)
+
+
+keyword_index = KeywordIndex()
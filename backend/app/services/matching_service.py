@@ -1,63 +1,727 @@
+import asyncio
 import numpy as np
 
 from collections import defaultdict
+from typing import AsyncIterator, Collection, Dict, List, Optional, Set, Tuple
 from beanie import PydanticObjectId
 
-from app.db.chromadb import jobs_collection, candidates_collection
-from app.db.models import Candidate
-from app.schemas.api_schemas import MatchResult
-from app.db_clients.chroma_client import chroma_db_client
-from langchain_chroma import Chroma
+from app.core.config import settings
+from app.dao.candidate_dao import CandidateDAO
+from app.dao.job_dao import JobDAO
+from app.dao.match_dao import MatchDAO
+from app.db.models import Candidate, Job, ProfileSection
+from app.schemas.api_schemas import JobMatches, JobMatchResult, MatchResult
+from app.services.exact_matching import exact_match_engine
+from app.services.keyword_index import BM25Index, keyword_index
+from app.services.score_aggregation import (
+    AggregationStrategy,
+    FusionMethod,
+    JobChunks,
+    MatchBackend,
+    aggregate_hits,
+    aggregate_query_results,
+    fuse_rankings,
+    l2_similarity_matrix,
+)
+from app.vector_store.repository import (
+    CANDIDATES_COLLECTION,
+    JOBS_COLLECTION,
+    vector_repository,
+)
+
+
+class NoEligibleCandidatesError(ValueError):
+    """The requirement pre-filters of a job match left no candidate to rank."""
 
 
 class MatchingService:
+    # Strategy whose scores are kept in the materialized JobMatch table.
+    MATERIALIZED_STRATEGY = AggregationStrategy.MAX_SIM
+
     @staticmethod
-    async def find_matches_for_job(job_id: str, top_n: int = 10) -> list:
+    async def hydrate_matches(ranked: List[Tuple[str, float]]) -> List[MatchResult]:
+        """
+        Loads the ranked candidates with one $in query, projected to the
+        MatchResult fields, and returns them in ranking order.
+        """
+        hydrated = await MatchingService.hydrate_rankings({"": ranked})
+        return hydrated[""]
+
+    @staticmethod
+    async def hydrate_rankings(
+        rankings: Dict[str, List[Tuple[str, float]]],
+        cache: Optional[Dict[PydanticObjectId, MatchResult]] = None,
+    ) -> Dict[str, List[MatchResult]]:
+        """
+        Hydrates several rankings at once: candidates missing from `cache` are
+        loaded with a single $in query and added to it, so a cache shared across
+        calls loads every candidate once.
+        """
+        cache = {} if cache is None else cache
+        missing = list(
+            {
+                PydanticObjectId(candidate_id)
+                for ranked in rankings.values()
+                for candidate_id, _ in ranked
+            }
+            - cache.keys()
+        )
+        cache.update(
+            await CandidateDAO.get_candidates_by_ids(missing, projection_model=MatchResult)
+        )
+        hydrated: Dict[str, List[MatchResult]] = {}
+        for key, ranked in rankings.items():
+            hydrated[key] = []
+            for candidate_id, score in ranked:
+                match = cache.get(PydanticObjectId(candidate_id))
+                if match is not None:
+                    hydrated[key].append(
+                        match.model_copy(update={"relevance_score": score})
+                    )
+        return hydrated
+
+    @staticmethod
+    async def find_matches_for_job(
+        job_id: str,
+        top_n: int = 10,
+        strategy: AggregationStrategy = AggregationStrategy.MAX_SIM,
+        top_k: int = 3,
+        sections: Optional[List[ProfileSection]] = None,
+    ) -> list:
         """Finds top N candidate matches for a given job ID. (Now async)"""
         try:
-            job_embeddings_data = jobs_collection.get(
-                where={"document_id": job_id}, include=["embeddings"]
+            ranked_candidates = await MatchingService.rank_candidates_for_job(
+                job_id, top_n=top_n, strategy=strategy, top_k=top_k, sections=sections
             )
-            job_embeddings = job_embeddings_data.get("embeddings")
+            return await MatchingService.hydrate_matches(ranked_candidates[:top_n])
+        except Exception as e:
+            raise e
 
-            if job_embeddings is None or (
-                isinstance(job_embeddings, (list, np.ndarray))
-                and len(job_embeddings) == 0
-            ):
-                raise ValueError(
-                    f"No embeddings found for job ID {job_id}. Has it been processed?"
+    @staticmethod
+    async def get_matches_for_job(
+        job: Job,
+        top_n: int = 10,
+        strategy: AggregationStrategy = AggregationStrategy.MAX_SIM,
+        top_k: int = 3,
+        sections: Optional[List[ProfileSection]] = None,
+        required: Optional[List[str]] = None,
+        hybrid: Optional[bool] = None,
+        enforce_requirements: Optional[bool] = None,
+    ) -> List[MatchResult]:
+        """
+        Serves matches from the materialized JobMatch table when it covers the
+        request, and falls back to a live vector search otherwise.
+
+        With hybrid matching (HYBRID_SEARCH_ENABLED) the vector ranking is fused
+        with BM25 keyword scores of the candidates' skills, certifications and
+        titles. `required` terms (e.g. a must-have certification) pre-filter
+        both rankings to candidates whose profile contains all of them.
+
+        With `enforce_requirements` (MATCH_ENFORCE_JOB_REQUIREMENTS, off by
+        default) the job's parsed must-have requirements (skills, certifications,
+        years of experience) pre-filter candidates the same way, through an
+        indexed Mongo query. Candidates whose years of experience are unknown
+        pass the minimum years requirement. Raises NoEligibleCandidatesError
+        when a pre-filter excludes every candidate.
+        """
+        hybrid = settings.HYBRID_SEARCH_ENABLED if hybrid is None else hybrid
+        index = await keyword_index.ensure_fresh() if (hybrid or required) else None
+        allowed, ranked = await MatchingService.plan_job_match(
+            job, top_n, strategy, sections, required, hybrid, enforce_requirements, index
+        )
+        if ranked is None:
+            ranked = await MatchingService.rank_candidates_for_job(
+                str(job.id),
+                top_n=top_n,
+                strategy=strategy,
+                top_k=top_k,
+                sections=sections,
+                candidate_ids=allowed,
+            )
+        if hybrid and index is not None:
+            ranked = MatchingService.fuse_with_keywords(
+                ranked, index, f"{job.title}\n{job.description}", allowed
+            )
+        return await MatchingService.hydrate_matches(ranked[:top_n])
+
+    @staticmethod
+    async def plan_job_match(
+        job: Job,
+        top_n: int,
+        strategy: AggregationStrategy,
+        sections: Optional[List[ProfileSection]],
+        required: Optional[List[str]],
+        hybrid: bool,
+        enforce_requirements: Optional[bool],
+        index: Optional[BM25Index],
+    ) -> Tuple[Optional[Set[str]], Optional[List[Tuple[str, float]]]]:
+        """
+        The part of matching a job that needs no vector search. Returns the
+        allowed candidate ids (None when unrestricted) and the vector ranking
+        when the materialized JobMatch table covers the request. A None ranking
+        means the caller has to run a live search. Raises
+        NoEligibleCandidatesError when the pre-filters exclude every candidate.
+        """
+        if enforce_requirements is None:
+            enforce_requirements = settings.MATCH_ENFORCE_JOB_REQUIREMENTS
+        requirements = (
+            job.requirements
+            if enforce_requirements
+            and job.requirements is not None
+            and not job.requirements.is_empty()
+            else None
+        )
+        allowed = index.matching_all(required) if index is not None and required else None
+        if allowed == set():
+            raise NoEligibleCandidatesError(
+                f"No candidate has every required term: {', '.join(required or [])}."
+            )
+        if requirements is not None:
+            meeting = await CandidateDAO.find_ids_meeting_requirements(requirements)
+            allowed = meeting if allowed is None else allowed & meeting
+            if not allowed:
+                raise NoEligibleCandidatesError(
+                    "No candidate meets the job's parsed requirements "
+                    f"({requirements.model_dump_json(exclude_defaults=True)}). "
+                    "Pass enforce_requirements=false to rank all candidates."
                 )
-            results = candidates_collection.query(
-                query_embeddings=job_embeddings,
-                n_results=top_n * 5,
-                where={"document_type": "resume"},
+
+        if (
+            not sections
+            and job.matches_materialized_at is not None
+            and not job.matches_stale
+            and strategy == MatchingService.MATERIALIZED_STRATEGY
+            and top_n <= settings.MATCH_MATERIALIZE_LIMIT
+        ):
+            # Fusion and filtering need a deeper vector ranking than top_n.
+            limit = settings.MATCH_MATERIALIZE_LIMIT if (hybrid or allowed) else top_n
+            rows = await MatchDAO.get_top_matches(job.id, limit)  # type: ignore
+            ranked = [
+                (str(row.candidate_id), row.score)
+                for row in rows
+                if allowed is None or str(row.candidate_id) in allowed
+            ]
+            # Too few stored matches passing the filter means searching the whole pool.
+            if allowed is None or len(ranked) >= top_n or len(rows) < limit:
+                return allowed, ranked
+        return allowed, None
+
+    @staticmethod
+    async def stream_matches_for_jobs(
+        job_ids: List[str],
+        top_n: int = 10,
+        strategy: AggregationStrategy = AggregationStrategy.MAX_SIM,
+        top_k: int = 3,
+        sections: Optional[List[ProfileSection]] = None,
+        required: Optional[List[str]] = None,
+        hybrid: Optional[bool] = None,
+        enforce_requirements: Optional[bool] = None,
+    ) -> AsyncIterator[JobMatches]:
+        """
+        Batch form of get_matches_for_job, yielding each job's matches as soon
+        as they are ready (in completion order, not request order).
+
+        Jobs are loaded in one query and jobs served from the materialized table
+        come first. The chunk embeddings of the remaining jobs are fetched in one
+        vector store call; jobs with the same candidate filters are then ranked
+        together, MATCH_BATCH_JOBS_PER_QUERY jobs per batched vector query and
+        up to MATCH_BATCH_CONCURRENCY queries at a time. Candidates are hydrated
+        once for the whole call. A job that fails gets a result with `error` set.
+        """
+        hybrid = settings.HYBRID_SEARCH_ENABLED if hybrid is None else hybrid
+        index = await keyword_index.ensure_fresh() if (hybrid or required) else None
+        job_ids = list(dict.fromkeys(job_ids))
+        jobs = await JobDAO.get_jobs_by_ids([PydanticObjectId(job_id) for job_id in job_ids])
+        hydrated: Dict[PydanticObjectId, MatchResult] = {}
+
+        async def finish(
+            planned: List[Tuple[Job, Optional[Set[str]], List[Tuple[str, float]]]]
+        ) -> List[JobMatches]:
+            rankings = {}
+            for job, allowed, ranked in planned:
+                if hybrid and index is not None:
+                    ranked = MatchingService.fuse_with_keywords(
+                        ranked, index, f"{job.title}\n{job.description}", allowed
+                    )
+                rankings[str(job.id)] = ranked[:top_n]
+            matches = await MatchingService.hydrate_rankings(rankings, cache=hydrated)
+            return [
+                JobMatches(job_id=job_id, matches=job_matches)
+                for job_id, job_matches in matches.items()
+            ]
+
+        ready = []
+        # Jobs needing a live search, grouped by allowed candidates.
+        live: Dict[Optional[frozenset], List[Tuple[Job, Optional[Set[str]]]]] = defaultdict(list)
+        for job_id in job_ids:
+            job = jobs.get(PydanticObjectId(job_id))
+            if job is None:
+                yield JobMatches(job_id=job_id, error="Job not found.")
+                continue
+            try:
+                allowed, ranked = await MatchingService.plan_job_match(
+                    job, top_n, strategy, sections, required, hybrid, enforce_requirements, index
+                )
+            except Exception as e:
+                yield JobMatches(job_id=job_id, error=str(e))
+                continue
+            if ranked is not None:
+                ready.append((job, allowed, ranked))
+            else:
+                key = frozenset(allowed) if allowed is not None else None
+                live[key].append((job, allowed))
+        if ready:
+            for result in await finish(ready):
+                yield result
+        if not live:
+            return
+
+        job_chunks = await MatchingService.load_job_chunks(
+            [str(job.id) for group in live.values() for job, _ in group]
+        )
+        batches = []
+        size = max(1, settings.MATCH_BATCH_JOBS_PER_QUERY)
+        for group in live.values():
+            embedded = []
+            for job, allowed in group:
+                if str(job.id) in job_chunks:
+                    embedded.append((job, allowed))
+                else:
+                    yield JobMatches(
+                        job_id=str(job.id),
+                        error=f"No embeddings found for job ID {job.id}. Has it been processed?",
+                    )
+            for start in range(0, len(embedded), size):
+                batches.append(embedded[start : start + size])
+
+        semaphore = asyncio.Semaphore(max(1, settings.MATCH_BATCH_CONCURRENCY))
+
+        async def run_batch(batch: List[Tuple[Job, Optional[Set[str]]]]) -> List[JobMatches]:
+            async with semaphore:
+                try:
+                    ranked = await MatchingService.rank_candidates_for_jobs(
+                        {str(job.id): job_chunks[str(job.id)] for job, _ in batch},
+                        top_n=top_n,
+                        strategy=strategy,
+                        top_k=top_k,
+                        sections=sections,
+                        candidate_ids=batch[0][1],
+                    )
+                    return await finish(
+                        [(job, allowed, ranked[str(job.id)]) for job, allowed in batch]
+                    )
+                except Exception as e:
+                    return [JobMatches(job_id=str(job.id), error=str(e)) for job, _ in batch]
+
+        tasks = [asyncio.ensure_future(run_batch(batch)) for batch in batches]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                for result in await completed:
+                    yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def fuse_with_keywords(
+        vector_ranked: List[Tuple[str, float]],
+        index: BM25Index,
+        query: str,
+        allowed: Optional[Collection[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """Fuses a vector ranking with the BM25 ranking of `query` (see fuse_rankings)."""
+        keyword_ranked = index.search(
+            query,
+            limit=max(len(vector_ranked), 1),
+            doc_ids=set(allowed) if allowed is not None else None,
+        )
+        return fuse_rankings(
+            [vector_ranked, keyword_ranked],
+            weights=[settings.HYBRID_VECTOR_WEIGHT, settings.HYBRID_KEYWORD_WEIGHT],
+            method=FusionMethod(settings.HYBRID_FUSION_METHOD),
+            rrf_k=settings.HYBRID_RRF_K,
+        )
+
+    @staticmethod
+    async def load_job_chunks(job_ids: List[str]) -> Dict[str, JobChunks]:
+        """
+        Chunk embeddings and chunk text lengths of many jobs, fetched in one
+        vector store call and keyed by job id. Jobs without chunks are absent.
+        """
+        if not job_ids:
+            return {}
+        data = await asyncio.to_thread(
+            vector_repository.get,
+            JOBS_COLLECTION,
+            where={"document_id": {"$in": sorted(set(job_ids))}},
+            include=["embeddings", "metadatas", "documents"],
+        )
+        vectors = data.get("embeddings")
+        if vectors is None or len(vectors) == 0:
+            return {}
+        vectors = np.asarray(vectors, dtype=np.float32)
+        documents = data.get("documents") or [""] * len(vectors)
+        rows_by_job: Dict[str, List[int]] = defaultdict(list)
+        for i, metadata in enumerate(data["metadatas"]):  # type: ignore
+            rows_by_job[metadata["document_id"]].append(i)
+        return {
+            job_id: (vectors[rows], [len(documents[i] or "") for i in rows])
+            for job_id, rows in rows_by_job.items()
+        }
+
+    @staticmethod
+    async def rank_candidates_for_job(
+        job_id: str,
+        top_n: int = 10,
+        strategy: AggregationStrategy = AggregationStrategy.MAX_SIM,
+        top_k: int = 3,
+        sections: Optional[List[ProfileSection]] = None,
+        candidate_ids: Optional[Collection[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Ranks candidates for a job as (candidate_id, score) pairs.
+
+        Every job chunk is queried against the candidate chunks and the
+        per-chunk results are fused into one score per candidate with
+        `strategy` (see app/services/score_aggregation.py). For the weighted
+        strategy each job chunk is weighted by its text length. `sections`
+        restricts the search to candidate chunks from those profile sections and
+        `candidate_ids` to the chunks of those candidates (job requirements,
+        including years of experience, reach it as such an id set).
+
+        Each query chunk fetches about MATCH_CHUNKS_PER_CANDIDATE chunks per
+        wanted candidate (a smaller pre-filtered pool is fetched whole). If that
+        yields fewer than `top_n` candidates while the results were truncated,
+        the fetch size doubles, up to MATCH_MAX_CHUNKS_PER_QUERY.
+        """
+        job_chunks = await MatchingService.load_job_chunks([job_id])
+        if job_id not in job_chunks:
+            raise ValueError(
+                f"No embeddings found for job ID {job_id}. Has it been processed?"
+            )
+        ranked = await MatchingService.rank_candidates_for_jobs(
+            job_chunks,
+            top_n=top_n,
+            strategy=strategy,
+            top_k=top_k,
+            sections=sections,
+            candidate_ids=candidate_ids,
+        )
+        return ranked[job_id]
+
+    @staticmethod
+    async def rank_candidates_for_jobs(
+        job_chunks: Dict[str, JobChunks],
+        top_n: int = 10,
+        strategy: AggregationStrategy = AggregationStrategy.MAX_SIM,
+        top_k: int = 3,
+        sections: Optional[List[ProfileSection]] = None,
+        candidate_ids: Optional[Collection[str]] = None,
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        rank_candidates_for_job for several jobs sharing the same candidate
+        filters: the chunks of all jobs go out as one batched query, and only
+        jobs left short of `top_n` candidates by truncated results are queried
+        again with twice the fetch size.
+
+        With MATCH_BACKEND "exact" the jobs are scored by brute force against
+        every candidate chunk instead (see app/services/exact_matching.py).
+        """
+        if MatchBackend(settings.MATCH_BACKEND) == MatchBackend.EXACT:
+            return await exact_match_engine.rank_candidates_for_jobs(
+                job_chunks,
+                top_n=top_n,
+                strategy=strategy,
+                top_k=top_k,
+                sections=sections,
+                candidate_ids=candidate_ids,
             )
+        # Very large id sets are cheaper to filter after the search than to ship.
+        push_ids = (
+            candidate_ids is not None
+            and len(candidate_ids) <= settings.MATCH_PREFILTER_MAX_IDS
+        )
+        where = MatchingService.candidate_chunk_filter(
+            sections, candidate_ids if push_ids else None
+        )
 
-            best_scores = {}
-            for i in range(len(results["ids"][0])):
-                candidate_id = results["metadatas"][0][i]["document_id"]  # type: ignore
-                similarity = 1 - results["distances"][0][i]  # type: ignore
+        per_candidate = max(1, settings.MATCH_CHUNKS_PER_CANDIDATE)
+        n_results = top_n * per_candidate
+        if candidate_ids is not None:
+            n_results = min(n_results, len(candidate_ids) * per_candidate)
+        n_results = max(1, min(n_results, settings.MATCH_MAX_CHUNKS_PER_QUERY))
 
+        ranked: Dict[str, List[Tuple[str, float]]] = {}
+        pending = list(job_chunks)
+        while pending:
+            results = await asyncio.to_thread(
+                vector_repository.query,
+                CANDIDATES_COLLECTION,
+                query_embeddings=np.concatenate(
+                    [job_chunks[job_id][0] for job_id in pending]
+                ),
+                n_results=n_results,
+                where=where,
+                include=["metadatas", "distances"],
+            )
+            retry = []
+            offset = 0
+            for job_id in pending:
+                vectors, weights = job_chunks[job_id]
+                part = {
+                    key: (results.get(key) or [])[offset : offset + len(vectors)]
+                    for key in ("metadatas", "distances")
+                }
+                offset += len(vectors)
+                job_ranked = aggregate_query_results(
+                    part, strategy=strategy, top_k=top_k, query_weights=weights
+                )
+                if candidate_ids is not None and not push_ids:
+                    job_ranked = [pair for pair in job_ranked if pair[0] in candidate_ids]
+                ranked[job_id] = job_ranked
+                truncated = any(len(row) >= n_results for row in part["distances"])
                 if (
-                    candidate_id not in best_scores
-                    or similarity > best_scores[candidate_id]
+                    len(job_ranked) < top_n
+                    and truncated
+                    and n_results < settings.MATCH_MAX_CHUNKS_PER_QUERY
                 ):
-                    best_scores[candidate_id] = similarity
+                    retry.append(job_id)
+            pending = retry
+            n_results = min(n_results * 2, settings.MATCH_MAX_CHUNKS_PER_QUERY)
+        return ranked
 
-            ranked_candidates = sorted(
-                best_scores.items(), key=lambda item: item[1], reverse=True
-            )
+    @staticmethod
+    def candidate_chunk_filter(
+        sections: Optional[List[ProfileSection]] = None,
+        candidate_ids: Optional[Collection[str]] = None,
+    ) -> dict:
+        """
+        Chroma `where` clause selecting resume chunks, optionally only those of
+        some sections and/or of some candidates.
+        """
+        clauses: List[dict] = [{"document_type": "resume"}]
+        if sections:
+            clauses.append({"section": {"$in": [section.value for section in sections]}})
+        if candidate_ids is not None:
+            clauses.append({"document_id": {"$in": sorted(candidate_ids)}})
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    @staticmethod
+    async def find_matches_for_candidate(
+        candidate_id: str,
+        top_n: int = 10,
+        strategy: AggregationStrategy = AggregationStrategy.MAX_SIM,
+        top_k: int = 3,
+        sections: Optional[List[ProfileSection]] = None,
+    ) -> List[JobMatchResult]:
+        """Finds the top N jobs for a candidate."""
+        matches = await MatchingService.find_matches_for_candidates(
+            [candidate_id], top_n=top_n, strategy=strategy, top_k=top_k, sections=sections
+        )
+        return matches[candidate_id]
 
-            final_matches = []
-            for cid_str in ranked_candidates[:top_n]:
-                candidate_data = await Candidate.get(PydanticObjectId(cid_str[0]))
-                if candidate_data:
-                    response_candidate = MatchResult(
-                        **candidate_data.model_dump(by_alias=True)
+    @staticmethod
+    async def find_matches_for_candidates(
+        candidate_ids: List[str],
+        top_n: int = 10,
+        strategy: AggregationStrategy = AggregationStrategy.MAX_SIM,
+        top_k: int = 3,
+        sections: Optional[List[ProfileSection]] = None,
+    ) -> Dict[str, List[JobMatchResult]]:
+        """
+        Finds the top N jobs for each of many candidates, ranked live in one
+        batched vector query (see rank_jobs_for_candidates). All jobs are
+        loaded in one query.
+        """
+        try:
+            ranked = await MatchingService.rank_jobs_for_candidates(
+                list(dict.fromkeys(candidate_ids)),
+                top_n=top_n,
+                strategy=strategy,
+                top_k=top_k,
+                sections=sections,
+            )
+            job_ids = {
+                PydanticObjectId(job_id)
+                for pairs in ranked.values()
+                for job_id, _ in pairs[:top_n]
+            }
+            jobs = await JobDAO.get_jobs_by_ids(
+                list(job_ids), projection_model=JobMatchResult
+            )
+            matches: Dict[str, List[JobMatchResult]] = {}
+            for candidate_id in candidate_ids:
+                matches[candidate_id] = [
+                    jobs[PydanticObjectId(job_id)].model_copy(
+                        update={"relevance_score": score}
                     )
-                    response_candidate.relevance_score = cid_str[1]
-                    final_matches.append(response_candidate)
+                    for job_id, score in ranked.get(candidate_id, [])[:top_n]
+                    if PydanticObjectId(job_id) in jobs
+                ]
+            return matches
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    async def rank_jobs_for_candidates(
+        candidate_ids: List[str],
+        top_n: int = 10,
+        strategy: AggregationStrategy = AggregationStrategy.MAX_SIM,
+        top_k: int = 3,
+        sections: Optional[List[ProfileSection]] = None,
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Ranks jobs for each candidate as (job_id, score) pairs.
+
+        The mirror of rank_candidates_for_job: every candidate chunk (of
+        `sections`, if given) queries the job chunks, and the per-chunk results
+        are fused per candidate with `strategy`, weighting candidate chunks by
+        text length for the weighted strategy. The chunks of all candidates go
+        out as one batched query; only candidates left with fewer than `top_n`
+        jobs from truncated results are queried again with twice the fetch size.
+        """
+        ranked: Dict[str, List[Tuple[str, float]]] = {
+            candidate_id: [] for candidate_id in candidate_ids
+        }
+        candidate_data = await asyncio.to_thread(
+            vector_repository.get,
+            CANDIDATES_COLLECTION,
+            where=MatchingService.candidate_chunk_filter(sections, candidate_ids),
+            include=["embeddings", "metadatas", "documents"],
+        )
+        vectors = candidate_data.get("embeddings")
+        if vectors is None or len(vectors) == 0:
+            return ranked
+        vectors = np.asarray(vectors, dtype=np.float32)
+        rows_by_candidate: Dict[str, List[int]] = defaultdict(list)
+        for i, metadata in enumerate(candidate_data["metadatas"]):  # type: ignore
+            rows_by_candidate[metadata["document_id"]].append(i)
+        documents = candidate_data.get("documents") or [""] * len(vectors)
 
-            return final_matches
+        per_job = max(1, settings.MATCH_CHUNKS_PER_CANDIDATE)
+        n_results = max(1, min(top_n * per_job, settings.MATCH_MAX_CHUNKS_PER_QUERY))
+        pending = list(rows_by_candidate)
+        while pending:
+            results = await asyncio.to_thread(
+                vector_repository.query,
+                JOBS_COLLECTION,
+                query_embeddings=vectors[
+                    [i for candidate_id in pending for i in rows_by_candidate[candidate_id]]
+                ],
+                n_results=n_results,
+                where={"document_type": "job"},
+                include=["metadatas", "distances"],
+            )
+            retry = []
+            offset = 0
+            for candidate_id in pending:
+                rows = rows_by_candidate[candidate_id]
+                part = {
+                    key: (results.get(key) or [])[offset : offset + len(rows)]
+                    for key in ("metadatas", "distances")
+                }
+                offset += len(rows)
+                ranked[candidate_id] = aggregate_query_results(
+                    part,
+                    strategy=strategy,
+                    top_k=top_k,
+                    query_weights=[len(documents[i] or "") for i in rows],
+                )
+                truncated = any(len(row) >= n_results for row in part["distances"])
+                if (
+                    len(ranked[candidate_id]) < top_n
+                    and truncated
+                    and n_results < settings.MATCH_MAX_CHUNKS_PER_QUERY
+                ):
+                    retry.append(candidate_id)
+            pending = retry
+            n_results = min(n_results * 2, settings.MATCH_MAX_CHUNKS_PER_QUERY)
+        return ranked
+
+    @staticmethod
+    async def refresh_matches_for_job(job_id: str):
+        """Scores a (new) job against the existing candidate pool and materializes the result."""
+        try:
+            ranked = await MatchingService.rank_candidates_for_job(
+                job_id,
+                top_n=settings.MATCH_MATERIALIZE_LIMIT,
+                strategy=MatchingService.MATERIALIZED_STRATEGY,
+            )
+            job_object_id = PydanticObjectId(job_id)
+            await MatchDAO.upsert_job_scores(
+                job_object_id,
+                [
+                    (PydanticObjectId(candidate_id), score)
+                    for candidate_id, score in ranked[: settings.MATCH_MATERIALIZE_LIMIT]
+                ],
+                strategy=MatchingService.MATERIALIZED_STRATEGY.value,
+            )
+            await MatchDAO.mark_job_materialized(job_object_id)
+        except Exception as e:
+            # Rows of an earlier materialization no longer match the job.
+            await MatchDAO.mark_jobs_stale([PydanticObjectId(job_id)])
+            raise e
+
+    @staticmethod
+    async def score_candidate_against_jobs(
+        candidate_id: str, candidate_embeddings: List[List[float]]
+    ):
+        """
+        Incrementally scores a newly ingested candidate against the open,
+        materialized jobs, and stores the scores of the jobs whose top
+        MATCH_MATERIALIZE_LIMIT it enters. Job vectors are few, so the
+        candidate is scored exactly against all of them locally.
+        """
+        job_ids: List[PydanticObjectId] = []
+        try:
+            if not candidate_embeddings:
+                return
+            job_ids = await JobDAO.get_materialized_job_ids()
+            if not job_ids:
+                return
+            job_data = await asyncio.to_thread(
+                vector_repository.get,
+                JOBS_COLLECTION,
+                where={
+                    "$and": [
+                        {"document_type": "job"},
+                        {"document_id": {"$in": [str(job_id) for job_id in job_ids]}},
+                    ]
+                },
+                include=["embeddings", "metadatas", "documents"],
+            )
+            job_vectors = job_data.get("embeddings")
+            if job_vectors is None or len(job_vectors) == 0:
+                return
+
+            # Best candidate chunk for every job chunk, in one matrix product.
+            best = l2_similarity_matrix(job_vectors, candidate_embeddings).max(axis=1)
+            chunks_by_job: Dict[str, List[int]] = defaultdict(list)
+            for i, metadata in enumerate(job_data["metadatas"]):  # type: ignore
+                chunks_by_job[metadata["document_id"]].append(i)
+            documents = job_data.get("documents") or [""] * len(best)
+
+            scores = []
+            for job_id, rows in chunks_by_job.items():
+                ranked = aggregate_hits(
+                    np.arange(len(rows)),
+                    [candidate_id] * len(rows),
+                    best[rows],
+                    n_queries=len(rows),
+                    strategy=MatchingService.MATERIALIZED_STRATEGY,
+                    query_weights=[len(documents[i] or "") for i in rows],
+                )
+                scores.append((PydanticObjectId(job_id), ranked[0][1]))
+
+            await MatchDAO.upsert_candidate_scores(
+                PydanticObjectId(candidate_id),
+                scores,
+                strategy=MatchingService.MATERIALIZED_STRATEGY.value,
+                limit=settings.MATCH_MATERIALIZE_LIMIT,
+            )
         except Exception as e:
+            # The jobs' rows may now miss this candidate, so they are matched
+            # live until they are materialized again.
+            if job_ids:
+                await MatchDAO.mark_jobs_stale(job_ids)
             raise e
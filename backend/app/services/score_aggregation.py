@@ -0,0 +1,186 @@
+# app/services/score_aggregation.py
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# (chunk embeddings, per-chunk weights) of one query document, e.g. a job
+JobChunks = Tuple[np.ndarray, List[int]]
+
+
+class FusionMethod(str, Enum):
+    """How the vector and keyword rankings are combined in hybrid matching."""
+
+    RRF = "rrf"  # weighted reciprocal rank fusion
+    WEIGHTED = "weighted"  # weighted sum of min-max normalized scores
+
+
+class MatchBackend(str, Enum):
+    """Where live job-to-candidate matching searches candidate chunks."""
+
+    VECTOR_STORE = "vector_store"  # nearest-neighbour queries to the vector store
+    EXACT = "exact"  # brute force over an in-memory matrix (services/exact_matching.py)
+
+
+class AggregationStrategy(str, Enum):
+    """How per-chunk similarities are combined into one score per document."""
+
+    MAX_SIM = "max_sim"  # best single chunk-to-chunk match
+    MEAN_TOP_K = "mean_top_k"  # mean of the k best query chunks
+    WEIGHTED = "weighted"  # weighted fusion over all query chunks
+
+
+def aggregate_hits(
+    query_idx: np.ndarray,
+    owner_ids: Sequence[str],
+    similarities: np.ndarray,
+    n_queries: int,
+    strategy: AggregationStrategy = AggregationStrategy.MAX_SIM,
+    top_k: int = 3,
+    query_weights: Optional[Sequence[float]] = None,
+) -> List[Tuple[str, float]]:
+    """
+    Combines (query chunk, owner document, similarity) hits into ranked owner scores.
+
+    Hits are scattered into an owners x query-chunks matrix holding, for every
+    query chunk, the best similarity of any chunk of that owner. Owners that a
+    query chunk did not retrieve get that chunk's lowest retrieved similarity,
+    since their true score is at most that. The matrix is then reduced across
+    query chunks according to `strategy` in a single vectorized pass.
+    """
+    if len(owner_ids) == 0 or n_queries == 0:
+        return []
+    owners, owner_idx = np.unique(np.asarray(owner_ids), return_inverse=True)
+    similarities = np.asarray(similarities, dtype=np.float32)
+    query_idx = np.asarray(query_idx, dtype=np.int64)
+
+    matrix = np.full((len(owners), n_queries), -np.inf, dtype=np.float32)
+    np.maximum.at(matrix, (owner_idx, query_idx), similarities)
+
+    floor = np.full(n_queries, np.inf, dtype=np.float32)
+    np.minimum.at(floor, query_idx, similarities)
+    floor[np.isinf(floor)] = similarities.min()
+    matrix = np.where(np.isinf(matrix), floor[np.newaxis, :], matrix)
+
+    scores = reduce_chunk_scores(matrix, strategy, top_k, query_weights)
+    order = np.argsort(-scores, kind="stable")
+    return [(str(owners[i]), float(scores[i])) for i in order]
+
+
+def reduce_chunk_scores(
+    matrix: np.ndarray,
+    strategy: AggregationStrategy = AggregationStrategy.MAX_SIM,
+    top_k: int = 3,
+    query_weights: Optional[Sequence[float]] = None,
+) -> np.ndarray:
+    """
+    Reduces an owners x query-chunks matrix of best similarities to one score
+    per owner according to `strategy`.
+    """
+    n_queries = matrix.shape[1]
+    if strategy == AggregationStrategy.MAX_SIM:
+        scores = matrix.max(axis=1)
+    elif strategy == AggregationStrategy.MEAN_TOP_K:
+        k = max(1, min(top_k, n_queries))
+        top = -np.partition(-matrix, k - 1, axis=1)[:, :k]
+        scores = top.mean(axis=1)
+    elif strategy == AggregationStrategy.WEIGHTED:
+        weights = (
+            np.ones(n_queries, dtype=np.float32)
+            if query_weights is None
+            else np.asarray(query_weights, dtype=np.float32)
+        )
+        total = weights.sum()
+        weights = weights / total if total > 0 else np.full(n_queries, 1 / n_queries)
+        scores = matrix @ weights
+    else:
+        raise ValueError(f"Unknown aggregation strategy: {strategy}")
+    return scores
+
+
+def l2_similarity_matrix(queries: np.ndarray, documents: np.ndarray) -> np.ndarray:
+    """
+    Pairwise 1 - squared L2 distance, i.e. the same similarity the Chroma
+    query path yields, so locally computed scores are comparable with it.
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    documents = np.asarray(documents, dtype=np.float32)
+    squared = (
+        np.einsum("ij,ij->i", queries, queries)[:, np.newaxis]
+        + np.einsum("ij,ij->i", documents, documents)[np.newaxis, :]
+        - 2 * queries @ documents.T
+    )
+    return 1 - np.maximum(squared, 0)
+
+
+def aggregate_query_results(
+    results: Dict[str, Any],
+    strategy: AggregationStrategy = AggregationStrategy.MAX_SIM,
+    top_k: int = 3,
+    query_weights: Optional[Sequence[float]] = None,
+    owner_key: str = "document_id",
+) -> List[Tuple[str, float]]:
+    """
+    Aggregates a multi-query Chroma `query` result across *all* query chunks.
+    Similarity is taken as 1 - distance, as elsewhere in the matching code.
+    """
+    metadatas = results.get("metadatas") or []
+    distances = results.get("distances") or []
+    n_queries = len(distances)
+    lengths = [len(row) for row in distances]
+    if sum(lengths) == 0:
+        return []
+
+    query_idx = np.repeat(np.arange(n_queries), lengths)
+    owner_ids = [meta[owner_key] for row in metadatas for meta in row]
+    similarities = 1 - np.concatenate(
+        [np.asarray(row, dtype=np.float32) for row in distances]
+    )
+    return aggregate_hits(
+        query_idx,
+        owner_ids,
+        similarities,
+        n_queries=n_queries,
+        strategy=strategy,
+        top_k=top_k,
+        query_weights=query_weights,
+    )
+
+
+def fuse_rankings(
+    rankings: Sequence[Sequence[Tuple[str, float]]],
+    weights: Sequence[float],
+    method: FusionMethod = FusionMethod.RRF,
+    rrf_k: int = 60,
+) -> List[Tuple[str, float]]:
+    """
+    Fuses several (id, score) rankings, each sorted best first, into one.
+
+    RRF scores an id by sum(weight / (rrf_k + rank)) and ignores the raw scores,
+    so it needs no calibration between, say, cosine similarities and BM25.
+    WEIGHTED min-max normalizes each ranking's scores and sums them by weight.
+    Ids missing from a ranking contribute nothing for it.
+    """
+    fused: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        if not ranking or weight == 0:
+            continue
+        if method == FusionMethod.RRF:
+            contributions = [
+                (doc_id, weight / (rrf_k + rank))
+                for rank, (doc_id, _) in enumerate(ranking, start=1)
+            ]
+        elif method == FusionMethod.WEIGHTED:
+            scores = np.asarray([score for _, score in ranking], dtype=np.float64)
+            span = scores.max() - scores.min()
+            normalized = (scores - scores.min()) / span if span > 0 else np.ones_like(scores)
+            contributions = [
+                (doc_id, weight * float(value))
+                for (doc_id, _), value in zip(ranking, normalized)
+            ]
+        else:
+            raise ValueError(f"Unknown fusion method: {method}")
+        for doc_id, contribution in contributions:
+            fused[doc_id] = fused.get(doc_id, 0.0) + contribution
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
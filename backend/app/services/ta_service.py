@@ -1,95 +1,117 @@
-import base64
 from beanie import PydanticObjectId
-from typing import List, Optional
+from typing import Any, AsyncIterator, List, Optional, Tuple
 from fastapi import UploadFile
+from app.core.config import settings
 from app.dao.candidate_dao import CandidateDAO
-from app.db_clients.chroma_client import chroma_db_client
-from app.utils import ai_utils, file_utils
-from app.schemas.models import Candidate, Job
-from app.services.document_processor import DocumentProcessor
-from app.tasks.process import _process_job
+from app.dao.upload_dao import UploadDAO
+from app.db.models import DuplicatePolicy, Job, ProcessingStatus, ResumeUpload
+from app.schemas.api_schemas import CandidateResponse, CandidateSummary, JobResponse
+from app.utils import ai_utils, file_utils, upload_utils
+from app.tasks.process import dispatch, process_job, process_resume_batch
 from app.dao.job_dao import JobDAO
 
-processor = DocumentProcessor()
-
 
 class TalentAcquisitionService:
 
     @staticmethod
-    async def create_new_job(title: str, description: str):
+    async def create_new_job(title: str, description: str) -> Job:
+        """Stores a job and queues its embedding and matching on a worker."""
         try:
-            new_job = await JobDAO.create_job(title=title, description=description)
-            await _process_job(str(new_job.id), title, description)
-            # Generate and store embedding for the job description
-            job_embedding = ai_utils.get_embeddings(description)
-            chroma_db_client.add_embedding(
-                collection_name="jobs_collection",
-                doc_id=str(new_job.id),
-                embedding=job_embedding,
-                metadata={"title": new_job.title, "job_id": str(new_job.id)},
+            new_job = await JobDAO.create_job(
+                title=title, description=description, status=ProcessingStatus.PENDING
             )
+            dispatch(process_job, str(new_job.id))
             return new_job
         except Exception as e:
             print("error while creating new job", e)
             raise e
 
     @staticmethod
-    async def process_resumes_for_job(
-        resume_files: List[UploadFile], job_id: Optional[str] = None
-    ) -> List[Candidate]:
+    async def submit_resumes(
+        resume_files: List[UploadFile],
+        on_duplicate: Optional[DuplicatePolicy] = None,
+    ) -> List[ResumeUpload]:
+        """
+        Spools each file to UPLOAD_SPOOL_DIR, records one ResumeUpload per file
+        and queues the batch for a worker, which reads the files by path.
+        Returns immediately; progress is tracked on each upload's status.
+        Raises UploadTooLargeError if a file or the batch exceeds the size limits.
+        """
         try:
-            processed_candidates = []
-            for resume_file in resume_files:
-                file_content = await resume_file.read()
-                raw_text = file_utils.extract_text_from_pdf(file_content)  # type: ignore
-                standardized_profile = await ai_utils.standardize_resume(raw_text)
-                if "error" in standardized_profile:
-                    continue  # Skip resumes that fail to parse
-
-                summary_for_embedding = ai_utils.create_summary_from_profile(
-                    standardized_profile
+            spooled = await upload_utils.spool_uploads(resume_files)
+            try:
+                uploads = await UploadDAO.create_uploads(
+                    [item.filename for item in spooled]
                 )
-
-                new_candidate = await CandidateDAO.create_candidate(
-                    name=standardized_profile.get("personal_info", {}).get(
-                        "name", "Unknown Candidate"
-                    ),
-                    profile=standardized_profile,
-                    full_text=raw_text,
-                )
-
-                candidate_embedding = processor.process_and_embed(
-                    doc_id=str(new_candidate.id),
-                    text=summary_for_embedding,
-                    doc_type="resume",
+                payload = [
+                    {
+                        "upload_id": str(upload.id),
+                        **item.model_dump(),
+                    }
+                    for upload, item in zip(uploads, spooled)
+                ]
+                policy = on_duplicate or DuplicatePolicy(
+                    settings.INGEST_DUPLICATE_POLICY
                 )
+                dispatch(process_resume_batch, payload, policy.value)
+            except Exception:
+                for item in spooled:
+                    upload_utils.discard(item.path)
+                raise
+            return uploads
+        except Exception as e:
+            raise e
 
-                # if job_id is not None:
-                #     job_pydantic_id = PydanticObjectId(job_id)
-                #     job = await job_dao.get_job_by_id(job_pydantic_id)
-                #     if not job:
-                #         raise ValueError(f"Job with ID {job_id} not found.")
-
-                #     job_embedding = await ai_utils.get_embeddings(job.description)
-                #     score = ai_utils.calculate_cosine_similarity(
-                #         job_embedding, candidate_embedding
-                #     )
-                #     rounded_score = round(score * 100, 2)
-                # chroma_db_client.add_embedding(
-                #     collection_name="candidates_collection",
-                #     doc_id=str(new_candidate.id),
-                #     embedding=candidate_embedding,
-                #     metadata={"job_id": str(job.id)},
-                # )
-                processed_candidates.append(new_candidate)
+    @staticmethod
+    async def get_upload_status(upload_id: PydanticObjectId) -> Optional[ResumeUpload]:
+        try:
+            return await UploadDAO.get_upload(upload_id)
+        except Exception as e:
+            raise e
 
-            return processed_candidates
+    @staticmethod
+    async def list_jobs(
+        after: Optional[PydanticObjectId] = None, limit: int = 100
+    ) -> Tuple[List[JobResponse], Optional[PydanticObjectId]]:
+        try:
+            return await JobDAO.get_jobs_page(
+                after=after, limit=limit, projection_model=JobResponse
+            )
         except Exception as e:
             raise e
 
     @staticmethod
-    async def get_all_jobs():
+    async def stream_jobs_ndjson() -> AsyncIterator[str]:
+        """Exports every job as newline-delimited JSON without loading the collection."""
+        async for job in JobDAO.iter_jobs(projection_model=JobResponse):
+            yield job.model_dump_json(by_alias=True) + "\n"
+
+    @staticmethod
+    async def list_candidates(
+        after: Optional[PydanticObjectId] = None,
+        limit: int = 100,
+        job_id: Optional[PydanticObjectId] = None,
+        include_profile: bool = True,
+    ) -> Tuple[List[Any], Optional[PydanticObjectId]]:
         try:
-            return await JobDAO.get_all_jobs()
+            return await CandidateDAO.get_candidates_page(
+                after=after,
+                limit=limit,
+                job_id=job_id,
+                projection_model=(
+                    CandidateResponse if include_profile else CandidateSummary
+                ),
+            )
         except Exception as e:
             raise e
+
+    @staticmethod
+    async def stream_candidates_ndjson(
+        job_id: Optional[PydanticObjectId] = None, include_profile: bool = True
+    ) -> AsyncIterator[str]:
+        """Exports candidates as newline-delimited JSON without loading the collection."""
+        async for candidate in CandidateDAO.iter_candidates(
+            job_id=job_id,
+            projection_model=CandidateResponse if include_profile else CandidateSummary,
+        ):
+            yield candidate.model_dump_json(by_alias=True) + "\n"
@@ -0,0 +1,62 @@
+# app/services/test_embedding_batcher.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import embedding_batcher
+from app.services.embedding_batcher import EmbeddingBatcher
+
+
+class FakeProvider:
+    def __init__(self, block: bool = False):
+        self.requests = []
+        self.block = block
+
+    async def embeddings(self, input):
+        self.requests.append((asyncio.get_running_loop().time(), list(input)))
+        if self.block:
+            await asyncio.Event().wait()
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(t))]) for t in input])
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    provider = FakeProvider()
+    monkeypatch.setattr(embedding_batcher, "get_async_provider", lambda type: provider)
+    return provider
+
+
+def test_leftover_texts_are_sent_by_their_deadline(provider):
+    async def run():
+        batcher = EmbeddingBatcher(max_batch_inputs=2, max_batch_tokens=10_000, max_wait=0.2)
+        start = asyncio.get_running_loop().time()
+        first = asyncio.ensure_future(batcher.embed(["a"]))
+        await asyncio.sleep(0.15)
+        # Fills one request with "a"; "ccc" is left over until 0.2s after it came.
+        second = asyncio.ensure_future(batcher.embed(["bb", "ccc"]))
+        results = await asyncio.gather(first, second)
+        return start, results
+
+    start, results = asyncio.run(run())
+    assert results == [[[1.0]], [[2.0], [3.0]]]
+    assert [texts for _, texts in provider.requests] == [["a", "bb"], ["ccc"]]
+    assert provider.requests[0][0] - start == pytest.approx(0.15, abs=0.05)
+    assert provider.requests[1][0] - start == pytest.approx(0.35, abs=0.05)
+
+
+def test_cancelled_request_does_not_leave_callers_waiting(monkeypatch):
+    provider = FakeProvider(block=True)
+    monkeypatch.setattr(embedding_batcher, "get_async_provider", lambda type: provider)
+
+    async def run():
+        batcher = EmbeddingBatcher(max_batch_inputs=2, max_wait=0)
+        caller = asyncio.ensure_future(batcher.embed(["a", "b"]))
+        while not provider.requests:
+            await asyncio.sleep(0)
+        for task in list(batcher._in_flight):
+            task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(caller, timeout=1)
+
+    asyncio.run(run())
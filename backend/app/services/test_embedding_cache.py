@@ -0,0 +1,38 @@
+# app/services/test_embedding_cache.py
+import time
+
+from app.services.embedding_cache import EmbeddingCache
+
+
+def test_round_trip_and_misses(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_entries=10)
+    cache.put_many("model", ["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+    assert cache.get_many("model", ["a", "c", "b"]) == [[1.0, 2.0], None, [3.0, 4.0]]
+    # The model is part of the key.
+    assert cache.get_many("other-model", ["a"]) == [None]
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.put_many("model", ["a"], [[1.0]])
+    time.sleep(0.01)
+    cache.put_many("model", ["b"], [[2.0]])
+    time.sleep(0.01)
+    cache.get_many("model", ["a"])  # "b" is now the least recently used
+    time.sleep(0.01)
+    cache.put_many("model", ["c"], [[3.0]])
+    assert len(cache) == 2
+    assert cache.get_many("model", ["a", "b", "c"]) == [[1.0], None, [3.0]]
+
+
+def test_bound_holds_across_processes_sharing_the_file(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = EmbeddingCache(path, max_entries=5)
+    second = EmbeddingCache(path, max_entries=5)
+    for i in range(10):
+        writer = first if i % 2 else second
+        writer.put_many("model", [f"text {i}"], [[float(i)]])
+    assert len(first) == len(second) == 5
+    # Re-inserting cached texts does not grow the cache.
+    first.put_many("model", [f"text {i}" for i in range(5, 10)], [[0.0]] * 5)
+    assert len(second) == 5
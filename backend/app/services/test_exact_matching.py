@@ -0,0 +1,184 @@
+# app/services/test_exact_matching.py
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.db.models import ProfileSection
+from app.services.exact_matching import (
+    CandidateMatrix,
+    ExactMatchEngine,
+    Quantization,
+    normalize_rows,
+    quantize,
+)
+from app.services.score_aggregation import AggregationStrategy
+
+SECTIONS = [ProfileSection.SKILLS.value, ProfileSection.EXPERIENCE.value, None]
+
+
+def make_pool(seed=0, candidates=40, dim=12):
+    rng = np.random.default_rng(seed)
+    owners, sections, vectors = [], [], []
+    for c in range(candidates):
+        for _ in range(int(rng.integers(1, 5))):
+            owners.append(f"cand{c:02d}")
+            sections.append(SECTIONS[int(rng.integers(len(SECTIONS)))])
+            vectors.append(rng.normal(size=dim))
+    # Shuffled, so the matrix has to group rows by candidate itself.
+    order = rng.permutation(len(owners))
+    jobs = {}
+    for j in range(3):
+        chunks = int(rng.integers(1, 4))
+        jobs[f"job{j}"] = (rng.normal(size=(chunks, dim)), [1, 2, 3][:chunks])
+    return (
+        np.asarray(vectors)[order],
+        [owners[i] for i in order],
+        [sections[i] for i in order],
+        jobs,
+    )
+
+
+def brute_force(vectors, owners, sections, jobs, top_n, strategy, top_k, wanted_sections=None, candidate_ids=None):
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    ranked = {}
+    for job_id, (queries, weights) in jobs.items():
+        queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+        scores = {}
+        for owner in sorted(set(owners)):
+            if candidate_ids is not None and owner not in candidate_ids:
+                continue
+            rows = [
+                i
+                for i, o in enumerate(owners)
+                if o == owner and (not wanted_sections or sections[i] in wanted_sections)
+            ]
+            if not rows:
+                continue
+            best = (2 * (queries @ unit[rows].T) - 1).max(axis=1)
+            if strategy == AggregationStrategy.MAX_SIM:
+                scores[owner] = best.max()
+            elif strategy == AggregationStrategy.MEAN_TOP_K:
+                scores[owner] = np.sort(best)[::-1][:top_k].mean()
+            else:
+                scores[owner] = np.dot(best, weights) / sum(weights)
+        ranked[job_id] = sorted(scores.items(), key=lambda item: -item[1])[:top_n]
+    return ranked
+
+
+def assert_same_ranking(actual, expected):
+    assert actual.keys() == expected.keys()
+    for job_id in expected:
+        assert [c for c, _ in actual[job_id]] == [c for c, _ in expected[job_id]]
+        assert [s for _, s in actual[job_id]] == pytest.approx(
+            [s for _, s in expected[job_id]], abs=1e-5
+        )
+
+
+@pytest.mark.parametrize("strategy", list(AggregationStrategy))
+@pytest.mark.parametrize("block_rows", [7, 65536])
+def test_rank_matches_brute_force(monkeypatch, strategy, block_rows):
+    monkeypatch.setattr(settings, "EXACT_MATCH_BLOCK_ROWS", block_rows)
+    vectors, owners, sections, jobs = make_pool()
+    matrix = CandidateMatrix.from_vectors(vectors, owners, sections)
+    actual = matrix.rank(jobs, top_n=5, strategy=strategy, top_k=2)
+    assert_same_ranking(actual, brute_force(vectors, owners, sections, jobs, 5, strategy, 2))
+
+
+@pytest.mark.parametrize("strategy", list(AggregationStrategy))
+def test_rank_with_section_and_candidate_filters(monkeypatch, strategy):
+    monkeypatch.setattr(settings, "EXACT_MATCH_BLOCK_ROWS", 5)
+    vectors, owners, sections, jobs = make_pool(seed=3)
+    matrix = CandidateMatrix.from_vectors(vectors, owners, sections)
+    wanted = {f"cand{c:02d}" for c in range(0, 40, 3)} | {"unknown"}
+    actual = matrix.rank(
+        jobs,
+        top_n=4,
+        strategy=strategy,
+        sections=[ProfileSection.SKILLS],
+        candidate_ids=wanted,
+    )
+    expected = brute_force(
+        vectors, owners, sections, jobs, 4, strategy, 3,
+        wanted_sections={ProfileSection.SKILLS.value}, candidate_ids=wanted,
+    )
+    assert_same_ranking(actual, expected)
+
+
+def test_rank_returns_everyone_when_top_n_exceeds_the_pool():
+    vectors, owners, sections, jobs = make_pool(candidates=3)
+    matrix = CandidateMatrix.from_vectors(vectors, owners, sections)
+    ranked = matrix.rank(jobs, top_n=50)
+    assert all(len(r) == 3 for r in ranked.values())
+
+
+def test_rank_with_nothing_to_rank():
+    vectors, owners, sections, jobs = make_pool(candidates=3)
+    matrix = CandidateMatrix.from_vectors(vectors, owners, sections)
+    assert matrix.rank(jobs, candidate_ids=set()) == {job_id: [] for job_id in jobs}
+    assert matrix.rank({}) == {}
+    empty = CandidateMatrix.from_vectors(np.zeros((0, 4)), [], [])
+    assert empty.rank(jobs) == {job_id: [] for job_id in jobs}
+
+
+@pytest.mark.parametrize("quantization", list(Quantization))
+def test_quantize_reconstructs_normalized_vectors(quantization):
+    vectors = np.random.default_rng(1).normal(size=(50, 64))
+    data, scales = quantize(vectors, quantization)
+    restored = data.astype(np.float32) * (scales[:, np.newaxis] if scales is not None else 1)
+    assert (scales is not None) == (quantization == Quantization.INT8)
+    assert restored == pytest.approx(normalize_rows(vectors), abs=0.01)
+
+
+def test_quantize_keeps_zero_vectors():
+    data, scales = quantize(np.zeros((2, 4)), Quantization.INT8)
+    assert not data.any() and (scales == 1).all()
+
+
+@pytest.mark.parametrize("quantization", [Quantization.FLOAT16, Quantization.INT8])
+@pytest.mark.parametrize("strategy", list(AggregationStrategy))
+def test_quantized_rank_stays_close_to_float32(quantization, strategy):
+    vectors, owners, sections, jobs = make_pool(seed=5, dim=64)
+    matrix = CandidateMatrix.from_vectors(vectors, owners, sections, quantization)
+    assert matrix.quantization == quantization
+    assert matrix.nbytes < CandidateMatrix.from_vectors(vectors, owners, sections).nbytes
+    expected = brute_force(vectors, owners, sections, jobs, 40, strategy, 3)
+    actual = matrix.rank(jobs, top_n=40, strategy=strategy)
+    for job_id, ranked in expected.items():
+        truth = dict(ranked)
+        # Every candidate is still ranked, with scores off by at most a rounding error.
+        assert dict(actual[job_id]).keys() == truth.keys()
+        for candidate_id, score in actual[job_id]:
+            assert score == pytest.approx(truth[candidate_id], abs=0.02)
+        top = {c for c, _ in ranked[:5]}
+        assert len(top & {c for c, _ in actual[job_id][:5]}) >= 4
+
+
+@pytest.mark.parametrize("quantization", list(Quantization))
+def test_engine_rescores_the_quantized_shortlist_exactly(monkeypatch, quantization):
+    vectors, owners, sections, jobs = make_pool(seed=7, dim=64)
+    loads = []
+
+    def load(candidate_ids=None, quantization=Quantization.NONE):
+        loads.append((candidate_ids, quantization))
+        rows = [i for i, o in enumerate(owners) if candidate_ids is None or o in candidate_ids]
+        return CandidateMatrix.from_vectors(
+            vectors[rows], [owners[i] for i in rows], [sections[i] for i in rows], quantization
+        )
+
+    monkeypatch.setattr(ExactMatchEngine, "load", staticmethod(load))
+    monkeypatch.setattr(settings, "EXACT_MATCH_QUANTIZATION", quantization.value)
+    monkeypatch.setattr(settings, "EXACT_MATCH_RESCORE_CANDIDATES", 15)
+    engine = ExactMatchEngine()
+    ranked = asyncio.run(engine.rank_candidates_for_jobs(jobs, top_n=5))
+
+    expected = brute_force(vectors, owners, sections, jobs, 5, AggregationStrategy.MAX_SIM, 3)
+    assert_same_ranking(ranked, expected)
+    assert loads[0] == (None, quantization)
+    if quantization == Quantization.NONE:
+        assert len(loads) == 1
+    else:
+        # The second load reads only the shortlist, in float32.
+        shortlist, rescored_as = loads[1]
+        assert len(shortlist) <= 15 * len(jobs) and rescored_as == Quantization.NONE
@@ -0,0 +1,136 @@
+# app/services/test_keyword_index.py
+import asyncio
+import math
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.dao.candidate_dao import CandidateDAO
+from app.services.keyword_index import BM25Index, KeywordIndex
+from app.services.score_aggregation import FusionMethod, fuse_rankings
+
+
+@pytest.fixture
+def index():
+    index = BM25Index(k1=1.2, b=0.75)
+    index.add("a", ["python", "aws", "aws", "docker"])
+    index.add("b", ["java", "aws"])
+    index.add("c", ["python", "sql", "sql", "sql", "excel", "tableau"])
+    return index
+
+
+def bm25(tf, df, n_docs, length, avg_length, k1=1.2, b=0.75):
+    idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+    return idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avg_length))
+
+
+def test_scores_follow_okapi_bm25(index):
+    avg = 12 / 3
+    scores = index.score(["aws", "python"])
+    assert scores["a"] == pytest.approx(bm25(2, 2, 3, 4, avg) + bm25(1, 2, 3, 4, avg))
+    assert scores["b"] == pytest.approx(bm25(1, 2, 3, 2, avg))
+    assert scores["c"] == pytest.approx(bm25(1, 2, 3, 6, avg))
+    # Documents without any query term are not scored.
+    assert "b" not in index.score(["python"])
+    assert index.score(["rust"]) == {}
+
+
+def test_search_ranks_limits_and_filters(index):
+    assert [doc for doc, _ in index.search("AWS, Python", limit=3)] == ["a", "b", "c"]
+    assert [doc for doc, _ in index.search("AWS, Python", limit=1)] == ["a"]
+    assert [doc for doc, _ in index.search("python", limit=3, doc_ids={"c"})] == ["c"]
+
+
+def test_replace_and_remove_keep_statistics_consistent(index):
+    index.add("a", ["rust"])
+    assert index.doc_lengths["a"] == 1
+    assert index.total_length == 1 + 2 + 6
+    assert "a" not in index.postings["aws"]
+    assert index.matching_all(["rust"]) == {"a"}
+
+    index.remove("c")
+    index.remove("missing")
+    assert len(index) == 2
+    assert index.total_length == 3
+    assert "sql" not in index.postings
+    assert index.score(["python"]) == {}
+
+
+def test_matching_all_requires_every_term(index):
+    assert index.matching_all(["python"]) == {"a", "c"}
+    assert index.matching_all(["python", "aws"]) == {"a"}
+    assert index.matching_all(["AWS Docker"]) == {"a"}
+    assert index.matching_all(["python", "java"]) == set()
+    assert index.matching_all([]) == {"a", "b", "c"}
+
+
+def test_rrf_fusion_uses_ranks_only():
+    vector = [("a", 0.9), ("b", 0.8), ("c", 0.1)]
+    keyword = [("c", 40.0), ("a", 1.0)]
+    fused = dict(fuse_rankings([vector, keyword], [1.0, 0.5], FusionMethod.RRF, rrf_k=60))
+    assert fused["a"] == pytest.approx(1 / 61 + 0.5 / 62)
+    assert fused["b"] == pytest.approx(1 / 62)
+    assert fused["c"] == pytest.approx(1 / 63 + 0.5 / 61)
+    assert list(fused) == ["a", "c", "b"]
+
+
+def test_weighted_fusion_normalizes_each_ranking():
+    vector = [("a", 0.9), ("b", 0.7), ("c", 0.5)]
+    keyword = [("c", 10.0), ("b", 5.0)]
+    fused = fuse_rankings([vector, keyword], [1.0, 0.5], FusionMethod.WEIGHTED)
+    assert dict(fused) == pytest.approx({"a": 1.0, "b": 0.5, "c": 0.5})
+    # A ranking whose scores are all equal counts fully for each of its ids.
+    assert dict(fuse_rankings([[("x", 3.0), ("y", 3.0)]], [2.0], FusionMethod.WEIGHTED)) == {
+        "x": 2.0,
+        "y": 2.0,
+    }
+
+
+def test_fusion_skips_empty_and_zero_weight_rankings():
+    ranking = [("a", 1.0), ("b", 0.5)]
+    assert fuse_rankings([ranking, []], [1.0, 1.0]) == fuse_rankings([ranking], [1.0])
+    assert fuse_rankings([ranking], [0.0]) == []
+    with pytest.raises(ValueError):
+        fuse_rankings([ranking], [1.0], method="sum")  # type: ignore
+
+
+def test_refresh_reads_profiles_stamped_since_the_watermark(monkeypatch):
+    start = datetime(2026, 1, 1)
+    # (id, profile, profile_updated_at); ids say nothing about commit order.
+    stored = [("b", {"technical_skills": ["java"]}, start)]
+
+    async def iter_candidates(projection_model=None):
+        for candidate_id, profile, _ in stored:
+            yield SimpleNamespace(id=candidate_id, standardized_profile=profile)
+
+    async def latest_profile_update():
+        return max(stamp for _, _, stamp in stored)
+
+    async def iter_profiles_updated_since(since):
+        for candidate_id, profile, stamp in stored:
+            if since is None or stamp >= since:
+                yield candidate_id, profile
+
+    monkeypatch.setattr(CandidateDAO, "iter_candidates", staticmethod(iter_candidates))
+    monkeypatch.setattr(CandidateDAO, "latest_profile_update", staticmethod(latest_profile_update))
+    monkeypatch.setattr(
+        CandidateDAO, "iter_profiles_updated_since", staticmethod(iter_profiles_updated_since)
+    )
+    monkeypatch.setattr(settings, "KEYWORD_INDEX_REFRESH_SECONDS", 0)
+    monkeypatch.setattr(settings, "KEYWORD_INDEX_REFRESH_OVERLAP_SECONDS", 60)
+    keyword_index = KeywordIndex()
+
+    async def refresh():
+        return await keyword_index.ensure_fresh()
+
+    assert set(asyncio.run(refresh()).doc_terms) == {"b"}
+    # A smaller id committed late, with a stamp inside the overlap, and a
+    # merged profile.
+    stored.append(("a", {"technical_skills": ["python"]}, start - timedelta(seconds=30)))
+    stored[0] = ("b", {"technical_skills": ["go"]}, start + timedelta(seconds=10))
+    index = asyncio.run(refresh())
+    assert set(index.doc_terms) == {"a", "b"}
+    assert index.matching_all(["go"]) == {"b"}
+    assert index.matching_all(["java"]) == set()
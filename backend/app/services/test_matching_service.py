@@ -0,0 +1,84 @@
+# app/services/test_matching_service.py
+import asyncio
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.core.config import settings
+from app.dao.job_dao import JobDAO
+from app.dao.match_dao import MatchDAO
+from app.services import matching_service
+from app.services.matching_service import MatchingService
+
+CANDIDATE_ID = str(PydanticObjectId())
+JOB_ID = str(PydanticObjectId())
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    calls = []
+
+    def record(name):
+        async def method(*args, **kwargs):
+            calls.append((name, args, kwargs))
+
+        return staticmethod(method)
+
+    for name in (
+        "upsert_job_scores",
+        "upsert_candidate_scores",
+        "mark_job_materialized",
+        "mark_jobs_stale",
+    ):
+        monkeypatch.setattr(MatchDAO, name, record(name))
+
+    async def open_jobs():
+        return [PydanticObjectId(JOB_ID)]
+
+    monkeypatch.setattr(JobDAO, "get_materialized_job_ids", staticmethod(open_jobs))
+    return calls
+
+
+def fail(*args, **kwargs):
+    raise RuntimeError("vector store down")
+
+
+def test_failed_candidate_scoring_marks_the_jobs_stale(monkeypatch, recorded):
+    monkeypatch.setattr(matching_service.vector_repository, "get", fail)
+    with pytest.raises(RuntimeError):
+        asyncio.run(MatchingService.score_candidate_against_jobs(CANDIDATE_ID, [[1.0, 0.0]]))
+    assert recorded == [("mark_jobs_stale", ([PydanticObjectId(JOB_ID)],), {})]
+
+
+def test_candidate_is_scored_against_the_materialized_jobs_only(monkeypatch, recorded):
+    queries = []
+    job_data = {
+        "embeddings": [[1.0, 0.0], [0.0, 1.0]],
+        "metadatas": [{"document_id": JOB_ID}] * 2,
+        "documents": ["python", "kafka"],
+    }
+
+    def get(name, where, include):
+        queries.append(where)
+        return job_data
+
+    monkeypatch.setattr(matching_service.vector_repository, "get", get)
+    asyncio.run(MatchingService.score_candidate_against_jobs(CANDIDATE_ID, [[1.0, 0.0]]))
+
+    assert queries == [
+        {"$and": [{"document_type": "job"}, {"document_id": {"$in": [JOB_ID]}}]}
+    ]
+    [(name, args, kwargs)] = recorded
+    assert name == "upsert_candidate_scores"
+    assert args[1] == [(PydanticObjectId(JOB_ID), pytest.approx(1.0))]
+    assert kwargs["limit"] == settings.MATCH_MATERIALIZE_LIMIT
+
+
+def test_failed_job_refresh_marks_the_job_stale(monkeypatch, recorded):
+    async def rank(*args, **kwargs):
+        fail()
+
+    monkeypatch.setattr(MatchingService, "rank_candidates_for_job", staticmethod(rank))
+    with pytest.raises(RuntimeError):
+        asyncio.run(MatchingService.refresh_matches_for_job(JOB_ID))
+    assert recorded == [("mark_jobs_stale", ([PydanticObjectId(JOB_ID)],), {})]
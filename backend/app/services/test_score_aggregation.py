@@ -0,0 +1,118 @@
+# app/services/test_score_aggregation.py
+import numpy as np
+import pytest
+
+from app.services.score_aggregation import (
+    AggregationStrategy,
+    aggregate_hits,
+    aggregate_query_results,
+    l2_similarity_matrix,
+    reduce_chunk_scores,
+)
+
+
+def reference_scores(hits, n_queries, strategy, top_k=3, weights=None):
+    """Per-owner scores computed the slow, obvious way."""
+    floor = {
+        q: min(s for hq, _, s in hits if hq == q) for q in {q for q, _, _ in hits}
+    }
+    lowest = min(s for _, _, s in hits)
+    scores = {}
+    for owner in {o for _, o, _ in hits}:
+        row = []
+        for q in range(n_queries):
+            found = [s for hq, o, s in hits if hq == q and o == owner]
+            row.append(max(found) if found else floor.get(q, lowest))
+        if strategy == AggregationStrategy.MAX_SIM:
+            scores[owner] = max(row)
+        elif strategy == AggregationStrategy.MEAN_TOP_K:
+            scores[owner] = float(np.mean(sorted(row, reverse=True)[:top_k]))
+        else:
+            w = np.ones(n_queries) if weights is None else np.asarray(weights, float)
+            scores[owner] = float(np.dot(row, w / w.sum()))
+    return scores
+
+
+@pytest.mark.parametrize("strategy", list(AggregationStrategy))
+def test_aggregate_hits_matches_reference(strategy):
+    rng = np.random.default_rng(1)
+    n_queries = 4
+    hits = [
+        (int(rng.integers(n_queries)), f"owner{rng.integers(6)}", float(rng.random()))
+        for _ in range(40)
+    ]
+    weights = [1, 3, 0, 2]
+    ranked = aggregate_hits(
+        np.array([q for q, _, _ in hits]),
+        [o for _, o, _ in hits],
+        np.array([s for _, _, s in hits]),
+        n_queries=n_queries,
+        strategy=strategy,
+        top_k=2,
+        query_weights=weights,
+    )
+    expected = reference_scores(hits, n_queries, strategy, top_k=2, weights=weights)
+    assert dict(ranked) == pytest.approx(expected, abs=1e-6)
+    scores = [score for _, score in ranked]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_unretrieved_owner_gets_the_query_chunks_floor():
+    # Chunk 1 never retrieved "b" and chunk 0 never retrieved "c": each gets that
+    # chunk's lowest retrieved similarity there.
+    ranked = aggregate_hits(
+        np.array([0, 0, 1, 1]),
+        ["a", "b", "a", "c"],
+        np.array([0.9, 0.8, 0.7, 0.5]),
+        n_queries=2,
+        strategy=AggregationStrategy.WEIGHTED,
+    )
+    assert dict(ranked) == pytest.approx({"a": 0.8, "b": 0.65, "c": 0.65})
+
+
+def test_aggregate_hits_without_hits():
+    assert aggregate_hits(np.array([]), [], np.array([]), n_queries=3) == []
+
+
+def test_reduce_chunk_scores():
+    matrix = np.array([[0.9, 0.1, 0.5], [0.6, 0.6, 0.6]], dtype=np.float32)
+    assert reduce_chunk_scores(matrix, AggregationStrategy.MAX_SIM).tolist() == pytest.approx(
+        [0.9, 0.6]
+    )
+    assert reduce_chunk_scores(
+        matrix, AggregationStrategy.MEAN_TOP_K, top_k=2
+    ).tolist() == pytest.approx([0.7, 0.6])
+    # top_k larger than the number of query chunks averages all of them.
+    assert reduce_chunk_scores(
+        matrix, AggregationStrategy.MEAN_TOP_K, top_k=10
+    ).tolist() == pytest.approx([0.5, 0.6])
+    assert reduce_chunk_scores(
+        matrix, AggregationStrategy.WEIGHTED, query_weights=[0, 1, 1]
+    ).tolist() == pytest.approx([0.3, 0.6])
+    # All-zero weights fall back to a plain mean.
+    assert reduce_chunk_scores(
+        matrix, AggregationStrategy.WEIGHTED, query_weights=[0, 0, 0]
+    ).tolist() == pytest.approx([0.5, 0.6])
+    with pytest.raises(ValueError):
+        reduce_chunk_scores(matrix, "median")  # type: ignore
+
+
+def test_aggregate_query_results_uses_one_minus_distance():
+    results = {
+        "metadatas": [
+            [{"document_id": "a"}, {"document_id": "b"}],
+            [{"document_id": "b"}],
+        ],
+        "distances": [[0.2, 0.4], [0.1]],
+    }
+    ranked = aggregate_query_results(results, strategy=AggregationStrategy.WEIGHTED)
+    # a: (0.8 + floor 0.9) / 2, b: (0.6 + 0.9) / 2
+    assert ranked == [("a", pytest.approx(0.85)), ("b", pytest.approx(0.75))]
+    assert aggregate_query_results({"metadatas": [[]], "distances": [[]]}) == []
+
+
+def test_l2_similarity_matrix():
+    queries = np.array([[1, 0], [0, 2]], dtype=np.float32)
+    documents = np.array([[1, 0], [0, 1]], dtype=np.float32)
+    expected = 1 - ((queries[:, None, :] - documents[None, :, :]) ** 2).sum(axis=2)
+    assert l2_similarity_matrix(queries, documents) == pytest.approx(expected)
@@ -0,0 +1,154 @@
+# app/services/text_extraction.py
+import asyncio
+import multiprocessing
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.utils import file_utils
+from app.utils.file_utils import FileSource
+
+
+class TextExtractor(ABC):
+    """
+    A document-to-text backend. `extract` must be a plain, picklable call so it
+    can run in an extraction worker process; pass sources by path so only the
+    path, not the file, is sent to the worker.
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def extract(self, data: FileSource, filename: Optional[str] = None) -> str:
+        ...
+
+
+class PagedTextExtractor(TextExtractor):
+    """
+    A backend that can address pages individually, which lets large documents
+    be split into page ranges extracted by several workers.
+    """
+
+    @abstractmethod
+    def page_count(self, data: FileSource) -> int:
+        ...
+
+    @abstractmethod
+    def extract_pages(self, data: FileSource, start: int, stop: int) -> str:
+        ...
+
+
+class PypdfExtractor(PagedTextExtractor):
+    """Fast, pure-Python text layer extraction with pypdf."""
+
+    name = "pypdf"
+
+    def extract(self, data: FileSource, filename: Optional[str] = None) -> str:
+        return file_utils.extract_text_from_pdf(data)
+
+    def page_count(self, data: FileSource) -> int:
+        return file_utils.count_pdf_pages(data)
+
+    def extract_pages(self, data: FileSource, start: int, stop: int) -> str:
+        return file_utils.extract_text_from_pdf_pages(data, start, stop)
+
+
+class UnstructuredExtractor(TextExtractor):
+    """Layout-aware parsing with `unstructured`; slower but handles more formats."""
+
+    name = "unstructured"
+
+    def extract(self, data: FileSource, filename: Optional[str] = None) -> str:
+        return file_utils.extract_text_with_unstructured(data, filename)
+
+
+EXTRACTORS: Dict[str, TextExtractor] = {
+    extractor.name: extractor for extractor in (PypdfExtractor(), UnstructuredExtractor())
+}
+
+
+def get_extractor(name: Optional[str] = None) -> TextExtractor:
+    name = name or settings.PDF_EXTRACTOR_BACKEND
+    try:
+        return EXTRACTORS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown text extractor '{name}'. Expected one of: {', '.join(EXTRACTORS)}"
+        )
+
+
+def _run_extract(name: str, data: FileSource, filename: Optional[str]) -> str:
+    return EXTRACTORS[name].extract(data, filename)
+
+
+def _run_extract_pages(name: str, data: FileSource, start: int, stop: int) -> str:
+    extractor = EXTRACTORS[name]
+    assert isinstance(extractor, PagedTextExtractor)
+    return extractor.extract_pages(data, start, stop)
+
+
+def page_ranges(n_pages: int, pages_per_task: int) -> List[Tuple[int, int]]:
+    """Splits [0, n_pages) into consecutive ranges of at most `pages_per_task` pages."""
+    step = max(1, pages_per_task)
+    return [(start, min(start + step, n_pages)) for start in range(0, n_pages, step)]
+
+
+_executor: Optional[Executor] = None
+
+
+def get_extraction_executor() -> Executor:
+    """
+    Returns the shared extraction pool. PDF parsing is CPU bound and holds the
+    GIL, so it runs in worker processes. Daemonic processes (e.g. Celery prefork
+    children) may not start their own, so they fall back to a thread pool.
+    """
+    global _executor
+    if _executor is None:
+        workers = settings.PDF_EXTRACTION_WORKERS or os.cpu_count() or 1
+        if multiprocessing.current_process().daemon:
+            _executor = ThreadPoolExecutor(max_workers=workers)
+        else:
+            # "spawn" keeps the parent's threads, sockets and event loop out of workers.
+            _executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+    return _executor
+
+
+def shutdown_extraction_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def extract_text(
+    data: FileSource, filename: Optional[str] = None, backend: Optional[str] = None
+) -> str:
+    """
+    Extracts the text of a document off the event loop. Documents with at least
+    PDF_PARALLEL_PAGE_THRESHOLD pages are split into page ranges extracted in
+    parallel, then joined back in page order.
+    """
+    extractor = get_extractor(backend)
+    loop = asyncio.get_running_loop()
+    executor = get_extraction_executor()
+
+    if isinstance(extractor, PagedTextExtractor):
+        n_pages = await asyncio.to_thread(extractor.page_count, data)
+        if n_pages >= settings.PDF_PARALLEL_PAGE_THRESHOLD:
+            parts = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        executor, _run_extract_pages, extractor.name, data, start, stop
+                    )
+                    for start, stop in page_ranges(n_pages, settings.PDF_PAGES_PER_TASK)
+                )
+            )
+            return "".join(parts)
+
+    return await loop.run_in_executor(
+        executor, _run_extract, extractor.name, data, filename
+    )
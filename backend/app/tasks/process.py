@@ -1,22 +1,197 @@
 # app/tasks/process.py
-import base64
 import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Union
 from beanie import PydanticObjectId
+from celery.signals import worker_process_shutdown
 
 from app.core.celery_app import celery
 from app.core.config import settings
-from app.db.models import Candidate, Job, ProcessingStatus
+from app.dao.upload_dao import UploadDAO
+from app.db.models import DuplicatePolicy, Job, ProcessingStatus
+from app.db_clients.mongo_client import init_mongo
+from app.llm.provider_registry import provider_registry
 from app.services.document_processor import DocumentProcessor
+from app.services.embedding_projection import get_projection
+from app.services.ingestion_pipeline import IngestionItem, ResumeIngestionPipeline
+from app.services.matching_service import MatchingService
+from app.utils import ai_utils
+from app.utils.upload_utils import SpooledUpload
+from app.vector_store.repository import JOBS_COLLECTION, vector_repository
 
 processor = DocumentProcessor()
 
 
-async def _process_job(job_id_str: str, title: str, content: str):
+async def _process_job(job_id_str: str):
     """The async logic for processing a job description."""
     job_id = PydanticObjectId(job_id_str)
+    job = await Job.get(job_id)
+    if job is None:
+        raise ValueError(f"Job with ID {job_id_str} not found.")
     try:
-        processor.process_and_embed_jobs(
-            doc_id=job_id_str, text=content, doc_type="job"
+        job.status = ProcessingStatus.PROCESSING
+        await job.save()
+
+        try:
+            # Parsed once here; match requests filter candidates on it.
+            job.requirements = await ai_utils.extract_job_requirements(
+                job.description or ""
+            )
+        except Exception as e:
+            print("error while extracting job requirements", e)
+
+        await processor.process_and_embed_jobs(
+            doc_id=job_id_str, text=job.description or "", doc_type="job"
         )
+        # Earlier versions also stored one whole-description vector under the
+        # bare job id; nothing reads it, so it goes when the job is re-embedded.
+        await asyncio.to_thread(
+            vector_repository.delete, JOBS_COLLECTION, ids=[job_id_str]
+        )
+        try:
+            await MatchingService.refresh_matches_for_job(job_id_str)
+        except Exception as e:
+            # Reads fall back to live matching until the job is materialized.
+            print("error while materializing matches for new job", e)
+
+        job.embedding_version = get_projection().version
+        job.status = ProcessingStatus.COMPLETED
+        job.error_message = None
+        await job.save()
     except Exception as e:
+        job.status = ProcessingStatus.ERROR
+        job.error_message = str(e)
+        await job.save()
         raise e
+
+
+async def _record_upload_status(item: IngestionItem):
+    if item.upload_id is None:
+        return
+    await UploadDAO.update_status(
+        item.upload_id,
+        status=item.status,
+        candidate_id=item.candidate.id if item.candidate is not None else None,
+        duplicate_of=item.duplicate_of.id if item.duplicate_of is not None else None,
+        duplicate_kind=item.duplicate_kind,
+        error_message=item.error,
+    )
+
+
+async def _process_resume_batch(
+    uploads: List[Dict[str, Union[str, int]]], on_duplicate: str
+):
+    """
+    Runs a batch of spooled resume files through the ingestion pipeline,
+    recording each file's progress on its ResumeUpload document.
+    """
+    files = [SpooledUpload(**upload) for upload in uploads]
+    pipeline = ResumeIngestionPipeline(
+        processor=processor,
+        on_duplicate=DuplicatePolicy(on_duplicate),
+        on_status_change=_record_upload_status,
+    )
+    await pipeline.run(
+        files, upload_ids=[PydanticObjectId(upload["upload_id"]) for upload in uploads]
+    )
+
+
+_worker = threading.local()
+# Every worker thread's loop, so process shutdown can close them all.
+_worker_loops: List[asyncio.AbstractEventLoop] = []
+_worker_loops_lock = threading.Lock()
+
+
+def _worker_loop() -> asyncio.AbstractEventLoop:
+    """
+    The event loop of this worker process (thread), created on first use and
+    kept for every later task, so the Mongo client, pooled LLM clients and
+    rate limiter state carry over from task to task.
+    """
+    loop = getattr(_worker, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(init_mongo())
+        _worker.loop = loop
+        with _worker_loops_lock:
+            _worker_loops.append(loop)
+    return loop
+
+
+def _run_in_worker(coroutine_fn: Callable[..., Awaitable[Any]], *args):
+    """Runs a task coroutine on the worker's long-lived event loop."""
+    return _worker_loop().run_until_complete(coroutine_fn(*args))
+
+
+@worker_process_shutdown.connect
+def _close_worker_loops(**kwargs):
+    """Closes each worker loop's LLM providers, then the loop."""
+    with _worker_loops_lock:
+        loops = list(_worker_loops)
+        _worker_loops.clear()
+    for loop in loops:
+        if loop.is_closed():
+            continue
+        try:
+            loop.run_until_complete(provider_registry.aclose())
+        finally:
+            loop.close()
+
+
+@celery.task(name="process_job")
+def process_job(job_id_str: str):
+    _run_in_worker(_process_job, job_id_str)
+
+
+@celery.task(name="process_resume_batch")
+def process_resume_batch(uploads: List[Dict[str, Union[str, int]]], on_duplicate: str):
+    _run_in_worker(_process_resume_batch, uploads, on_duplicate)
+
+
+_TASK_COROUTINES: Dict[str, Callable[..., Awaitable[Any]]] = {
+    process_job.name: _process_job,
+    process_resume_batch.name: _process_resume_batch,
+}
+# Strong references to in-process tasks so they are not garbage collected.
+_background_tasks: set = set()
+
+
+def _on_background_done(background: asyncio.Task):
+    _background_tasks.discard(background)
+    if not background.cancelled() and background.exception() is not None:
+        print(f"Error in background task: {background.exception()}")
+
+
+def tasks_run_in_process() -> bool:
+    """
+    Whether dispatch runs tasks on the caller's loop (see TASKS_RUN_IN_PROCESS).
+    Raises if tasks would be queued on the in-memory broker, where they would
+    stay PENDING forever since no worker process can read it.
+    """
+    in_memory_broker = settings.CELERY_BROKER_URL.startswith("memory://")
+    if settings.TASKS_RUN_IN_PROCESS is None:
+        return in_memory_broker
+    if not settings.TASKS_RUN_IN_PROCESS and in_memory_broker:
+        raise RuntimeError(
+            "TASKS_RUN_IN_PROCESS is false but CELERY_BROKER_URL is the in-memory "
+            "broker, which workers cannot read; configure a real broker (e.g. Redis)."
+        )
+    return settings.TASKS_RUN_IN_PROCESS
+
+
+def dispatch(task, *args):
+    """
+    Queues `task` for a worker. When tasks run in process (see
+    tasks_run_in_process) the task coroutine is scheduled on the caller's event
+    loop instead; either way this returns immediately and progress is reported
+    through the document's status.
+    """
+    if tasks_run_in_process():
+        background = asyncio.get_running_loop().create_task(
+            _TASK_COROUTINES[task.name](*args)
+        )
+        _background_tasks.add(background)
+        background.add_done_callback(_on_background_done)
+    else:
+        task.delay(*args)
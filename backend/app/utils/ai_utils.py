@@ -1,22 +1,13 @@
+import hashlib
 import json
-import numpy as np
-from openai import AsyncAzureOpenAI
 from backend.app.core.config import settings
-from app.llm.azure_openai_provider import AzureOpenAIProvider
+from app.dao.profile_cache_dao import ProfileCacheDAO
+from app.db.models import JobRequirements
+from app.llm.provider_registry import get_async_provider
 
 
-def get_embeddings(input) -> list[float]:
-    """Generates embeddings for a given text using Azure OpenAI."""
-    client = AzureOpenAIProvider(type="embedding")
-    response = client.embeddings(input=input)
-    return response.data[0].embedding
-
-
-async def standardize_resume(raw_text: str) -> dict:
-    """Uses a chat model to parse and standardize resume text into a detailed JSON format."""
-
-    # Updated system prompt to guide the LLM for a more structured output.
-    system_prompt = """
+# Updated system prompt to guide the LLM for a more structured output.
+RESUME_STANDARDIZATION_PROMPT = """
     You are an expert HR data analyst specializing in parsing resumes. Your task is to extract and structure information from the provided resume text into a specific JSON format.
 
     The JSON output must be a single, valid JSON object with the following keys: "personal_info", "summary", "technical_skills", "work_experience", "education", and "certifications".
@@ -38,35 +29,101 @@ async def standardize_resume(raw_text: str) -> dict:
 
     IMPORTANT: Do not include any personal contact information (email, phone, address). Do not add any explanatory text or markdown formatting before or after the JSON object.
     """
-    client = AzureOpenAIProvider(type="chat")
-    response = client.chat(
+
+# Cached profiles are keyed by this version, so editing the prompt above
+# automatically stops serving profiles produced by the old prompt.
+STANDARDIZATION_PROMPT_VERSION = (
+    settings.STANDARDIZATION_PROMPT_VERSION
+    or hashlib.sha256(RESUME_STANDARDIZATION_PROMPT.encode("utf-8")).hexdigest()[:16]
+)
+
+
+def hash_document_text(raw_text: str) -> str:
+    """Content hash of extracted resume text."""
+    return hashlib.sha256(raw_text.encode("utf-8")).hexdigest()
+
+
+async def standardize_resume(raw_text: str, use_cache: bool = True) -> dict:
+    """
+    Uses a chat model to parse and standardize resume text into a detailed JSON format.
+    Profiles are cached by text hash and prompt version, so a re-uploaded resume skips the LLM.
+    """
+    content_hash = hash_document_text(raw_text)
+    if use_cache:
+        cached = await ProfileCacheDAO.get_profile(
+            content_hash=content_hash, prompt_version=STANDARDIZATION_PROMPT_VERSION
+        )
+        if cached is not None:
+            return cached
+
+    client = get_async_provider("chat")
+    response = await client.chat(
         response_format={"type": "json_object"},
         messages=[
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": RESUME_STANDARDIZATION_PROMPT},
             {"role": "user", "content": f"Here is the resume text:\n\n{raw_text}"},
         ],
     )
 
     try:
-        return json.loads(response.choices[0].message.content)
+        profile = json.loads(response.choices[0].message.content)
     except (json.JSONDecodeError, IndexError, AttributeError):
         return {"error": "Failed to parse resume content from LLM response"}
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
         raise e
 
+    if use_cache and "error" not in profile:
+        await ProfileCacheDAO.save_profile(
+            content_hash=content_hash,
+            prompt_version=STANDARDIZATION_PROMPT_VERSION,
+            profile=profile,
+        )
+    return profile
+
+
+async def invalidate_standardization_cache(all_versions: bool = False) -> int:
+    """
+    Drops cached profiles. By default only entries from older prompt versions
+    are removed; pass all_versions=True to force every resume to be re-parsed.
+    """
+    return await ProfileCacheDAO.delete_profiles(
+        keep_version=None if all_versions else STANDARDIZATION_PROMPT_VERSION
+    )
+
+
+JOB_REQUIREMENTS_PROMPT = """
+    You are an expert technical recruiter. Extract the hard, must-have requirements from the provided job description into a specific JSON format.
+
+    The JSON output must be a single, valid JSON object with the following keys: "skills", "certifications", and "min_years_experience".
 
-def calculate_cosine_similarity(vec1: list[float], vec2: list[float]) -> float:
-    """Calculates the cosine similarity between two embedding vectors."""
-    dot_product = np.dot(vec1, vec2)
-    norm_a = np.linalg.norm(vec1)
-    norm_b = np.linalg.norm(vec2)
-    similarity = dot_product / (norm_a * norm_b)
-    return float(similarity)
+    Follow these instructions for each key:
+    - "skills": A list of strings, each a specific technology or skill the description states is required (e.g., "Kubernetes", "Terraform"). Use the shortest common name of each skill. Do not include preferred, nice-to-have or bonus skills.
+    - "certifications": A list of strings, each a certification the description states is required (e.g., "AWS Certified Solutions Architect").
+    - "min_years_experience": The minimum total years of professional experience required, as a number, or null if none is stated.
+
+    If the description has no must-have requirement of a kind, use an empty list (or null). Do not add any explanatory text or markdown formatting before or after the JSON object.
+    """
 
 
-def create_summary_from_profile(profile: dict) -> str:
-    """Creates a concise text summary from a standardized profile for embedding."""
-    summary = profile.get("summary", "")
-    skills = ", ".join(profile.get("skills", []))
-    return f"Professional Summary: {summary}\nKey Skills: {skills}"
+async def extract_job_requirements(description: str) -> JobRequirements:
+    """Uses a chat model to parse a job description's must-have requirements."""
+    client = get_async_provider("chat")
+    response = await client.chat(
+        response_format={"type": "json_object"},
+        messages=[
+            {"role": "system", "content": JOB_REQUIREMENTS_PROMPT},
+            {"role": "user", "content": f"Here is the job description:\n\n{description}"},
+        ],
+    )
+    try:
+        parsed = json.loads(response.choices[0].message.content)
+    except (json.JSONDecodeError, IndexError, AttributeError):
+        raise ValueError("Failed to parse job requirements from LLM response")
+    return JobRequirements(
+        skills=[str(s) for s in parsed.get("skills") or [] if str(s).strip()],
+        certifications=[
+            str(c) for c in parsed.get("certifications") or [] if str(c).strip()
+        ],
+        min_years_experience=parsed.get("min_years_experience") or None,
+    )
@@ -0,0 +1,66 @@
+import hashlib
+import re
+from collections import Counter
+from typing import List
+
+SIMHASH_BITS = 64
+# 4 bands of 16 bits: two fingerprints within 3 bits of each other are
+# guaranteed to share at least one band (pigeonhole), so band equality is a
+# cheap indexed pre-filter for near-duplicate lookups.
+SIMHASH_BANDS = 4
+# Largest Hamming distance the band lookup is guaranteed to find.
+MAX_NEAR_DUPLICATE_DISTANCE = SIMHASH_BANDS - 1
+_BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercases and collapses whitespace so trivially re-exported PDFs hash the same."""
+    return " ".join(text.lower().split())
+
+
+def content_hash(text: str) -> str:
+    """Exact-duplicate key for a document's extracted text."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def _shingles(text: str, size: int = 3) -> Counter:
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < size:
+        return Counter([" ".join(tokens)]) if tokens else Counter()
+    return Counter(
+        " ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)
+    )
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over word 3-shingles, weighted by shingle frequency."""
+    weights = [0] * SIMHASH_BITS
+    for shingle, count in _shingles(text).items():
+        h = int.from_bytes(
+            hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if (h >> bit) & 1 else -count
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def simhash_to_hex(fingerprint: int) -> str:
+    return f"{fingerprint:016x}"
+
+
+def simhash_bands(fingerprint: int) -> List[str]:
+    """Band keys stored on the candidate for indexed near-duplicate lookups."""
+    mask = (1 << _BAND_BITS) - 1
+    return [
+        f"{i}:{(fingerprint >> (i * _BAND_BITS)) & mask:04x}"
+        for i in range(SIMHASH_BANDS)
+    ]
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
@@ -1,28 +1,70 @@
+import os
+from contextlib import contextmanager
 from io import BytesIO
-from typing import Union
+from typing import BinaryIO, Iterator, Optional, Union
 from pypdf import PdfReader
 
+# Kept free of heavy imports: these functions run inside extraction worker processes.
 
-def extract_text_from_pdf(file_input: Union[BytesIO, bytes]) -> str:
+# A document as raw bytes, a readable binary stream, or a path to a file on disk.
+FileSource = Union[bytes, BinaryIO, str, os.PathLike]
+
+
+@contextmanager
+def _open_source(file_input: FileSource) -> Iterator[BinaryIO]:
+    if isinstance(file_input, (str, os.PathLike)):
+        # Read pages from disk on demand rather than loading the whole file.
+        with open(file_input, "rb") as file_stream:
+            yield file_stream
+        return
+    # If the input is raw bytes, wrap it in a BytesIO stream
+    if isinstance(file_input, bytes):
+        file_stream = BytesIO(file_input)
+    else:
+        file_stream = file_input
+    # Ensure the stream is at the beginning
+    file_stream.seek(0)
+    yield file_stream
+
+
+def count_pdf_pages(file_input: FileSource) -> int:
+    """Returns the number of pages in a PDF without extracting any text."""
+    with _open_source(file_input) as file_stream:
+        return len(PdfReader(file_stream).pages)
+
+
+def extract_text_from_pdf_pages(
+    file_input: FileSource, start: int = 0, stop: Optional[int] = None
+) -> str:
+    """Extracts the text of pages [start, stop) of a PDF."""
+    try:
+        with _open_source(file_input) as file_stream:
+            reader = PdfReader(file_stream)
+            pages = reader.pages[start:stop]
+            return "".join([page.extract_text() or "" for page in pages])
+    except Exception as e:
+        print(f"Error while extracting text from pdf: {e}")
+        raise e
+
+
+def extract_text_from_pdf(file_input: FileSource) -> str:
     """
     Extracts text content from a PDF file.
-    Accepts either a bytes object or a BytesIO stream.
+    Accepts a bytes object, a binary stream, or a path.
     """
+    return extract_text_from_pdf_pages(file_input)
+
+
+def extract_text_with_unstructured(
+    file_input: FileSource, filename: Optional[str] = None
+) -> str:
+    """Parses a document into clean text using unstructured's auto partitioner."""
+    from unstructured.partition.auto import partition
+
     try:
-        # If the input is raw bytes, wrap it in a BytesIO stream
-        if isinstance(file_input, bytes):
-            file_stream = BytesIO(file_input)
-        else:
-            file_stream = file_input
-
-        # Ensure the stream is at the beginning
-        file_stream.seek(0)
-
-        reader = PdfReader(file_stream)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() or ""
-        return text
+        with _open_source(file_input) as file_stream:
+            elements = partition(file=file_stream, file_filename=filename)
+        return "\n\n".join([str(el) for el in elements])
     except Exception as e:
-        print(f"Error while extracting text from pdf: {e}")
+        print(f"Error while extracting text with unstructured: {e}")
         raise e
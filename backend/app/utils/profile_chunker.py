@@ -0,0 +1,131 @@
+# app/utils/profile_chunker.py
+from typing import Any, Dict, List, Union
+
+from pydantic import BaseModel
+
+from app.db.models import ProfileSection
+
+
+class ProfileChunk(BaseModel):
+    """One embeddable chunk of a standardized profile and where it came from."""
+
+    text: str
+    section: ProfileSection
+    # Extra Chroma metadata, e.g. the skill category or company (str values only).
+    metadata: Dict[str, str] = {}
+
+
+def _as_list(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _join(values: Union[List[Any], Any], separator: str = ", ") -> str:
+    return separator.join(str(v).strip() for v in _as_list(values) if str(v).strip())
+
+
+def _experience_chunks(job: Dict[str, Any]) -> List[ProfileChunk]:
+    title = _join(job.get("title"))
+    company = str(job.get("company") or "").strip()
+    header = " at ".join(part for part in (title, company) if part)
+    if job.get("duration"):
+        header = f"{header} ({job['duration']})"
+    metadata = {"company": company} if company else {}
+
+    projects = [p for p in _as_list(job.get("projects")) if isinstance(p, dict)]
+    if not projects:
+        return [
+            ProfileChunk(
+                text=f"Experience: {header}",
+                section=ProfileSection.EXPERIENCE,
+                metadata=metadata,
+            )
+        ]
+
+    chunks = []
+    for project in projects:
+        lines = [f"Experience: {header}"]
+        if project.get("name"):
+            lines.append(f"Project: {project['name']}")
+        if project.get("description"):
+            lines.append(str(project["description"]))
+        responsibilities = _join(project.get("responsibilities"), "\n- ")
+        if responsibilities:
+            lines.append(f"Responsibilities:\n- {responsibilities}")
+        chunks.append(
+            ProfileChunk(
+                text="\n".join(lines), section=ProfileSection.EXPERIENCE, metadata=metadata
+            )
+        )
+    return chunks
+
+
+def chunk_profile(profile: Dict[str, Any]) -> List[ProfileChunk]:
+    """
+    Splits a standardized profile (see RESUME_STANDARDIZATION_PROMPT) along its
+    own structure: one chunk for the summary, one per technical skill category,
+    one per work-experience project, one for education and one for
+    certifications. Sections missing from the profile produce no chunks.
+    """
+    chunks: List[ProfileChunk] = []
+
+    personal_info = profile.get("personal_info") or {}
+    title = personal_info.get("title") if isinstance(personal_info, dict) else None
+    summary = str(profile.get("summary") or "").strip()
+    if summary or title:
+        text = f"Title: {title}\n" if title else ""
+        chunks.append(
+            ProfileChunk(
+                text=f"{text}Professional Summary: {summary}".strip(),
+                section=ProfileSection.SUMMARY,
+            )
+        )
+
+    skills = profile.get("technical_skills") or {}
+    if isinstance(skills, dict):
+        for category, values in skills.items():
+            joined = _join(values)
+            if joined:
+                chunks.append(
+                    ProfileChunk(
+                        text=f"{category} Skills: {joined}",
+                        section=ProfileSection.SKILLS,
+                        metadata={"skill_category": str(category)},
+                    )
+                )
+    elif _join(skills):
+        chunks.append(
+            ProfileChunk(text=f"Skills: {_join(skills)}", section=ProfileSection.SKILLS)
+        )
+
+    for job in _as_list(profile.get("work_experience")):
+        if isinstance(job, dict):
+            chunks.extend(_experience_chunks(job))
+
+    education = [
+        " - ".join(
+            str(entry.get(key)).strip() for key in ("degree", "institution") if entry.get(key)
+        )
+        if isinstance(entry, dict)
+        else str(entry)
+        for entry in _as_list(profile.get("education"))
+    ]
+    education = [entry for entry in education if entry]
+    if education:
+        chunks.append(
+            ProfileChunk(
+                text="Education:\n" + "\n".join(education),
+                section=ProfileSection.EDUCATION,
+            )
+        )
+
+    certifications = _join(profile.get("certifications"), "\n")
+    if certifications:
+        chunks.append(
+            ProfileChunk(
+                text=f"Certifications:\n{certifications}",
+                section=ProfileSection.CERTIFICATIONS,
+            )
+        )
+    return chunks
@@ -0,0 +1,202 @@
+# app/utils/term_utils.py
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+# Keeps symbols that are part of skill names: c++, c#, node.js, ci/cd, az-104.
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./\-]*")
+
+# Spellings of the same skill, mapped to one term on both the profile and the
+# requirement side. Multi-word keys are replaced in the text before tokenizing.
+_ALIASES = {
+    "amazon web services": "aws",
+    "google cloud platform": "gcp",
+    "google cloud": "gcp",
+    "microsoft azure": "azure",
+    "continuous integration": "ci/cd",
+    "machine learning": "ml",
+    "artificial intelligence": "ai",
+    "natural language processing": "nlp",
+    "c sharp": "c#",
+    "k8s": "kubernetes",
+    "golang": "go",
+    "js": "javascript",
+    "ts": "typescript",
+    "nodejs": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "postgres": "postgresql",
+}
+_PHRASE_ALIAS_RE = re.compile(
+    r"\b(?:"
+    + "|".join(re.escape(key) for key in sorted(_ALIASES, key=len, reverse=True) if " " in key)
+    + r")\b"
+)
+_LETTER_RE = re.compile(r"[a-z]")
+# Filler words of LLM-extracted requirement phrases ("Experience with ...").
+_REQUIREMENT_STOPWORDS = frozenset(
+    """
+    a an and or the of in on with for to using including such as etc
+    experience experienced expertise knowledge proficiency proficient
+    familiarity familiar understanding strong solid good excellent deep
+    working hands-on ability skills skill years year plus
+    """.split()
+)
+
+_MONTHS = {
+    name: i + 1
+    for i, names in enumerate(
+        [
+            ("jan", "january"),
+            ("feb", "february"),
+            ("mar", "march"),
+            ("apr", "april"),
+            ("may",),
+            ("jun", "june"),
+            ("jul", "july"),
+            ("aug", "august"),
+            ("sep", "sept", "september"),
+            ("oct", "october"),
+            ("nov", "november"),
+            ("dec", "december"),
+        ]
+    )
+    for name in names
+}
+_MONTH_NAMES = "|".join(sorted(_MONTHS, key=len, reverse=True))
+# "Nov 2018", "11/2018", "2018-11" or "2018", or an open end such as "Present".
+_DATE_RE = re.compile(
+    rf"(?:\b(?P<month_name>{_MONTH_NAMES})\.?,?\s*(?P<year_a>(?:19|20)\d{{2}})\b)"
+    r"|(?:\b(?P<month_num>\d{1,2})[/.-](?P<year_b>(?:19|20)\d{2})\b)"
+    r"|(?:\b(?P<year_c>(?:19|20)\d{2})[/.-](?P<month_c>\d{1,2})\b)"
+    r"|(?:\b(?P<year_d>(?:19|20)\d{2})\b)"
+    r"|(?P<present>\b(?:present|current|now|till date|to date|ongoing)\b)"
+)
+# A single date that opens a period still running: "Since 2018", "2018 -".
+_OPEN_START_RE = re.compile(r"\b(?:since|from)\b|[-\u2013\u2014]\s*$")
+
+# Bump when the derivation of Candidate's requirement fields changes, so that
+# stored candidates are recomputed (see CandidateDAO.backfill_requirement_fields).
+REQUIREMENT_FIELDS_VERSION = 3
+
+
+def tokenize(text: str) -> List[str]:
+    text = _PHRASE_ALIAS_RE.sub(lambda m: _ALIASES[m.group(0)], text.lower())
+    tokens = (token.rstrip(".-/") for token in _TOKEN_RE.findall(text))
+    return [_ALIASES.get(token, token) for token in tokens]
+
+
+def _as_strings(value: Any) -> List[str]:
+    if value is None:
+        return []
+    return [str(v) for v in (value if isinstance(value, list) else [value])]
+
+
+def profile_terms(profile: Dict[str, Any]) -> List[str]:
+    """
+    Terms of a standardized profile's technical skills, certifications and
+    titles (the candidate's headline title and every job title held).
+    """
+    texts: List[str] = []
+    skills = profile.get("technical_skills") or {}
+    if isinstance(skills, dict):
+        for values in skills.values():
+            texts.extend(_as_strings(values))
+    else:
+        texts.extend(_as_strings(skills))
+    texts.extend(_as_strings(profile.get("certifications")))
+    personal_info = profile.get("personal_info") or {}
+    if isinstance(personal_info, dict) and personal_info.get("title"):
+        texts.append(str(personal_info["title"]))
+    for job in profile.get("work_experience") or []:
+        if isinstance(job, dict) and job.get("title"):
+            texts.extend(_as_strings(job["title"]))
+    return [token for text in texts for token in tokenize(text)]
+
+
+def certification_terms(profile: Dict[str, Any]) -> List[str]:
+    return [
+        token
+        for text in _as_strings(profile.get("certifications"))
+        for token in tokenize(text)
+    ]
+
+
+def requirement_groups(requirements: List[str]) -> List[List[str]]:
+    """
+    One list of terms per requirement phrase, without filler words or bare
+    numbers. A
+    candidate meets a requirement when its profile has any of the terms, so
+    "Experience with distributed systems" asks for "distributed" or "systems".
+    """
+    groups: List[List[str]] = []
+    for requirement in requirements:
+        terms = sorted(
+            {
+                token
+                for token in tokenize(requirement)
+                if token not in _REQUIREMENT_STOPWORDS and _LETTER_RE.search(token)
+            }
+        )
+        if terms and terms not in groups:
+            groups.append(terms)
+    return groups
+
+
+def _parse_date(match: "re.Match") -> Optional[Tuple[int, int]]:
+    """(year, month) of a _DATE_RE match; a bare year counts from January."""
+    if match.group("present"):
+        today = date.today()
+        return today.year, today.month
+    if match.group("month_name"):
+        month = _MONTHS.get(match.group("month_name"))
+        return (int(match.group("year_a")), month) if month else None
+    if match.group("month_num"):
+        month = int(match.group("month_num"))
+        return (int(match.group("year_b")), month) if 1 <= month <= 12 else None
+    if match.group("year_c"):
+        month = int(match.group("month_c"))
+        return (int(match.group("year_c")), month) if 1 <= month <= 12 else None
+    return int(match.group("year_d")), 1
+
+
+def parse_duration(duration: str) -> Optional[Tuple[int, int]]:
+    """
+    Parses an employment period such as "Nov 2018 - Jul 2021", "2019 - Present"
+    or "Since 2018" into a [start, end) range of month indexes
+    (year * 12 + month - 1). Any other period with a single date counts as one
+    month.
+    """
+    text = duration.lower().strip()
+    dates = [d for d in map(_parse_date, _DATE_RE.finditer(text)) if d]
+    if not dates:
+        return None
+    if len(dates) == 1 and _OPEN_START_RE.search(text):
+        today = date.today()
+        dates.append((today.year, today.month))
+    start = dates[0][0] * 12 + dates[0][1] - 1
+    end = dates[-1][0] * 12 + dates[-1][1] - 1
+    return (start, end + 1) if end >= start else None
+
+
+def experience_years(profile: Dict[str, Any]) -> Optional[float]:
+    """Total years of work experience, counting overlapping jobs once."""
+    ranges = sorted(
+        r
+        for job in profile.get("work_experience") or []
+        if isinstance(job, dict) and job.get("duration")
+        for r in [parse_duration(str(job["duration"]))]
+        if r is not None
+    )
+    if not ranges:
+        return None
+    months = 0
+    current_start, current_end = ranges[0]
+    for start, end in ranges[1:]:
+        if start <= current_end:
+            current_end = max(current_end, end)
+        else:
+            months += current_end - current_start
+            current_start, current_end = start, end
+    months += current_end - current_start
+    return round(months / 12, 1)
@@ -0,0 +1,86 @@
+# app/utils/test_dedup_utils.py
+import random
+
+from app.core.config import settings
+from app.utils.dedup_utils import (
+    MAX_NEAR_DUPLICATE_DISTANCE,
+    SIMHASH_BANDS,
+    SIMHASH_BITS,
+    content_hash,
+    hamming_distance,
+    simhash,
+    simhash_bands,
+    simhash_to_hex,
+)
+
+RESUME = (
+    "Senior data engineer with eight years of experience building batch and "
+    "streaming pipelines in Python, Spark and Kafka. Led the migration of a "
+    "reporting warehouse to Snowflake, mentored four engineers and owned the "
+    "on-call rotation for the ingestion platform. Skills: Python, SQL, Spark, "
+    "Kafka, Airflow, Terraform, AWS."
+)
+
+
+def test_content_hash_ignores_case_and_whitespace():
+    assert content_hash(RESUME) == content_hash("  " + RESUME.upper().replace(" ", "\n "))
+    assert content_hash(RESUME) != content_hash(RESUME + " Go.")
+
+
+def test_simhash_is_deterministic_and_64_bit():
+    assert simhash(RESUME) == simhash(RESUME)
+    assert 0 <= simhash(RESUME) < 1 << SIMHASH_BITS
+    assert simhash("") == 0
+
+
+def test_simhash_distance_tracks_similarity():
+    edited = RESUME.replace("four engineers", "five engineers")
+    unrelated = (
+        "Registered nurse with a decade of intensive care experience, trained in "
+        "triage, patient education and electronic health records, looking for a "
+        "charge nurse role at a regional hospital."
+    )
+    near = hamming_distance(simhash(RESUME), simhash(edited))
+    far = hamming_distance(simhash(RESUME), simhash(unrelated))
+    assert near <= settings.INGEST_NEAR_DUPLICATE_DISTANCE < far
+    assert far > 3 * SIMHASH_BANDS
+
+
+def test_simhash_to_hex_round_trips():
+    for fingerprint in (0, 1, (1 << SIMHASH_BITS) - 1, simhash(RESUME)):
+        encoded = simhash_to_hex(fingerprint)
+        assert len(encoded) == SIMHASH_BITS // 4
+        assert int(encoded, 16) == fingerprint
+
+
+def test_simhash_bands_split_the_fingerprint():
+    fingerprint = 0x0123_4567_89AB_CDEF
+    assert simhash_bands(fingerprint) == ["0:cdef", "1:89ab", "2:4567", "3:0123"]
+
+
+def test_fingerprints_within_the_max_distance_share_a_band():
+    rng = random.Random(0)
+    for _ in range(200):
+        fingerprint = rng.getrandbits(SIMHASH_BITS)
+        flipped = fingerprint
+        for bit in rng.sample(range(SIMHASH_BITS), MAX_NEAR_DUPLICATE_DISTANCE):
+            flipped ^= 1 << bit
+        assert hamming_distance(fingerprint, flipped) == MAX_NEAR_DUPLICATE_DISTANCE
+        assert set(simhash_bands(fingerprint)) & set(simhash_bands(flipped))
+
+
+def test_one_more_bit_can_miss_every_band():
+    # One flipped bit in each band.
+    flipped = sum(1 << (band * SIMHASH_BITS // SIMHASH_BANDS) for band in range(SIMHASH_BANDS))
+    assert hamming_distance(0, flipped) == MAX_NEAR_DUPLICATE_DISTANCE + 1
+    assert not set(simhash_bands(0)) & set(simhash_bands(flipped))
+
+
+def test_default_near_duplicate_distance_is_findable():
+    assert settings.INGEST_NEAR_DUPLICATE_DISTANCE <= MAX_NEAR_DUPLICATE_DISTANCE
+
+
+def test_hamming_distance():
+    assert hamming_distance(0, 0) == 0
+    assert hamming_distance(0b1011, 0b0001) == 2
+    assert hamming_distance(0, (1 << SIMHASH_BITS) - 1) == SIMHASH_BITS
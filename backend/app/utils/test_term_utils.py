@@ -0,0 +1,109 @@
+# app/utils/test_term_utils.py
+from datetime import date
+
+import pytest
+
+from app.utils.term_utils import (
+    experience_years,
+    parse_duration,
+    profile_terms,
+    requirement_groups,
+    tokenize,
+)
+
+
+def month_index(year: int, month: int) -> int:
+    return year * 12 + month - 1
+
+
+TODAY = month_index(date.today().year, date.today().month)
+
+
+@pytest.mark.parametrize(
+    "duration, expected",
+    [
+        ("Nov 2018 - Jul 2021", (month_index(2018, 11), month_index(2021, 7) + 1)),
+        ("November 2018 to July 2021", (month_index(2018, 11), month_index(2021, 7) + 1)),
+        ("Sept. 2017 – Mar 2019", (month_index(2017, 9), month_index(2019, 3) + 1)),
+        ("March, 2015 - 2016", (month_index(2015, 3), month_index(2016, 1) + 1)),
+        ("11/2018 - 02/2020", (month_index(2018, 11), month_index(2020, 2) + 1)),
+        ("2018-11 to 2019-03", (month_index(2018, 11), month_index(2019, 3) + 1)),
+        ("2018 - 2020", (month_index(2018, 1), month_index(2020, 1) + 1)),
+        ("From 2018 to 2020", (month_index(2018, 1), month_index(2020, 1) + 1)),
+        ("2019 - Present", (month_index(2019, 1), TODAY + 1)),
+        ("may 2019 to now", (month_index(2019, 5), TODAY + 1)),
+        ("Since 2018", (month_index(2018, 1), TODAY + 1)),
+        ("From Jan 2020", (month_index(2020, 1), TODAY + 1)),
+        ("2018 -", (month_index(2018, 1), TODAY + 1)),
+        ("Jan 2020", (month_index(2020, 1), month_index(2020, 1) + 1)),
+    ],
+)
+def test_parse_duration(duration, expected):
+    assert parse_duration(duration) == expected
+
+
+@pytest.mark.parametrize("duration", ["", "a few years", "2021 - 2019", "13/2018"])
+def test_parse_duration_without_a_usable_period(duration):
+    assert parse_duration(duration) is None
+
+
+def test_experience_years_counts_overlapping_jobs_once():
+    profile = {
+        "work_experience": [
+            {"title": "Engineer", "duration": "Jan 2015 - Dec 2016"},
+            {"title": "Consultant", "duration": "Jun 2016 - Dec 2017"},
+            {"title": "Lead", "duration": "Jan 2019 - Dec 2019"},
+        ]
+    }
+    assert experience_years(profile) == 4.0
+
+
+def test_experience_years_is_unknown_without_parsable_durations():
+    assert experience_years({"work_experience": [{"duration": "several years"}]}) is None
+    assert experience_years({}) is None
+
+
+def test_tokenize_keeps_skill_symbols():
+    assert tokenize("C++, C#, Node.js and CI/CD.") == ["c++", "c#", "node.js", "and", "ci/cd"]
+
+
+def test_requirement_and_profile_terms():
+    profile = {
+        "technical_skills": {"languages": ["Python", "C++"]},
+        "certifications": ["AZ-104"],
+        "personal_info": {"title": "Data Engineer"},
+        "work_experience": [{"title": "Developer"}],
+    }
+    terms = set(profile_terms(profile))
+    assert {"python", "az-104", "data", "engineer", "developer", "c++"} <= terms
+
+
+def test_tokenize_merges_aliases():
+    assert tokenize("Amazon Web Services, K8s, Golang and ReactJS") == [
+        "aws",
+        "kubernetes",
+        "go",
+        "and",
+        "react",
+    ]
+
+
+def test_requirement_groups_drop_filler_words():
+    groups = requirement_groups(
+        [
+            "Experience with distributed systems",
+            "Amazon Web Services",
+            "Strong knowledge of Kubernetes (K8s)",
+            "AWS",
+        ]
+    )
+    assert groups == [["distributed", "systems"], ["aws"], ["kubernetes"]]
+    assert requirement_groups(["Excellent communication skills", "5+ years"]) == [
+        ["communication"]
+    ]
+
+
+def test_requirement_groups_met_by_a_profile_with_any_term_of_each():
+    terms = set(profile_terms({"technical_skills": ["AWS", "Kubernetes", "Distributed Systems"]}))
+    groups = requirement_groups(["Amazon Web Services", "K8s", "Experience with distributed systems"])
+    assert all(terms & set(group) for group in groups)
@@ -0,0 +1,93 @@
+# app/utils/upload_utils.py
+import asyncio
+import os
+import tempfile
+from typing import List, Optional
+
+from fastapi import UploadFile
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+
+class UploadTooLargeError(ValueError):
+    """An uploaded file, or the request as a whole, exceeds the configured size limit."""
+
+
+class SpooledUpload(BaseModel):
+    """An upload written to disk, so it can be handed to extractors by path."""
+
+    filename: str
+    path: str
+    size: int
+
+
+async def spool_upload(
+    upload: UploadFile,
+    max_bytes: int = settings.UPLOAD_MAX_FILE_BYTES,
+    directory: str = settings.UPLOAD_SPOOL_DIR,
+) -> SpooledUpload:
+    """
+    Copies an upload to a temp file in UPLOAD_SPOOL_DIR chunk by chunk, so at
+    most UPLOAD_CHUNK_BYTES of it are held in memory at a time. Raises
+    UploadTooLargeError (and removes the partial file) past `max_bytes`.
+    """
+    filename = upload.filename or "resume"
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(
+        dir=directory, suffix=os.path.splitext(filename)[1] or ".bin"
+    )
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await upload.read(settings.UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(
+                        f"{filename} exceeds the {max_bytes}-byte upload limit"
+                    )
+                await asyncio.to_thread(out.write, chunk)
+        return SpooledUpload(filename=filename, path=path, size=size)
+    except BaseException:
+        discard(path)
+        raise
+
+
+async def spool_uploads(
+    uploads: List[UploadFile],
+    max_file_bytes: int = settings.UPLOAD_MAX_FILE_BYTES,
+    max_request_bytes: int = settings.UPLOAD_MAX_REQUEST_BYTES,
+) -> List[SpooledUpload]:
+    """Spools every upload of a request, enforcing per-file and per-request limits."""
+    spooled: List[SpooledUpload] = []
+    try:
+        remaining = max_request_bytes
+        for upload in uploads:
+            try:
+                item = await spool_upload(upload, max_bytes=min(max_file_bytes, remaining))
+            except UploadTooLargeError:
+                if remaining < max_file_bytes:
+                    raise UploadTooLargeError(
+                        f"Upload exceeds the {max_request_bytes}-byte request limit"
+                    )
+                raise
+            spooled.append(item)
+            remaining -= item.size
+        return spooled
+    except BaseException:
+        for item in spooled:
+            discard(item.path)
+        raise
+
+
+def discard(path: Optional[str]):
+    """Removes a spooled file, ignoring files that are already gone."""
+    if not path:
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
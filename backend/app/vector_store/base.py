@@ -0,0 +1,128 @@
+# app/vector_store/base.py
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Chroma-style results: {"ids": ..., "embeddings": ..., "metadatas": ..., ...}
+QueryResult = Dict[str, Any]
+GetResult = Dict[str, Any]
+Where = Dict[str, Any]
+
+
+class VectorCollection(ABC):
+    """
+    The subset of the Chroma `Collection` API the app relies on. Backends
+    implement it with Chroma's semantics: squared L2 distances, `where`
+    metadata filters ($eq, $ne, $gt, $gte, $lt, $lte, $in, $nin, $and, $or),
+    `add` ignoring ids that already exist and `upsert` replacing them.
+    Chroma's own collections match it structurally without subclassing it.
+    """
+
+    name: str
+
+    @abstractmethod
+    def add(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        metadatas: Optional[Sequence[Dict[str, Any]]] = None,
+        documents: Optional[Sequence[str]] = None,
+    ) -> None:
+        ...
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        metadatas: Optional[Sequence[Dict[str, Any]]] = None,
+        documents: Optional[Sequence[str]] = None,
+    ) -> None:
+        ...
+
+    @abstractmethod
+    def get(
+        self,
+        ids: Optional[Sequence[str]] = None,
+        where: Optional[Where] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Sequence[str] = ("metadatas", "documents"),
+    ) -> GetResult:
+        ...
+
+    @abstractmethod
+    def query(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        n_results: int = 10,
+        where: Optional[Where] = None,
+        include: Sequence[str] = ("metadatas", "documents", "distances"),
+    ) -> QueryResult:
+        ...
+
+    @abstractmethod
+    def delete(
+        self, ids: Optional[Sequence[str]] = None, where: Optional[Where] = None
+    ) -> None:
+        ...
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+
+class VectorStore(ABC):
+    """A named set of vector collections (a Chroma client, or the local store)."""
+
+    @abstractmethod
+    def get_or_create_collection(self, name: str) -> VectorCollection:
+        ...
+
+
+def compile_where(where: Optional[Where]) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Compiles a Chroma `where` filter into a predicate over metadata dicts.
+    `$in` / `$nin` operands become sets, so id filters stay O(1) per row.
+    """
+    if not where:
+        return lambda metadata: True
+    predicates: List[Callable[[Dict[str, Any]], bool]] = []
+    for key, condition in where.items():
+        if key in ("$and", "$or"):
+            clauses = [compile_where(clause) for clause in condition]
+            combine = all if key == "$and" else any
+            predicates.append(
+                lambda metadata, clauses=clauses, combine=combine: combine(
+                    clause(metadata) for clause in clauses
+                )
+            )
+        elif isinstance(condition, dict):
+            for operator, operand in condition.items():
+                predicates.append(_compile_comparison(key, operator, operand))
+        else:
+            predicates.append(
+                lambda metadata, key=key, operand=condition: metadata.get(key) == operand
+            )
+    return lambda metadata: all(predicate(metadata) for predicate in predicates)
+
+
+def _compile_comparison(
+    key: str, operator: str, operand: Any
+) -> Callable[[Dict[str, Any]], bool]:
+    if operator in ("$in", "$nin"):
+        values = set(operand)
+        if operator == "$in":
+            return lambda metadata: metadata.get(key) in values
+        return lambda metadata: metadata.get(key) not in values
+    comparisons: Dict[str, Callable[[Any, Any], bool]] = {
+        "$eq": lambda a, b: a == b,
+        "$ne": lambda a, b: a != b,
+        "$gt": lambda a, b: a is not None and a > b,
+        "$gte": lambda a, b: a is not None and a >= b,
+        "$lt": lambda a, b: a is not None and a < b,
+        "$lte": lambda a, b: a is not None and a <= b,
+    }
+    if operator not in comparisons:
+        raise ValueError(f"Unsupported where operator: {operator}")
+    compare = comparisons[operator]
+    return lambda metadata: compare(metadata.get(key), operand)
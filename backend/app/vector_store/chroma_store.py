@@ -0,0 +1,14 @@
+# app/vector_store/chroma_store.py
+from app.vector_store.base import VectorCollection, VectorStore
+
+
+class ChromaVectorStore(VectorStore):
+    """A Chroma server. Its collections already implement VectorCollection."""
+
+    def __init__(self, host: str, port: int):
+        import chromadb  # only needed when this backend is selected
+
+        self.client = chromadb.HttpClient(host=host, port=port)
+
+    def get_or_create_collection(self, name: str) -> VectorCollection:
+        return self.client.get_or_create_collection(name=name)  # type: ignore
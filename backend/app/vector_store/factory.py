@@ -0,0 +1,17 @@
+# app/vector_store/factory.py
+from app.core.config import settings
+from app.vector_store.base import VectorStore
+
+
+def create_vector_store() -> VectorStore:
+    """Builds the backend selected by VECTOR_STORE_BACKEND ("chroma" or "local")."""
+    backend = settings.VECTOR_STORE_BACKEND.lower()
+    if backend == "chroma":
+        from app.vector_store.chroma_store import ChromaVectorStore
+
+        return ChromaVectorStore(settings.CHROMA_HTTP_HOST, settings.CHROMA_HTTP_PORT)
+    if backend == "local":
+        from app.vector_store.local_store import LocalVectorStore
+
+        return LocalVectorStore(settings.VECTOR_STORE_PATH)
+    raise ValueError(f"Unknown vector store backend: {settings.VECTOR_STORE_BACKEND}")
@@ -0,0 +1,355 @@
+# app/vector_store/local_store.py
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.vector_store.base import (
+    GetResult,
+    QueryResult,
+    VectorCollection,
+    VectorStore,
+    Where,
+    compile_where,
+)
+
+
+class LocalVectorCollection(VectorCollection):
+    """
+    Embedded collection: vectors live in a memory-mapped float32 matrix
+    (`<name>.f32`, one row per chunk) and ids, metadata and documents in a
+    SQLite file next to it. Queries are exact: one vectorized squared-L2 pass
+    over the rows that pass the `where` filter, then an argpartition top-k.
+
+    Writes take SQLite's write lock, so several processes (API and workers) can
+    share a collection; each process reloads its in-memory view when SQLite
+    reports that another connection changed the data.
+    """
+
+    _INITIAL_CAPACITY = 1024
+
+    def __init__(self, name: str, directory: str):
+        self.name = name
+        os.makedirs(directory, exist_ok=True)
+        self._vectors_path = os.path.join(directory, f"{name}.f32")
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            os.path.join(directory, f"{name}.sqlite3"),
+            check_same_thread=False,
+            isolation_level=None,  # explicit transactions only
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS records (
+                id TEXT PRIMARY KEY,
+                row INTEGER NOT NULL UNIQUE,
+                metadata TEXT NOT NULL,
+                document TEXT
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._data_version: Optional[int] = None
+        self._reload()
+
+    # --- in-memory view -------------------------------------------------
+
+    def _reload(self):
+        """Rebuilds the in-memory view (row maps, metadata, norms) from disk."""
+        dim = self._conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+        self.dim: Optional[int] = int(dim[0]) if dim else None
+        records = self._conn.execute(
+            "SELECT id, row, metadata, document FROM records"
+        ).fetchall()
+        self._row_of: Dict[str, int] = {}
+        self._id_at: Dict[int, str] = {}
+        self._metadata_at: Dict[int, Dict[str, Any]] = {}
+        self._document_at: Dict[int, Optional[str]] = {}
+        for doc_id, row, metadata, document in records:
+            self._row_of[doc_id] = row
+            self._id_at[row] = doc_id
+            self._metadata_at[row] = json.loads(metadata)
+            self._document_at[row] = document
+        self._high_water = max(self._id_at, default=-1) + 1
+        self._free_rows = sorted(set(range(self._high_water)) - set(self._id_at))
+        self._open_matrix()
+        self._norms = np.zeros(self._capacity, dtype=np.float32)
+        if self._high_water:
+            rows = self._matrix[: self._high_water]
+            self._norms[: self._high_water] = np.einsum("ij,ij->i", rows, rows)
+        self._alive = np.zeros(self._capacity, dtype=bool)
+        self._alive[list(self._id_at)] = True
+        self._filter_cache: Dict[str, np.ndarray] = {}
+        self._data_version = self._version()
+
+    def _open_matrix(self):
+        self._capacity = 0
+        self._matrix = np.zeros((0, self.dim or 0), dtype=np.float32)
+        if self.dim and os.path.exists(self._vectors_path):
+            rows = os.path.getsize(self._vectors_path) // (4 * self.dim)
+            if rows:
+                self._matrix = np.memmap(
+                    self._vectors_path, dtype=np.float32, mode="r+", shape=(rows, self.dim)
+                )
+                self._capacity = rows
+
+    def _version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _sync(self):
+        """Reloads the view if another connection (process) wrote since the last look."""
+        if self._version() != self._data_version:
+            self._reload()
+
+    def _ensure_capacity(self, rows: int):
+        if rows <= self._capacity:
+            return
+        capacity = max(self._INITIAL_CAPACITY, self._capacity)
+        while capacity < rows:
+            capacity *= 2
+        if isinstance(self._matrix, np.memmap):
+            self._matrix.flush()
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(capacity * self.dim * 4)  # type: ignore
+        self._open_matrix()
+        self._norms = np.concatenate(
+            [self._norms, np.zeros(capacity - len(self._norms), dtype=np.float32)]
+        )
+        self._alive = np.concatenate(
+            [self._alive, np.zeros(capacity - len(self._alive), dtype=bool)]
+        )
+
+    def _rows_matching(self, where: Optional[Where]) -> np.ndarray:
+        """Row indexes of live records passing `where`; cached until the next write."""
+        key = json.dumps(where, sort_keys=True, default=str)
+        rows = self._filter_cache.get(key)
+        if rows is None:
+            if where:
+                predicate = compile_where(where)
+                rows = np.fromiter(
+                    (row for row, metadata in self._metadata_at.items() if predicate(metadata)),
+                    dtype=np.int64,
+                )
+            else:
+                rows = np.flatnonzero(self._alive[: self._high_water])
+            rows.sort()
+            if len(self._filter_cache) > 256:
+                self._filter_cache.clear()
+            self._filter_cache[key] = rows
+        return rows
+
+    # --- writes ---------------------------------------------------------
+
+    def _write(self, ids, embeddings, metadatas, documents, replace: bool):
+        if not len(ids):
+            return
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("Expected one embedding per id")
+        metadatas = list(metadatas) if metadatas is not None else [{}] * len(ids)
+        documents = list(documents) if documents is not None else [None] * len(ids)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._sync()
+                if self.dim is None:
+                    self.dim = int(vectors.shape[1])
+                    self._conn.execute(
+                        "INSERT INTO meta (key, value) VALUES ('dim', ?)", (str(self.dim),)
+                    )
+                    self._open_matrix()
+                elif vectors.shape[1] != self.dim:
+                    raise ValueError(
+                        f"Embedding dimension {vectors.shape[1]} does not match "
+                        f"collection dimension {self.dim}"
+                    )
+
+                assignments = []  # (row, index into the inputs)
+                for i, doc_id in enumerate(ids):
+                    row = self._row_of.get(doc_id)
+                    if row is not None and not replace:
+                        continue
+                    if row is None:
+                        row = self._free_rows.pop(0) if self._free_rows else self._high_water
+                        self._high_water = max(self._high_water, row + 1)
+                    self._row_of[doc_id] = row
+                    assignments.append((row, i))
+                if not assignments:
+                    self._conn.execute("COMMIT")
+                    return
+
+                self._ensure_capacity(self._high_water)
+                rows = np.asarray([row for row, _ in assignments])
+                picked = vectors[[i for _, i in assignments]]
+                self._matrix[rows] = picked
+                self._matrix.flush()  # type: ignore
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO records (id, row, metadata, document) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (ids[i], row, json.dumps(metadatas[i] or {}), documents[i])
+                        for row, i in assignments
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                self._reload()
+                raise
+
+            for (row, i), vector in zip(assignments, picked):
+                self._id_at[row] = ids[i]
+                self._metadata_at[row] = dict(metadatas[i] or {})
+                self._document_at[row] = documents[i]
+                self._norms[row] = float(vector @ vector)
+                self._alive[row] = True
+            self._filter_cache.clear()
+            self._data_version = self._version()
+
+    def add(self, ids, embeddings, metadatas=None, documents=None) -> None:
+        self._write(ids, embeddings, metadatas, documents, replace=False)
+
+    def upsert(self, ids, embeddings, metadatas=None, documents=None) -> None:
+        self._write(ids, embeddings, metadatas, documents, replace=True)
+
+    def delete(
+        self, ids: Optional[Sequence[str]] = None, where: Optional[Where] = None
+    ) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._sync()
+                rows = self._select_rows(ids, where)
+                doomed = [self._id_at[row] for row in rows]
+                for start in range(0, len(doomed), 500):
+                    batch = doomed[start : start + 500]
+                    self._conn.execute(
+                        f"DELETE FROM records WHERE id IN ({','.join('?' * len(batch))})",
+                        batch,
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            for row in rows:
+                doc_id = self._id_at.pop(row)
+                del self._row_of[doc_id]
+                self._metadata_at.pop(row, None)
+                self._document_at.pop(row, None)
+                self._alive[row] = False
+                self._free_rows.append(row)
+            self._free_rows.sort()
+            self._filter_cache.clear()
+            self._data_version = self._version()
+
+    # --- reads ----------------------------------------------------------
+
+    def _select_rows(self, ids: Optional[Sequence[str]], where: Optional[Where]) -> List[int]:
+        if ids is not None:
+            rows = [self._row_of[doc_id] for doc_id in ids if doc_id in self._row_of]
+            if where:
+                predicate = compile_where(where)
+                rows = [row for row in rows if predicate(self._metadata_at[row])]
+            return rows
+        return self._rows_matching(where).tolist()
+
+    def get(
+        self,
+        ids: Optional[Sequence[str]] = None,
+        where: Optional[Where] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Sequence[str] = ("metadatas", "documents"),
+    ) -> GetResult:
+        with self._lock:
+            self._sync()
+            rows = self._select_rows(ids, where)
+            rows = rows[offset or 0 :]
+            if limit is not None:
+                rows = rows[:limit]
+            result: GetResult = {"ids": [self._id_at[row] for row in rows]}
+            if "embeddings" in include:
+                result["embeddings"] = (
+                    np.array(self._matrix[rows])
+                    if rows
+                    else np.zeros((0, self.dim or 0), dtype=np.float32)
+                )
+            if "metadatas" in include:
+                result["metadatas"] = [dict(self._metadata_at[row]) for row in rows]
+            if "documents" in include:
+                result["documents"] = [self._document_at[row] for row in rows]
+            return result
+
+    def query(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        n_results: int = 10,
+        where: Optional[Where] = None,
+        include: Sequence[str] = ("metadatas", "documents", "distances"),
+    ) -> QueryResult:
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[np.newaxis, :]
+        with self._lock:
+            self._sync()
+            rows = self._rows_matching(where)
+            k = min(n_results, len(rows))
+            result: QueryResult = {"ids": [], "distances": [], "metadatas": [], "documents": []}
+            if k == 0:
+                for key in result:
+                    result[key] = [[] for _ in range(len(queries))]
+                return result
+
+            # Squared L2, as Chroma reports it: |q|^2 + |d|^2 - 2 q.d
+            candidates = self._matrix[rows]
+            distances = (
+                np.einsum("ij,ij->i", queries, queries)[:, np.newaxis]
+                + self._norms[rows][np.newaxis, :]
+                - 2 * queries @ candidates.T
+            )
+            np.maximum(distances, 0, out=distances)
+            if k < len(rows):
+                top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            else:
+                top = np.tile(np.arange(len(rows)), (len(queries), 1))
+            top_distances = np.take_along_axis(distances, top, axis=1)
+            order = np.argsort(top_distances, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_distances = np.take_along_axis(top_distances, order, axis=1)
+
+            for query_rows, query_distances in zip(rows[top], top_distances):
+                result["ids"].append([self._id_at[row] for row in query_rows])
+                result["distances"].append(query_distances.tolist())
+                result["metadatas"].append(
+                    [dict(self._metadata_at[row]) for row in query_rows]
+                )
+                result["documents"].append([self._document_at[row] for row in query_rows])
+            return {key: value for key, value in result.items() if key == "ids" or key in include}
+
+    def count(self) -> int:
+        with self._lock:
+            self._sync()
+            return len(self._row_of)
+
+
+class LocalVectorStore(VectorStore):
+    """Embedded vector store: one LocalVectorCollection per name under `directory`."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._collections: Dict[str, LocalVectorCollection] = {}
+        self._lock = threading.Lock()
+
+    def get_or_create_collection(self, name: str) -> LocalVectorCollection:
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = LocalVectorCollection(name, self.directory)
+                self._collections[name] = collection
+            return collection
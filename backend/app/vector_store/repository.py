@@ -0,0 +1,182 @@
+# app/vector_store/repository.py
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+from app.core.config import settings
+from app.services.embedding_projection import get_projection
+from app.vector_store.base import (
+    GetResult,
+    QueryResult,
+    VectorCollection,
+    VectorStore,
+    Where,
+)
+from app.vector_store.factory import create_vector_store
+
+CANDIDATES_COLLECTION = "candidates_collection"
+JOBS_COLLECTION = "jobs_collection"
+
+
+class VectorRepository:
+    """
+    The app's single entry point to the vector store.
+
+    Collections are per embedding projection (see app/services/
+    embedding_projection.py): with a projection configured, `candidates_collection`
+    resolves to e.g. `candidates_collection_pca256-1a2b3c4d`, so vectors of
+    different versions are never compared, and every written record's metadata
+    carries the `projection` version.
+
+    Nothing connects at import time: the backend is created on first use and
+    each collection handle is looked up once and cached. A failed connection is
+    not cached, so the next call retries. Writes are split into batches of
+    VECTOR_STORE_WRITE_BATCH_SIZE records and queries into batches of
+    VECTOR_STORE_QUERY_BATCH_SIZE embeddings, whose results are concatenated.
+
+    All methods block (the Chroma HTTP client is synchronous); call them through
+    `asyncio.to_thread` from async code.
+    """
+
+    def __init__(self):
+        self._store: Optional[VectorStore] = None
+        self._collections: Dict[str, VectorCollection] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def store(self) -> VectorStore:
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    self._store = create_vector_store()
+        return self._store
+
+    def collection(self, name: str) -> VectorCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            store = self.store
+            with self._lock:
+                collection = self._collections.get(name)
+                if collection is None:
+                    collection = store.get_or_create_collection(self.collection_name(name))
+                    self._collections[name] = collection
+        return collection
+
+    @staticmethod
+    def collection_name(name: str) -> str:
+        """The physical collection holding `name` under the current projection."""
+        version = get_projection().version
+        return name if version == "none" else f"{name}_{version}"
+
+    @property
+    def candidates(self) -> VectorCollection:
+        return self.collection(CANDIDATES_COLLECTION)
+
+    @property
+    def jobs(self) -> VectorCollection:
+        return self.collection(JOBS_COLLECTION)
+
+    def reset(self):
+        """Drops the cached backend and handles; the next call reconnects."""
+        with self._lock:
+            self._store = None
+            self._collections = {}
+
+    def upsert(
+        self,
+        name: str,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        metadatas: Optional[Sequence[Dict[str, Any]]] = None,
+        documents: Optional[Sequence[str]] = None,
+    ) -> None:
+        """Inserts or replaces records, in batches."""
+        try:
+            collection = self.collection(name)
+            version = get_projection().version
+            metadatas = [
+                {**(metadata or {}), "projection": version}
+                for metadata in (metadatas if metadatas is not None else [{}] * len(ids))
+            ]
+            size = max(1, settings.VECTOR_STORE_WRITE_BATCH_SIZE)
+            for start in range(0, len(ids), size):
+                stop = start + size
+                collection.upsert(
+                    ids=list(ids[start:stop]),
+                    embeddings=embeddings[start:stop],
+                    metadatas=metadatas[start:stop],
+                    documents=list(documents[start:stop]) if documents is not None else None,
+                )
+        except Exception as e:
+            print("Error while upserting embeddings", e)
+            raise e
+
+    def delete(
+        self,
+        name: str,
+        ids: Optional[Sequence[str]] = None,
+        where: Optional[Where] = None,
+    ) -> None:
+        """Deletes records by id (in batches) and/or by metadata filter."""
+        try:
+            collection = self.collection(name)
+            if ids is None:
+                collection.delete(where=where)
+                return
+            size = max(1, settings.VECTOR_STORE_WRITE_BATCH_SIZE)
+            for start in range(0, len(ids), size):
+                collection.delete(ids=list(ids[start : start + size]), where=where)
+        except Exception as e:
+            print("Error while deleting embeddings", e)
+            raise e
+
+    def get(
+        self,
+        name: str,
+        ids: Optional[Sequence[str]] = None,
+        where: Optional[Where] = None,
+        include: Sequence[str] = ("metadatas", "documents"),
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+    ) -> GetResult:
+        return self.collection(name).get(
+            ids=ids, where=where, limit=limit, offset=offset, include=list(include)
+        )
+
+    def query(
+        self,
+        name: str,
+        query_embeddings: Sequence[Sequence[float]],
+        n_results: int = 10,
+        where: Optional[Where] = None,
+        include: Sequence[str] = ("metadatas", "documents", "distances"),
+    ) -> QueryResult:
+        """
+        Nearest neighbours of many query embeddings. One result row per query,
+        in order, exactly as a single Chroma query would return them.
+        """
+        collection = self.collection(name)
+        size = max(1, settings.VECTOR_STORE_QUERY_BATCH_SIZE)
+        if len(query_embeddings) <= size:
+            return collection.query(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where=where,
+                include=list(include),
+            )
+        merged: Dict[str, Any] = {}
+        for start in range(0, len(query_embeddings), size):
+            batch = collection.query(
+                query_embeddings=query_embeddings[start : start + size],
+                n_results=n_results,
+                where=where,
+                include=list(include),
+            )
+            for key, rows in batch.items():
+                if key == "included" or rows is None:
+                    merged[key] = rows  # same for every batch
+                else:
+                    merged.setdefault(key, []).extend(rows)
+        return merged
+
+
+vector_repository = VectorRepository()
@@ -0,0 +1,136 @@
+# app/vector_store/test_local_store.py
+import numpy as np
+import pytest
+
+from app.vector_store.base import compile_where
+from app.vector_store.local_store import LocalVectorCollection, LocalVectorStore
+
+
+@pytest.fixture
+def collection(tmp_path):
+    collection = LocalVectorCollection("chunks", str(tmp_path))
+    collection.upsert(
+        ids=["a_0", "a_1", "b_0", "c_0"],
+        embeddings=[[1, 0, 0], [0, 1, 0], [0, 0, 1], [1, 1, 0]],
+        metadatas=[
+            {"document_id": "a", "section": "skills", "years": 2},
+            {"document_id": "a", "section": "experience", "years": 2},
+            {"document_id": "b", "section": "skills", "years": 7},
+            {"document_id": "c", "section": "summary"},
+        ],
+        documents=["a0", "a1", "b0", "c0"],
+    )
+    return collection
+
+
+def ids_where(collection, where):
+    return sorted(collection.get(where=where)["ids"])
+
+
+def test_where_operators(collection):
+    assert ids_where(collection, {"document_id": "a"}) == ["a_0", "a_1"]
+    assert ids_where(collection, {"section": {"$ne": "skills"}}) == ["a_1", "c_0"]
+    assert ids_where(collection, {"document_id": {"$in": ["b", "c"]}}) == ["b_0", "c_0"]
+    assert ids_where(collection, {"document_id": {"$nin": ["a"]}}) == ["b_0", "c_0"]
+    # Comparisons never match records without the field.
+    assert ids_where(collection, {"years": {"$gte": 2}}) == ["a_0", "a_1", "b_0"]
+    assert ids_where(collection, {"years": {"$lt": 5}}) == ["a_0", "a_1"]
+    assert ids_where(
+        collection, {"$and": [{"section": "skills"}, {"years": {"$gt": 5}}]}
+    ) == ["b_0"]
+    assert ids_where(
+        collection, {"$or": [{"document_id": "c"}, {"years": {"$lte": 2}}]}
+    ) == ["a_0", "a_1", "c_0"]
+    with pytest.raises(ValueError):
+        compile_where({"years": {"$regex": "2"}})
+
+
+def test_query_returns_nearest_by_squared_l2(collection):
+    result = collection.query([[1, 0, 0], [0, 0, 2]], n_results=2)
+    assert result["ids"] == [["a_0", "c_0"], ["b_0", "a_0"]]
+    assert result["distances"][0] == pytest.approx([0.0, 1.0])
+    assert result["distances"][1] == pytest.approx([1.0, 5.0])
+    assert result["documents"][0] == ["a0", "c0"]
+
+    filtered = collection.query([[1, 0, 0]], n_results=10, where={"section": "skills"})
+    assert filtered["ids"] == [["a_0", "b_0"]]
+    empty = collection.query([[1, 0, 0]], where={"document_id": "missing"})
+    assert empty["ids"] == [[]]
+
+
+def test_query_matches_brute_force(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(300, 16)).astype(np.float32)
+    collection = LocalVectorCollection("random", str(tmp_path))
+    collection.upsert(ids=[str(i) for i in range(300)], embeddings=vectors)
+    queries = rng.normal(size=(5, 16)).astype(np.float32)
+    result = collection.query(queries, n_results=7, include=["distances"])
+    for query, ids, distances in zip(queries, result["ids"], result["distances"]):
+        expected = ((vectors - query) ** 2).sum(axis=1)
+        top = np.argsort(expected)[:7]
+        assert ids == [str(i) for i in top]
+        assert distances == pytest.approx(expected[top].tolist(), rel=1e-4, abs=1e-4)
+
+
+def test_add_keeps_and_upsert_replaces_existing_ids(collection):
+    collection.add(ids=["a_0", "d_0"], embeddings=[[9, 9, 9], [0, 2, 0]])
+    assert collection.count() == 5
+    kept = collection.get(ids=["a_0"], include=["embeddings", "metadatas"])
+    assert kept["embeddings"].tolist() == [[1, 0, 0]]
+    assert kept["metadatas"] == [{"document_id": "a", "section": "skills", "years": 2}]
+
+    collection.upsert(ids=["a_0"], embeddings=[[0, 0, 3]], metadatas=[{"document_id": "z"}])
+    replaced = collection.get(ids=["a_0"], include=["embeddings", "metadatas"])
+    assert replaced["embeddings"].tolist() == [[0, 0, 3]]
+    assert replaced["metadatas"] == [{"document_id": "z"}]
+    assert ids_where(collection, {"document_id": "a"}) == ["a_1"]
+    assert collection.query([[0, 0, 3]], n_results=1)["ids"] == [["a_0"]]
+
+
+def test_delete_by_ids_and_where_and_reuse_freed_rows(collection):
+    collection.delete(ids=["c_0", "missing"])
+    collection.delete(where={"document_id": "a"})
+    assert collection.count() == 1
+    assert collection.get()["ids"] == ["b_0"]
+
+    # New records take the freed rows; none of the deleted vectors come back.
+    collection.upsert(ids=["d_0", "d_1"], embeddings=[[5, 0, 0], [0, 5, 0]])
+    assert collection.count() == 3
+    result = collection.query([[5, 0, 0]], n_results=3)
+    assert result["ids"] == [["d_0", "b_0", "d_1"]]
+    assert result["distances"][0] == pytest.approx([0.0, 26.0, 50.0])
+    assert collection.get(ids=["d_1"], include=["embeddings"])["embeddings"].tolist() == [
+        [0, 5, 0]
+    ]
+
+
+def test_get_pages_with_limit_and_offset(collection):
+    everything = collection.get()["ids"]
+    pages = [collection.get(limit=3, offset=offset)["ids"] for offset in (0, 3)]
+    assert pages[0] + pages[1] == everything
+    assert len(pages[0]) == 3
+
+
+def test_dimension_mismatch_is_rejected(collection):
+    with pytest.raises(ValueError):
+        collection.upsert(ids=["x"], embeddings=[[1, 2]])
+    assert collection.count() == 4
+
+
+def test_writes_are_visible_to_other_connections_and_persist(tmp_path, collection):
+    other = LocalVectorCollection("chunks", str(tmp_path))
+    assert other.count() == 4
+    other.upsert(ids=["e_0"], embeddings=[[0, 1, 1]], metadatas=[{"document_id": "e"}])
+    other.delete(ids=["b_0"])
+    assert collection.count() == 4
+    assert ids_where(collection, {"document_id": {"$in": ["b", "e"]}}) == ["e_0"]
+    assert collection.query([[0, 1, 1]], n_results=1)["ids"] == [["e_0"]]
+
+    # Growing past the initial capacity keeps earlier rows intact.
+    many = LocalVectorStore(str(tmp_path)).get_or_create_collection("chunks")
+    count = LocalVectorCollection._INITIAL_CAPACITY + 10
+    many.upsert(ids=[f"n_{i}" for i in range(count)], embeddings=[[i, 0, 0] for i in range(count)])
+    assert collection.get(ids=["e_0"], include=["embeddings"])["embeddings"].tolist() == [
+        [0, 1, 1]
+    ]
+    assert collection.count() == 4 + count